@@ -0,0 +1,149 @@
+"""
+Runs the micro-benchmarks for the package's hot paths.
+
+    python -m benchmarks
+    python -m benchmarks --rows 1000,10000 --case mapper --save baseline.json
+    python -m benchmarks --compare baseline.json --fail-over 10
+"""
+import argparse
+import django
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from benchmarks import fixtures
+from benchmarks.cases import CASES
+
+DEFAULT_ROWS = '1000,10000,100000'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Micro-benchmarks for rest_framework_simplify')
+    parser.add_argument('--rows', default=DEFAULT_ROWS, help='comma separated row counts to run each case with')
+    parser.add_argument('--case', action='append', default=[], help='only run cases whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3, help='times to run each case, the fastest run is kept')
+    parser.add_argument('--no-memory', action='store_true', help="don't measure peak memory")
+    parser.add_argument('--save', help='write the results to this file to use as a baseline')
+    parser.add_argument('--compare', help='compare the results against a saved baseline')
+    parser.add_argument('--fail-over', type=float, help='exit with an error if any case is this percent slower than the baseline')
+    return parser.parse_args()
+
+
+def time_case(setup, rows, variant, repeat):
+    best = None
+    for i in range(repeat):
+        run = setup(rows, variant)
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_peak_memory(setup, rows, variant):
+    run = setup(rows, variant)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_cases(args):
+    row_counts = [int(rows) for rows in args.rows.split(',')]
+    cases = {
+        name: case for name, case in CASES.items()
+        if not args.case or any(case_filter in name for case_filter in args.case)
+    }
+    if any(case['uses_database'] for case in cases.values()):
+        fixtures.set_up_database()
+
+    results = {}
+    for rows in row_counts:
+        if any(case['uses_database'] for case in cases.values()):
+            fixtures.seed(rows)
+        for name, case in cases.items():
+            for variant_name, variant in case['variants'].items():
+                elapsed = time_case(case['setup'], rows, variant, args.repeat)
+                peak_memory = None if args.no_memory else measure_peak_memory(case['setup'], rows, variant)
+                key = '{0}[{1}]@{2}'.format(name, variant_name, rows)
+                results[key] = {
+                    'case': name,
+                    'variant': variant_name,
+                    'rows': rows,
+                    'seconds': elapsed,
+                    'per_row': elapsed / rows,
+                    'peak_memory': peak_memory
+                }
+                print_result(key, results[key])
+    return results
+
+
+def print_result(key, result, baseline=None):
+    line = '{0:<64} {1:>10.3f}ms {2:>10.3f}us/row'.format(key, result['seconds'] * 1000, result['per_row'] * 1000000)
+    if result['peak_memory'] is not None:
+        line += ' {0:>10.2f}MB peak'.format(result['peak_memory'] / 1024 / 1024)
+    if baseline:
+        line += ' {0:>+8.1f}%'.format(get_change(result, baseline))
+    print(line)
+
+
+def get_change(result, baseline):
+    return (result['per_row'] - baseline['per_row']) / baseline['per_row'] * 100
+
+
+def compare(results, path, fail_over):
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+
+    print('\ncompared to {0}:'.format(path))
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        print_result(key, result, baseline[key])
+        if fail_over is not None and get_change(result, baseline[key]) > fail_over:
+            regressions.append(key)
+
+    if regressions:
+        print('\n{0} case(s) more than {1}% slower than the baseline:'.format(len(regressions), fail_over))
+        for key in regressions:
+            print('  ' + key)
+    return regressions
+
+
+def save(results, path):
+    with open(path, 'w') as baseline_file:
+        json.dump({
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'results': results
+        }, baseline_file, indent=2, sort_keys=True)
+    print('\nsaved results to {0}'.format(path))
+
+
+def main():
+    args = parse_args()
+    results = run_cases(args)
+    if args.save:
+        save(results, args.save)
+    if args.compare and compare(results, args.compare, args.fail_over):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
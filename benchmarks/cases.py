@@ -0,0 +1,89 @@
+from rest_framework_simplify.helpers import handle_bytes_decoding
+from rest_framework_simplify.mapper import Mapper
+from rest_framework_simplify.serializer import SQLEngineSerializer
+from rest_framework_simplify.views import SimplifyView
+
+from benchmarks import fixtures
+from test_app.models import BasicClass
+
+CASES = {}
+
+
+def benchmark(name, variants=None, uses_database=False):
+    """
+    benchmark registers a case. The decorated function is called with the number of rows and a variant and returns
+    the callable to time, so anything it does before returning is left out of the timings.
+    """
+    def register(setup):
+        CASES[name] = {
+            'setup': setup,
+            'variants': variants or {'default': None},
+            'uses_database': uses_database
+        }
+        return setup
+    return register
+
+
+@benchmark('mapper.dict_underscore_to_camelcase')
+def mapper_underscore_to_camelcase(rows, variant):
+    body = fixtures.serialized_rows(rows)
+    return lambda: Mapper.dict_underscore_to_camelcase(body)
+
+
+@benchmark('mapper.dict_camelcase_to_underscore')
+def mapper_camelcase_to_underscore(rows, variant):
+    body = fixtures.camelcased_rows(rows)
+    return lambda: Mapper.dict_camelcase_to_underscore(body)
+
+
+@benchmark('helpers.handle_bytes_decoding')
+def bytes_decoding(rows, variant):
+    body = fixtures.binary_rows(rows)
+
+    def run():
+        for item in body:
+            handle_bytes_decoding(item)
+    return run
+
+
+@benchmark('models.parse', variants={
+    'create': {'name': 'basic', 'active': True, 'exclude_field': 'excluded'},
+    'camelcase': {'name': 'basic', 'active': True, 'excludeField': 'excluded'}
+})
+def model_parse(rows, variant):
+    def run():
+        for i in range(rows):
+            BasicClass.parse(dict(variant))
+    return run
+
+
+@benchmark('serializer.serialize', uses_database=True, variants={
+    'fields': {'fields': ['id', 'name', 'active']},
+    'all': {},
+    'include_child_one': {'include': ['child_one'], 'select_related': ['child_one']},
+    'include_child_three': {'include': ['child_three'], 'prefetch_related': ['child_three']}
+})
+def serializer_serialize(rows, variant):
+    objs = fixtures.basic_classes(rows)
+    if variant.get('select_related'):
+        objs = objs.select_related(*variant['select_related'])
+    if variant.get('prefetch_related'):
+        objs = objs.prefetch_related(*variant['prefetch_related'])
+    objs = list(objs)
+    serializer = SQLEngineSerializer(include=variant.get('include', []), exclude=BasicClass.get_excludes(),
+                                     fields=variant.get('fields', []))
+    return lambda: serializer.serialize(objs)
+
+
+@benchmark('views.merge_simple_body', uses_database=True, variants={
+    'fields': 'fields=id,name,active',
+    'all': '',
+    'include_child_one': 'include=childOne',
+    'include_child_three': 'include=childThree',
+    'include_both_filtered': 'include=childOne,childThree&filters=active=true'
+})
+def view_merge_simple_body(rows, variant):
+    view = SimplifyView(BasicClass, supported_methods=['GET_LIST'])
+    query = view.build_query(fixtures.get_request(variant), fixtures.basic_classes(rows))
+    body = list(query.obj.values(*query.fields))
+    return lambda: view.merge_simple_body(query, body)
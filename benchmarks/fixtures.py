@@ -0,0 +1,112 @@
+import datetime
+
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from test_app.models import BasicClass, ChildClass
+
+# every basic class gets its own child_one and two shared children through child_three
+SHARED_CHILDREN = 100
+CHILD_THREE_FAN_OUT = 2
+BATCH_SIZE = 5000
+
+_seeded_rows = 0
+
+
+def set_up_database():
+    call_command('migrate', verbosity=0)
+
+
+def seed(rows):
+    """
+    seed makes sure there are at least rows basic classes in the database. Basic classes are numbered from 1 so
+    benchmarks can take the first n with id__lte.
+    """
+    global _seeded_rows
+    if rows <= _seeded_rows:
+        return
+
+    if not _seeded_rows:
+        ChildClass.objects.bulk_create([
+            ChildClass(name='shared{0}'.format(i)) for i in range(SHARED_CHILDREN)
+        ])
+    shared_ids = list(ChildClass.objects.order_by('id').values_list('id', flat=True)[:SHARED_CHILDREN])
+
+    for start in range(_seeded_rows, rows, BATCH_SIZE):
+        end = min(start + BATCH_SIZE, rows)
+        children = ChildClass.objects.bulk_create([ChildClass(name='child{0}'.format(i)) for i in range(start, end)])
+        basic_classes = BasicClass.objects.bulk_create([
+            BasicClass(id=i + 1, name='basic{0}'.format(i), active=i % 2 == 0, child_one=child)
+            for i, child in zip(range(start, end), children)
+        ])
+        BasicClass.child_three.through.objects.bulk_create([
+            BasicClass.child_three.through(basicclass_id=basic_class.id,
+                                           childclass_id=shared_ids[(basic_class.id + i) % SHARED_CHILDREN])
+            for basic_class in basic_classes
+            for i in range(CHILD_THREE_FAN_OUT)
+        ])
+    _seeded_rows = rows
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def basic_classes(rows):
+    return BasicClass.objects.filter(id__lte=rows).order_by('id')
+
+
+def get_request(query_string=''):
+    return Request(APIRequestFactory().get('/basicClass?{0}'.format(query_string)))
+
+
+def serialized_rows(rows):
+    """
+    serialized_rows builds rows shaped like a merged and serialized BasicClass body without touching the database.
+    """
+    created = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        {
+            'id': i,
+            'name': 'basic{0}'.format(i),
+            'active': True,
+            'created': created,
+            'binary_field': 'binarystring',
+            'exclude_field': None,
+            'child_one_id': i,
+            'child_one': {'id': i, 'name': 'child{0}'.format(i), 'active': True},
+            'child_three': [
+                {'id': j, 'name': 'shared{0}'.format(j), 'active': True} for j in range(CHILD_THREE_FAN_OUT)
+            ]
+        }
+        for i in range(rows)
+    ]
+
+
+def camelcased_rows(rows):
+    return [
+        {
+            'id': i,
+            'name': 'basic{0}'.format(i),
+            'active': True,
+            'binaryField': 'binarystring',
+            'excludeField': None,
+            'childOne': {'id': i, 'name': 'child{0}'.format(i), 'active': True},
+            'childThree': [{'id': j, 'name': 'shared{0}'.format(j)} for j in range(CHILD_THREE_FAN_OUT)]
+        }
+        for i in range(rows)
+    ]
+
+
+def binary_rows(rows):
+    return [
+        {
+            'id': i,
+            'name': 'basic{0}'.format(i),
+            'binary_field': memoryview(b'binarystring'),
+            'exclude_field': b'bytes',
+            'child_one': {'id': i, 'binary_field': b'nested'}
+        }
+        for i in range(rows)
+    ]
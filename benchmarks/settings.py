@@ -0,0 +1,14 @@
+"""
+Settings for the benchmarks. They reuse the test project but run against in memory SQLite so no database server is
+needed.
+"""
+from test_proj.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:'
+    }
+}
@@ -0,0 +1,51 @@
+from django.db.models import Avg, Count, Max, Min, Sum
+from rest_framework import status
+
+from rest_framework_simplify.errors import ErrorMessages
+from rest_framework_simplify.exceptions import SimplifyAPIException
+from rest_framework_simplify.mapper import Mapper
+
+AGGREGATE_FUNCTIONS = {
+    'avg': Avg,
+    'count': Count,
+    'max': Max,
+    'min': Min,
+    'sum': Sum
+}
+
+
+def get_alias(*parts):
+    # related fields are flattened so they camelcase to one key, e.g. child_one__name becomes childOneName
+    return '_'.join(parts).replace('__', '_')
+
+
+def parse_aggregates(aggregate_param, capabilities):
+    """
+    parse_aggregates turns an aggregate query param like sum:amount,count:id into the expressions to annotate, keyed by
+    the name each value is returned under. Only the functions a model allows for a field in get_aggregates are
+    accepted.
+    """
+    aggregates = {}
+    for aggregate in aggregate_param.split(','):
+        function, _, field_name = aggregate.strip().partition(':')
+        field_name = Mapper.camelcase_to_underscore(field_name.strip())
+        function = function.strip().lower()
+        if function not in capabilities.aggregates.get(field_name, ()):
+            raise SimplifyAPIException(ErrorMessages.INVALID_AGGREGATE.format(aggregate.strip()),
+                                       status.HTTP_400_BAD_REQUEST)
+        aggregates[get_alias(function, field_name)] = AGGREGATE_FUNCTIONS[function](field_name)
+    return aggregates
+
+
+def parse_group_by(group_by_param, capabilities):
+    """
+    parse_group_by returns the fields in a groupBy query param, each of which has to be listed in the model's
+    get_group_by.
+    """
+    group_by = []
+    for field_name in group_by_param.split(','):
+        field_name = Mapper.camelcase_to_underscore(field_name.strip())
+        if field_name not in capabilities.group_by:
+            raise SimplifyAPIException(ErrorMessages.INVALID_GROUP_BY.format(field_name), status.HTTP_400_BAD_REQUEST)
+        group_by.append(field_name)
+    return group_by
@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class RestFrameworkSimplifyAppConfig(AppConfig):
-    name = 'rest_framework_simplify'
\ No newline at end of file
+    name = 'rest_framework_simplify'
+
+    def ready(self):
+        from rest_framework_simplify.read_models import connect_read_models
+        from rest_framework_simplify.registry import build_registry
+        build_registry()
+        connect_read_models()
+
+        # stored procedure signatures are read on the first request rather than here, so management commands don't
+        # query the database just by starting
+        if getattr(settings, 'SIMPLIFY_WARM_SP_SIGNATURES', []):
+            from rest_framework_simplify.forms import warm_signatures_on_first_request
+            request_started.connect(warm_signatures_on_first_request, dispatch_uid='simplify_warm_sp_signatures')
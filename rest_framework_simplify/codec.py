@@ -0,0 +1,32 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(value):
+    """
+    loads decodes json text with orjson when it is installed and the json module when it isn't.
+    """
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+def dumps(value, default=None, allow_nan=True):
+    """
+    dumps encodes value as compact json text with orjson when it is installed and the json module when it isn't.
+    default is called for anything neither can encode on its own, including datetimes so they come out the same way
+    from both. orjson writes NaN and infinity as null, the json module writes them as they are unless allow_nan is
+    False, when it raises ValueError.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=default,
+                                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME).decode()
+        except orjson.JSONEncodeError:
+            # orjson doesn't take integers over 64 bits, which the json module does
+            pass
+    return json.dumps(value, default=default, ensure_ascii=False, separators=(',', ':'), allow_nan=allow_nan)
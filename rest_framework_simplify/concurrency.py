@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import prefetch_related_objects
+
+DEFAULT_CONCURRENT_QUERY_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+# set on the pool's threads while they run a function, see run_concurrently
+_worker_state = threading.local()
+
+
+def get_executor():
+    """
+    get_executor returns the process wide pool used to run independent queries at the same time. Every worker
+    thread gets its own database connections from Django, so the size of the pool caps how many extra connections
+    concurrent queries can open. It can be changed with the SIMPLIFY_CONCURRENT_QUERY_WORKERS setting.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = getattr(settings, 'SIMPLIFY_CONCURRENT_QUERY_WORKERS', DEFAULT_CONCURRENT_QUERY_WORKERS)
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='simplify-query')
+    return _executor
+
+
+def _run_with_own_connection(func):
+    _worker_state.active = True
+    try:
+        return func()
+    finally:
+        _worker_state.active = False
+        # worker threads never see request_finished so clean up their connections the same way it would
+        close_old_connections()
+
+
+def run_concurrently(*funcs):
+    """
+    run_concurrently calls each function at the same time and returns their results in the order they were passed
+    in. The first function runs in the calling thread so a request never waits on the pool for all of its queries.
+    Called from one of the pool's own threads, e.g. a prefetch inside a query handed to the pool by arun_concurrently,
+    the functions run one after another in that thread, since waiting on the pool from inside it can deadlock once
+    every worker is waiting.
+    """
+    if getattr(_worker_state, 'active', False):
+        return [func() for func in funcs]
+    executor = get_executor()
+    futures = [executor.submit(_run_with_own_connection, func) for func in funcs[1:]]
+    first_result = funcs[0]()
+    return [first_result] + [future.result() for future in futures]
+
+
+async def arun_concurrently(*funcs):
+    """
+    arun_concurrently is the async version of run_concurrently. Django's async ORM runs every query on the same
+    thread, so the functions are handed to the pool to get their own connections.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    return list(await asyncio.gather(*[
+        loop.run_in_executor(executor, _run_with_own_connection, func)
+        for func in funcs
+    ]))
+
+
+def prefetch_concurrently(objs, lookups):
+    """
+    prefetch_concurrently runs prefetch_related for objs with each top level relation in its own query at the same
+    time. Lookups that share a top level relation are prefetched together so no cache is written to twice.
+    """
+    if not objs or not lookups:
+        return objs
+
+    lookups_by_relation = {}
+    for lookup in lookups:
+        relation = getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+        lookups_by_relation.setdefault(relation, []).append(lookup)
+
+    # prefetch_related_objects creates the cache lazily which would race between threads
+    for obj in objs:
+        if not hasattr(obj, '_prefetched_objects_cache'):
+            obj._prefetched_objects_cache = {}
+
+    run_concurrently(*[
+        lambda relation_lookups=relation_lookups: prefetch_related_objects(objs, *relation_lookups)
+        for relation_lookups in lookups_by_relation.values()
+    ])
+    return objs
@@ -23,3 +23,20 @@ class ErrorMessages:
     TOO_DEEP = 'You shall not pass -- attempting to parse too many levels and Gandalf will not allow it'
     COULD_NOT_PARSE_DATE_FIELD = 'Date field could not be parsed for field: {0}'
 
+    QUERY_BUDGET_EXCEEDED = 'Ran {0} queries with a budget of {1}'
+    TABLE_QUERY_BUDGET_EXCEEDED = 'Ran {0} queries against {1} with a budget of {2}'
+    QUERY_BUDGET_REQUEST_FAILED = 'GET {0} returned {1}'
+    INVALID_MODEL_CAPABILITY = '{0}.{1}() has {2} but {3} is not a field or property on {4}'
+    INVALID_FILTER_DEFINITION = '{0}.get_filters() definition for {1} needs a type and list'
+    MODEL_CAPABILITIES_FROZEN = 'Capabilities for {0} are built at startup and cannot be changed'
+    INVALID_EXPORT_FORMAT = '{0} is not an export format. Use one of {1}'
+    EXPORT_SINGLE_RESULT = 'export can only be used on a list'
+    EXPORT_WITH_AGGREGATE = 'export can not be used with aggregate or groupBy'
+    INVALID_AGGREGATE_FUNCTION = '{0}.get_aggregates() has {2} for {1} but it is not one of {3}'
+    INVALID_AGGREGATE = '{0} is not an aggregate that can be requested'
+    INVALID_GROUP_BY = '{0} is not a field that can be grouped by'
+    GROUP_BY_WITHOUT_AGGREGATE = 'groupBy needs an aggregate'
+    INVALID_JSON_PATH = '{0} is not a valid json path'
+    INVALID_MODEL_COLUMN = '{0}.{1}() has {2} but it is not a column on {0}'
+    READ_MODEL_WITHOUT_SOURCE = '{0} needs a OneToOneField to the model it is built from as its primary key'
+    INVALID_READ_MODEL_INCLUDE = '{0} includes {1} but it is not in {2}.get_includes()'
@@ -36,3 +36,9 @@ class SimplifyAPIException(APIException):
         if status_code is not None:
             self.status_code = status_code
         super().__init__()
+
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, message):
+        # an AssertionError so test runners report it as a failure rather than an error
+        super(QueryBudgetExceeded, self).__init__(message)
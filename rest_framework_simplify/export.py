@@ -0,0 +1,80 @@
+import csv
+
+from asgiref.sync import sync_to_async
+from itertools import groupby, islice
+from operator import itemgetter
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+# rows read from the server side cursor at a time
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+
+
+def get_export_chunk_size():
+    return getattr(settings, 'SIMPLIFY_EXPORT_CHUNK_SIZE', DEFAULT_EXPORT_CHUNK_SIZE)
+
+
+class Echo:
+    # csv.writer writes each row to this and writerow hands back the encoded line instead of buffering it
+    def write(self, value):
+        return value
+
+
+def format_csv_value(value, encoder):
+    if value is None:
+        return ''
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    # nested includes and lists go in one cell the same way they would be written in json
+    return encoder.encode(value)
+
+
+def encode_csv(items):
+    """
+    encode_csv yields a header line with the keys of the first item and then a line for each item.
+    """
+    encoder = JSONEncoder()
+    writer = csv.writer(Echo())
+    header = None
+    for item in items:
+        if header is None:
+            header = list(item)
+            yield writer.writerow(header)
+        yield writer.writerow([format_csv_value(item.get(key), encoder) for key in header])
+
+
+def encode_ndjson(items):
+    """
+    encode_ndjson yields each item as a line of json.
+    """
+    encoder = JSONEncoder()
+    for item in items:
+        yield encoder.encode(item) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', encode_csv),
+    'ndjson': ('application/x-ndjson', encode_ndjson)
+}
+
+
+def group_rows(rows, key):
+    """
+    group_rows yields lists of the consecutive rows that have the same value for key.
+    """
+    for _, group in groupby(rows, key=itemgetter(key)):
+        yield list(group)
+
+
+async def aiterate(iterator, chunk_size):
+    """
+    aiterate hands the items of a synchronous iterator that reads from the database to an async response, taking
+    chunk_size items at a time in the thread the ORM runs in.
+    """
+    take = sync_to_async(lambda: list(islice(iterator, chunk_size)))
+    while True:
+        chunk = await take()
+        if not chunk:
+            return
+        for item in chunk:
+            yield item
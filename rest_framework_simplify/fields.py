@@ -1,21 +1,125 @@
-import json
+import hashlib
+import hmac
 
 from Crypto.Cipher import AES
-from Crypto import Random
 import base64
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from django.conf import settings
-from django.core.exceptions import FieldError, ImproperlyConfigured, ValidationError
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist, FieldError, ImproperlyConfigured, ValidationError
 from django.db import models
+from django.db.models.expressions import Col
 from django.utils.encoding import force_bytes, force_str
-from django.utils.functional import cached_property
+from django.utils.functional import SimpleLazyObject, cached_property, empty
+
+from rest_framework_simplify.codec import dumps, loads
 
 BLOCK_SIZE = 16
+# bytes of a hash of the key written in front of each value when DB_ENCRYPTION_KEY_IDS is on, see get_key_id
+KEY_ID_SIZE = 4
+
+# field -> [PendingDecryption] for the values loaded inside deferred_decryption
+_pending_decryption = ContextVar('simplify_pending_decryption', default=None)
+
+
+@lru_cache(maxsize=None)
+def get_cipher(key):
+    # ECB doesn't carry anything from one call to the next so one cipher for each key can be shared by every thread
+    return AES.new(force_bytes(key), AES.MODE_ECB)
+
+
+@lru_cache(maxsize=None)
+def get_key_id(key):
+    # values carry the key they were encrypted with so they can still be decrypted after the key is rotated
+    return hashlib.sha256(force_bytes(key)).digest()[:KEY_ID_SIZE]
+
+
+@lru_cache(maxsize=None)
+def get_keys_by_id(keys):
+    return {get_key_id(key): key for key in keys}
+
+
+def split_ciphertext(ciphertext):
+    """
+    split_ciphertext returns the key id a value was encrypted with and the encrypted blocks. The key id is None for
+    values written before key ids were, which are only ever whole blocks.
+    """
+    if len(ciphertext) % BLOCK_SIZE == KEY_ID_SIZE:
+        return bytes(ciphertext[:KEY_ID_SIZE]), ciphertext[KEY_ID_SIZE:]
+    return None, ciphertext
+
+
+def parse_plaintext(plaintext):
+    # values are padded with 1 to BLOCK_SIZE null bytes when they are encrypted. Missing or longer padding, anything
+    # after it, or bytes that aren't utf-8, means the value was decrypted with the wrong key
+    value, separator, padding = plaintext.partition(b'\0')
+    if not separator or len(padding) >= BLOCK_SIZE or padding.strip(b'\0'):
+        return None
+    try:
+        return value.decode()
+    except UnicodeDecodeError:
+        return None
+
+
+def writes_key_ids():
+    # releases before key ids can't read values written with one, so they are only written once this is turned on
+    return getattr(settings, 'DB_ENCRYPTION_KEY_IDS', False)
+
+
+def get_blind_index(value):
+    """
+    get_blind_index returns the keyed hash SimplifyBlindIndexField stores for a value, so rows with equal values can be
+    found without decrypting them.
+    """
+    key = getattr(settings, 'DB_BLIND_INDEX_KEY', None) or settings.SECRET_KEY
+    return hmac.new(force_bytes(key), force_bytes(value), hashlib.sha256).hexdigest()
+
+
+class PendingDecryption:
+    """
+    PendingDecryption stands in for a value SimplifyEncryptedField loads inside deferred_decryption until
+    decrypt_pending decrypts its column.
+    """
+    __slots__ = ('ciphertext', 'value')
+
+    def __init__(self, ciphertext):
+        self.ciphertext = ciphertext
+        self.value = None
+
+
+@contextmanager
+def deferred_decryption():
+    """
+    deferred_decryption makes SimplifyEncryptedFields loaded inside it return a PendingDecryption instead of decrypting
+    each value as its row is read. It yields the values collected for each field to pass to decrypt_pending.
+    """
+    pending = {}
+    token = _pending_decryption.set(pending)
+    try:
+        yield pending
+    finally:
+        _pending_decryption.reset(token)
+
+
+def decrypt_pending(pending):
+    """
+    decrypt_pending sets the value of every PendingDecryption collected by deferred_decryption, decrypting each
+    field's values with one call to the cipher for each key they were encrypted with.
+    """
+    for field, values in pending.items():
+        for value, decrypted in zip(values, field.decrypt_many([value.ciphertext for value in values])):
+            value.value = field.to_python(decrypted)
 
 
 class SimplifyEncryptedField(models.Field):
     _internal_type = 'BinaryField'
 
+    class ErrorMessages:
+        UNDECRYPTABLE_DB_VALUE = 'Value of {0} could not be decrypted with any of the keys in DB_ENCRYPTION_KEY'
+
     def __init__(self, *args, **kwargs):
         if kwargs.get('primary_key'):
             raise ImproperlyConfigured('%s does not support primary_key=True.' % self.__class__.__name__)
@@ -29,19 +133,109 @@ class SimplifyEncryptedField(models.Field):
 
         super(SimplifyEncryptedField, self).__init__(*args, **kwargs)
 
-    @cached_property
+    @property
     def keys(self):
+        # DB_ENCRYPTION_KEY is one key or a list of them. Values are encrypted with the first, the rest are there to
+        # decrypt values that haven't been re-encrypted since the key was rotated
         keys = getattr(settings, 'DB_ENCRYPTION_KEY', None)
 
         if keys is None:
             keys = [settings.SECRET_KEY]
-        return keys
+        elif isinstance(keys, (str, bytes)):
+            keys = [keys]
+        return tuple(keys)
 
     @property
     def algorithm(self):
-        IV = Random.new().read(BLOCK_SIZE)
-        if len(self.keys) > 0:
-            return AES.new(self.keys.encode(), AES.MODE_ECB)
+        return get_cipher(self.keys[0])
+
+    @cached_property
+    def blind_index(self):
+        # the SimplifyBlindIndexField kept for this field, if the model has one
+        for field in self.model._meta.concrete_fields:
+            if isinstance(field, SimplifyBlindIndexField) and field.source == self.name:
+                return field
+
+    def get_decryption_keys(self, key_id):
+        keys = self.keys
+        keys_by_id = get_keys_by_id(keys)
+        if key_id in keys_by_id:
+            return [keys_by_id[key_id]]
+        # values from before key ids were written, or from a key that isn't known, are tried with every key
+        return keys
+
+    def is_current(self, ciphertext):
+        """
+        is_current returns whether a value from the database carries the id of the first key in DB_ENCRYPTION_KEY and
+        key ids are being written, so encrypt would store it the same way. Values without a key id have to be
+        decrypted to tell.
+        """
+        return writes_key_ids() and split_ciphertext(ciphertext)[0] == get_key_id(self.keys[0])
+
+    def get_decryptions(self, ciphertexts):
+        """
+        get_decryptions decrypts a list of values from the database with every key each of them could have been
+        encrypted with, one call to the cipher for each key. Returns the (key, value) pairs each value decrypted to,
+        which is exactly one for a value that can be re-encrypted without guessing which key wrote it.
+        """
+        decryptions = [[] for ciphertext in ciphertexts]
+        groups = {}
+        for index, ciphertext in enumerate(ciphertexts):
+            key_id, blocks = split_ciphertext(bytes(ciphertext))
+            # a wrong length can't be decrypted with any key
+            if not len(blocks) % BLOCK_SIZE:
+                groups.setdefault(key_id, []).append((index, blocks))
+
+        for key_id, group in groups.items():
+            joined = b''.join([blocks for index, blocks in group])
+            for key in self.get_decryption_keys(key_id):
+                # ECB decrypts each block on its own so the values can be decrypted together and split back up
+                plaintext = get_cipher(key).decrypt(joined)
+                start = 0
+                for index, blocks in group:
+                    end = start + len(blocks)
+                    value = parse_plaintext(plaintext[start:end])
+                    if value is not None:
+                        decryptions[index].append((key, value))
+                    start = end
+        return decryptions
+
+    def decrypt_many(self, ciphertexts):
+        """
+        decrypt_many decrypts a list of values from the database back to the strings they were saved from, with one
+        call to the cipher for each key they are tried with. Values without a key id are tried with each key in order
+        and the first one that decrypts them is used, rotate_encryption_keys is what refuses values more than one key
+        decrypts.
+        """
+        values = [None] * len(ciphertexts)
+        groups = {}
+        for index, ciphertext in enumerate(ciphertexts):
+            key_id, blocks = split_ciphertext(bytes(ciphertext))
+            if len(blocks) % BLOCK_SIZE:
+                # a wrong length can't be decrypted with any key
+                raise ValidationError(self.ErrorMessages.UNDECRYPTABLE_DB_VALUE.format(self.name))
+            groups.setdefault(key_id, []).append((index, blocks))
+
+        for key_id, remaining in groups.items():
+            for key in self.get_decryption_keys(key_id):
+                # ECB decrypts each block on its own so the values can be decrypted together and split back up
+                plaintext = get_cipher(key).decrypt(b''.join([blocks for index, blocks in remaining]))
+                failed = []
+                start = 0
+                for index, blocks in remaining:
+                    end = start + len(blocks)
+                    value = parse_plaintext(plaintext[start:end])
+                    if value is None:
+                        failed.append((index, blocks))
+                    else:
+                        values[index] = value
+                    start = end
+                remaining = failed
+                if not remaining:
+                    break
+            if remaining:
+                raise ValidationError(self.ErrorMessages.UNDECRYPTABLE_DB_VALUE.format(self.name))
+        return values
 
     def get_internal_type(self):
         return self._internal_type
@@ -49,18 +243,34 @@ class SimplifyEncryptedField(models.Field):
     def get_db_prep_save(self, value, connection):
         value = super(SimplifyEncryptedField, self).get_db_prep_save(value, connection)
 
+        if hasattr(value, 'as_sql'):
+            # expressions in an update are compiled to sql as they are
+            return value
         if value is not None:
-            remainder = len(value) % BLOCK_SIZE
-            pad_length = BLOCK_SIZE - remainder
-            value += pad_length * '\0'
-            encrypted_value = self.algorithm.encrypt(value.encode())
-            return connection.Database.Binary(encrypted_value)
+            return connection.Database.Binary(self.encrypt(value))
+
+    def encrypt(self, value):
+        """
+        encrypt returns what is stored for a string, encrypted with the first key in DB_ENCRYPTION_KEY and with that
+        key's id in front when DB_ENCRYPTION_KEY_IDS is on.
+        """
+        value = value.encode()
+        remainder = len(value) % BLOCK_SIZE
+        pad_length = BLOCK_SIZE - remainder
+        value += pad_length * b'\0'
+        encrypted = self.algorithm.encrypt(value)
+        if writes_key_ids():
+            return get_key_id(self.keys[0]) + encrypted
+        return encrypted
 
     def from_db_value(self, value, expression, connection):
         if value is not None:
-            value = bytes(value)
-            decrypted_value = self.algorithm.decrypt(value).split(b'\0')[0]
-            return self.to_python(decrypted_value)
+            pending = _pending_decryption.get()
+            if pending is not None:
+                pending_value = PendingDecryption(value)
+                pending.setdefault(self, []).append(pending_value)
+                return pending_value
+            return self.to_python(self.decrypt_many([value])[0])
 
     def to_python(self, value):
         if value is not None:
@@ -75,8 +285,30 @@ def get_prep_lookup(self):
     raise FieldError("{} '{}' does not support lookups".format(self.lhs.field.__class__.__name__, self.lookup_name))
 
 
+class BlindIndexLookup:
+    """
+    BlindIndexLookup runs exact and in lookups on a SimplifyEncryptedField against its SimplifyBlindIndexField, with
+    the values hashed the same way.
+    """
+
+    def __init__(self, lhs, rhs):
+        field = getattr(lhs, 'target', None)
+        blind_index = field.blind_index if isinstance(field, SimplifyEncryptedField) else None
+        if blind_index is None or hasattr(rhs, 'resolve_expression'):
+            raise FieldError("{} '{}' lookups need a SimplifyBlindIndexField and a value to compare with".format(
+                SimplifyEncryptedField.__name__, self.lookup_name))
+        if self.lookup_name == 'in':
+            rhs = [get_blind_index(value) for value in rhs if value is not None]
+        elif rhs is not None:
+            # an exact None is turned into isnull on the encrypted field once the lookup is built
+            rhs = get_blind_index(rhs)
+        super().__init__(Col(lhs.alias, blind_index), rhs)
+
+
 for name, lookup in models.Field.class_lookups.items():
-    if name != 'isnull':
+    if name in ('exact', 'in'):
+        SimplifyEncryptedField.register_lookup(type('EncryptedField' + name, (BlindIndexLookup, lookup), {}))
+    elif name != 'isnull':
         lookup_class = type('EncryptedField' + name, (lookup,), {
             'get_prep_lookup': get_prep_lookup
         })
@@ -91,6 +323,78 @@ class SimplifyEncryptedCharField(SimplifyEncryptedField):
         super(SimplifyEncryptedCharField, self).__init__(*args, **kwargs)
 
 
+class SimplifyBlindIndexField(models.CharField):
+    """
+    SimplifyBlindIndexField keeps a keyed hash of the SimplifyEncryptedField named in source, set every time the model
+    is saved. Exact and in filters on the encrypted field are run against this column so they can use its index.
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        if not source:
+            raise ImproperlyConfigured('%s needs the name of the field it indexes in source.' % self.__class__.__name__)
+        self.source = source
+        kwargs.setdefault('max_length', 64)
+        kwargs.setdefault('db_index', True)
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('blank', True)
+        kwargs['editable'] = False
+        super(SimplifyBlindIndexField, self).__init__(*args, **kwargs)
+
+    def check(self, **kwargs):
+        errors = super(SimplifyBlindIndexField, self).check(**kwargs)
+        try:
+            source = self.model._meta.get_field(self.source)
+        except FieldDoesNotExist:
+            source = None
+        if not isinstance(source, SimplifyEncryptedField):
+            errors.append(checks.Error(
+                "source '{}' is not a SimplifyEncryptedField on {}".format(self.source, self.model.__name__),
+                obj=self
+            ))
+        return errors
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(SimplifyBlindIndexField, self).deconstruct()
+        kwargs['source'] = self.source
+        del kwargs['editable']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.model._meta.get_field(self.source).attname)
+        value = None if value is None else get_blind_index(value)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def loads_lazily():
+    # a LazyJson isn't a real dict or list, so type() checks and json encoders that don't know it break on it
+    return getattr(settings, 'SIMPLIFY_LAZY_JSON_TEXT', False)
+
+
+class LazyJson(SimpleLazyObject):
+    """
+    LazyJson is what SimplifyJsonTextField loads when SIMPLIFY_LAZY_JSON_TEXT is on. It behaves like the decoded value,
+    isinstance checks included, but the text isn't decoded until the value is first used. raw is the text as it was
+    loaded.
+    """
+
+    def __init__(self, raw):
+        self.__dict__['raw'] = raw
+        super().__init__(lambda: SimplifyJsonTextField.decode(raw))
+
+    @property
+    def is_decoded(self):
+        return self._wrapped is not empty
+
+    @property
+    def is_raw_camelcase(self):
+        """
+        is_raw_camelcase returns whether raw can be sent in place of the value camelcased: it hasn't been decoded, so
+        it can't have been changed, and has no underscores that camelcasing could remove from its keys.
+        """
+        return not self.is_decoded and '_' not in self.raw and '\\u' not in self.raw
+
+
 class SimplifyJsonTextField(models.TextField):
 
     class ErrorMessages:
@@ -100,19 +404,30 @@ class SimplifyJsonTextField(models.TextField):
     def __init__(self, *args, db_collation=None, **kwargs):
         super().__init__(*args, db_collation, **kwargs)
 
-    def from_db_value(self, value, expression, connection):
-        if value is None:
-            return value
-
+    @staticmethod
+    def decode(value):
         try:
-            new_value = json.loads(value)
+            return loads(value)
         except Exception as e:
             raise ValidationError(SimplifyJsonTextField.ErrorMessages.INVALID_DB_VALUE
                                   .format(str(value)))
 
-        return new_value
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+
+        if loads_lazily():
+            # decoding waits until the value is used, which it may never be
+            return LazyJson(value)
+        return self.decode(value)
 
     def to_python(self, value):
+        if type(value) is LazyJson:
+            if not value.is_decoded:
+                # nothing can have changed so the text is saved back as it was loaded
+                return value.raw
+            value = value._wrapped
+
         if isinstance(value, str):
             return value
 
@@ -120,9 +435,19 @@ class SimplifyJsonTextField(models.TextField):
             return value
 
         try:
-            new_value = json.dumps(value)
+            new_value = dumps(value)
         except Exception as e:
             raise ValidationError(SimplifyJsonTextField.ErrorMessages.INVALID_PYTHON_VALUE
                                   .format(str(value)))
 
         return new_value
+
+    def validate(self, value, model_instance):
+        # text is saved as it is given, it is only checked to be json when the model is cleaned
+        super().validate(value, model_instance)
+        if isinstance(value, str):
+            try:
+                loads(value)
+            except Exception as e:
+                raise ValidationError(SimplifyJsonTextField.ErrorMessages.INVALID_PYTHON_VALUE
+                                      .format(str(value)))
@@ -0,0 +1,123 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+
+from rest_framework_simplify.registry import get_model_capabilities
+
+
+class RelatedLookups:
+    """
+    RelatedLookups is what a queryset needs to load the relations in a list of includes: the relations to join with
+    select_related, the Prefetches for the rest and the columns to pass to only() so the serializer's unused columns
+    never leave the database. only is None when every column has to be loaded.
+    """
+
+    def __init__(self):
+        self.only = set()
+        self.select_related = []
+        self.prefetch_related = []
+
+    def apply(self, obj):
+        if self.select_related:
+            obj = obj.select_related(*self.select_related)
+        if self.prefetch_related:
+            obj = obj.prefetch_related(*self.prefetch_related)
+        if self.only is not None:
+            obj = obj.only(*sorted(self.only))
+        return obj
+
+
+def get_relation_field(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation and field.related_model is not None else None
+
+
+def is_single_forward(field):
+    return field.concrete and (field.many_to_one or field.one_to_one)
+
+
+def get_columns(model, fields, includes):
+    """
+    get_columns returns the columns the serializer reads from model when it is serialized with fields and includes,
+    or None when an included property hasn't declared the columns it depends on in get_property_dependencies. Without
+    fields that is every column but the heavy ones.
+    """
+    capabilities = get_model_capabilities(model)
+    columns = {model._meta.pk.name}
+    for field in model._meta.concrete_fields:
+        # the serializer still writes the id of an excluded foreign key, so its column has to be loaded
+        if field.name in capabilities.excludes and not (field.many_to_one or field.one_to_one):
+            continue
+        if fields:
+            if field.name in fields or field.attname in fields:
+                columns.add(field.name)
+        elif field.name not in capabilities.heavy_fields:
+            columns.add(field.name)
+
+    for include in includes:
+        name = include.split('__', 1)[0]
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            if name not in capabilities.property_dependencies:
+                return None
+            columns.update(capabilities.property_dependencies[name])
+            continue
+        if field.concrete and not field.many_to_many:
+            columns.add(field.name)
+    return columns
+
+
+def get_related_lookups(model, includes, fields, using=None):
+    """
+    get_related_lookups works out how to load includes for a queryset of model. Forward foreign keys and one to ones
+    that hang off model, or off a relation that is joined, are joined with select_related. Anything else gets a
+    Prefetch of its own so its columns can be limited too.
+    """
+    lookups = RelatedLookups()
+    add_level(lookups, model, includes, fields, using)
+    return lookups
+
+
+def add_level(lookups, model, includes, fields, using, lookup='', relation_field=None, joined=True):
+    columns = get_columns(model, fields, includes)
+    if columns is not None and not joined:
+        # a prefetched level needs the column its rows are matched back to their parents on
+        if not relation_field.concrete and not relation_field.many_to_many:
+            columns.add(relation_field.field.name)
+        elif is_single_forward(relation_field):
+            columns.add(relation_field.target_field.name)
+
+    if joined:
+        if columns is None or lookups.only is None:
+            lookups.only = None
+        else:
+            lookups.only.update(lookup + '__' + column if lookup else column for column in columns)
+    else:
+        # the same managers Django prefetches with when it isn't given a queryset
+        manager = model._base_manager if is_single_forward(relation_field) else model._default_manager
+        queryset = manager.all()
+        if using:
+            queryset = queryset.using(using)
+        if columns is not None:
+            queryset = queryset.only(*sorted(columns))
+        lookups.prefetch_related.append(Prefetch(lookup, queryset=queryset))
+
+    # group the includes by the relation they start with the same way the serializer does
+    related_includes = {}
+    for include in includes:
+        name, _, rest = include.partition('__')
+        field = get_relation_field(model, name)
+        if field is not None:
+            related_includes.setdefault(name, (field, []))
+            if rest:
+                related_includes[name][1].append(rest)
+
+    for name, (field, rest) in related_includes.items():
+        related_lookup = lookup + '__' + name if lookup else name
+        related_joined = joined and is_single_forward(field)
+        if related_joined:
+            lookups.select_related.append(related_lookup)
+        add_level(lookups, field.related_model, rest, fields, using, related_lookup, field, related_joined)
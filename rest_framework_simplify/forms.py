@@ -1,8 +1,14 @@
 import datetime
+import logging
 import re
+import threading
 import requests
+from importlib import import_module
 
 from django import forms
+from django.conf import settings
+from django.db import connections
+from django.core.signals import request_started
 
 from rest_framework_simplify.exceptions import EmailTemplateException
 from rest_framework_simplify.helpers import handle_bytes_decoding
@@ -39,9 +45,8 @@ class StoredProcedureForm(forms.Form):
             'port': connection_data.get('port', None)
         }
 
-    def execute_sp(self):
-        # call stored procedure
-        sp_service = SQLExecutorService(
+    def get_sp_service(self):
+        return SQLExecutorService(
             self.connection_data['server'],
             self.connection_data['database'],
             self.connection_data['username'],
@@ -49,7 +54,10 @@ class StoredProcedureForm(forms.Form):
             port=self.connection_data['port'],
             engine=self.engine
         )
-        result = sp_service.call_stored_procedure(self.sp_name, self._formatter)
+
+    def execute_sp(self):
+        # call stored procedure
+        result = self.get_sp_service().call_stored_procedure(self.sp_name, self._formatter)
 
         for item in result:
             handle_bytes_decoding(item)
@@ -95,6 +103,65 @@ class StoredProcedureForm(forms.Form):
                 raise KeyError
         return params
 
+
+def get_stored_procedure_forms(form_cls=StoredProcedureForm):
+    form_classes = []
+    for subclass in form_cls.__subclasses__():
+        form_classes.append(subclass)
+        form_classes.extend(get_stored_procedure_forms(subclass))
+    return form_classes
+
+
+def warm_stored_procedure_signatures():
+    """
+    warm_stored_procedure_signatures reads the parameters of the procedure behind every StoredProcedureForm subclass
+    that has been imported into the signature cache, so the first call to each doesn't have to. A form whose procedure
+    can't be read is logged and skipped. Returns the procedure names that were read.
+    """
+    warmed = []
+    for form_cls in get_stored_procedure_forms():
+        try:
+            form = form_cls()
+            if form.sp_name:
+                form.get_sp_service().get_procedure_params(form.sp_name)
+                warmed.append(form.sp_name)
+        except Exception:
+            logging.getLogger('rest-framework-simplify').warning('Could not read the parameters for %s',
+                                                                 form_cls.__name__, exc_info=True)
+    return warmed
+
+
+_warm_lock = threading.Lock()
+
+
+def warm_signatures_on_first_request(sender, **kwargs):
+    """
+    warm_signatures_on_first_request starts warming the signature cache in a thread of its own when a process gets its
+    first request, then disconnects itself. The cache belongs to the process, so each one warms its own, and the
+    request doesn't wait on databases that are slow to connect to. Returns the thread, or None after the first request.
+    """
+    with _warm_lock:
+        # only the first request to get the lock still finds the handler connected
+        if not request_started.disconnect(warm_signatures_on_first_request, dispatch_uid='simplify_warm_sp_signatures'):
+            return None
+    thread = threading.Thread(target=warm_signatures_in_background, name='simplify-warm-sp-signatures', daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_signatures_in_background():
+    try:
+        for module in getattr(settings, 'SIMPLIFY_WARM_SP_SIGNATURES', []):
+            import_module(module)
+        warm_stored_procedure_signatures()
+    except Exception:
+        logging.getLogger('rest-framework-simplify').warning('Could not warm the stored procedure signatures',
+                                                             exc_info=True)
+    finally:
+        # connections django opened for this thread would otherwise stay open until the process exits
+        connections.close_all()
+
+
 class EmailTemplateForm(forms.Form):
 
     class ErrorMessages:
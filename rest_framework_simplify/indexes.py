@@ -0,0 +1,20 @@
+from django.db.models import Index
+from django.db.models.functions import Upper
+
+
+class RevicontainsIndex(Index):
+    """
+    RevicontainsIndex indexes UPPER(field) so __revicontains filters on the field can use an index. Add it to the
+    model's Meta.indexes and makemigrations will generate the migration for it:
+
+        class Meta:
+            indexes = [RevicontainsIndex('prefix', name='phoneprefix_prefix_revicontains')]
+    """
+
+    def __init__(self, field_name, name):
+        self.field_name = field_name
+        super().__init__(Upper(field_name), name=name)
+
+    def deconstruct(self):
+        path = '{0}.{1}'.format(self.__class__.__module__, self.__class__.__name__)
+        return path, (self.field_name,), {'name': self.name}
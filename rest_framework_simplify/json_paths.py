@@ -0,0 +1,126 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Func, JSONField
+from rest_framework import status
+
+from rest_framework_simplify.errors import ErrorMessages
+from rest_framework_simplify.exceptions import SimplifyAPIException
+from rest_framework_simplify.fields import SimplifyJsonTextField
+from rest_framework_simplify.mapper import Mapper
+
+
+class JsonPath:
+    """
+    JsonPath is a path to a value inside a SimplifyJsonTextField asked for in the fields query param, e.g.
+    jsonText.status. alias is the name the value is annotated under when it is read in the database.
+    """
+
+    def __init__(self, field_name, keys, alias):
+        self.field_name = field_name
+        self.keys = keys
+        self.alias = alias
+
+
+def parse_json_paths(model, req_fields, requested_fields, excludes):
+    """
+    parse_json_paths returns the paths into model's json text fields in req_fields. The field name is camelcased like
+    any other and the keys after it are the keys as they are stored. Paths into a field that is asked for whole, and
+    paths inside another path that is asked for, are dropped since the values are returned anyway.
+    """
+    paths = []
+    for req_field in req_fields:
+        name, _, path = req_field.strip().partition('.')
+        if not path:
+            continue
+        field_name = Mapper.camelcase_to_underscore(name)
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            continue
+        if not isinstance(field, SimplifyJsonTextField) or field_name in excludes or field_name in requested_fields:
+            continue
+
+        keys = tuple(path.split('.'))
+        if not all(keys):
+            raise SimplifyAPIException(ErrorMessages.INVALID_JSON_PATH.format(req_field.strip()),
+                                       status.HTTP_400_BAD_REQUEST)
+        paths.append((field_name, keys))
+
+    json_paths = []
+    for field_name, keys in paths:
+        if any(other_name == field_name and len(other_keys) < len(keys) and keys[:len(other_keys)] == other_keys
+               for other_name, other_keys in paths):
+            continue
+        if any(json_path.field_name == field_name and json_path.keys == keys for json_path in json_paths):
+            continue
+        json_paths.append(JsonPath(field_name, keys, 'json_path_{0}'.format(len(json_paths))))
+    return json_paths
+
+
+class JsonPathValue(Func):
+    """
+    JsonPathValue reads the value at keys in a json text column with #>, which takes a key made of digits as an object
+    key or an array index depending on what it is walking, like get_json_path_value. The text is only cast to jsonb
+    when it is json, so a document that isn't has null at every path rather than failing the whole query.
+    """
+    output_field = JSONField()
+
+    def __init__(self, field_name, keys):
+        super().__init__(F(field_name))
+        self.keys = list(keys)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return 'CASE WHEN {0} IS JSON THEN ({0})::jsonb #> %s END'.format(sql), (*params, *params, self.keys)
+
+
+def can_read_json_paths_in_database(connection):
+    # IS JSON is new in postgres 16, older versions read the paths out of the loaded documents
+    return connection.vendor == 'postgresql' and connection.pg_version >= 160000
+
+
+def get_json_path_expressions(json_paths):
+    """
+    get_json_path_expressions returns the expressions that read each path in the database, keyed by its alias. Only
+    the values at the paths are sent back.
+    """
+    return {json_path.alias: JsonPathValue(json_path.field_name, json_path.keys) for json_path in json_paths}
+
+
+def get_json_path_value(document, keys):
+    # mirrors #>, which is null for a path that isn't in the document
+    for key in keys:
+        if isinstance(document, dict):
+            document = document.get(key)
+        elif isinstance(document, list) and key.isdigit() and int(key) < len(document):
+            document = document[int(key)]
+        else:
+            return None
+    return document
+
+
+def project_json_paths(item, json_paths, in_database):
+    """
+    project_json_paths replaces the json text fields item has paths for with documents holding only the values at
+    those paths. item is a row from values() or a model instance. When the paths were read in the database the values
+    are taken from their aliases, otherwise they are picked out of the loaded documents.
+    """
+    is_row = isinstance(item, dict)
+    projections = {}
+    for json_path in json_paths:
+        if in_database:
+            value = item.pop(json_path.alias) if is_row else item.__dict__.pop(json_path.alias)
+        else:
+            document = item[json_path.field_name] if is_row else getattr(item, json_path.field_name)
+            value = get_json_path_value(document, json_path.keys)
+
+        projection = projections.setdefault(json_path.field_name, {})
+        for key in json_path.keys[:-1]:
+            projection = projection.setdefault(key, {})
+        projection[json_path.keys[-1]] = value
+
+    for field_name, projection in projections.items():
+        if is_row:
+            item[field_name] = projection
+        else:
+            # set straight on the instance so a column that was never loaded isn't fetched to be replaced
+            item.__dict__[field_name] = projection
@@ -0,0 +1,77 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import BinaryField, ExpressionWrapper, F
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def get_stored(field):
+    # reads the bytes in an encrypted column rather than letting the field decrypt them
+    return ExpressionWrapper(F(field.name), output_field=BinaryField())
+
+
+class BatchCommand(BaseCommand):
+    """
+    BatchCommand works through a model's rows in primary key order, locking and updating batch_size rows at a time in
+    a transaction of their own so it can run against a live table. Subclasses say which columns to read in get_columns
+    and update a batch in update_batch.
+    """
+    verb = 'Updated'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='model to update, as app_label.ModelName')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='number of rows locked and updated at a time')
+        parser.add_argument('--sleep', type=float, default=0, help='seconds to wait between batches')
+        parser.add_argument('--start-after', default=None,
+                            help='primary key to resume after, the last one of each batch is printed as it finishes')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError):
+            raise CommandError('{0} is not a model. Use app_label.ModelName.'.format(options['model']))
+
+        columns = self.get_columns(model, options)
+        database = options['database']
+        batch_size = options['batch_size']
+        last_pk = options['start_after']
+        rows = updated = 0
+        while True:
+            with transaction.atomic(using=database):
+                queryset = model._base_manager.using(database).select_for_update().order_by('pk')
+                if last_pk is not None:
+                    queryset = queryset.filter(pk__gt=last_pk)
+                batch = list(queryset.annotate(**columns).values_list('pk', *columns)[:batch_size])
+                if not batch:
+                    break
+                batch_updated = self.update_batch(model, batch, database, options)
+            rows += len(batch)
+            updated += batch_updated
+            last_pk = batch[-1][0]
+            self.stdout.write('{0} {1} of {2} rows up to {3} {4}'.format(self.verb, batch_updated, len(batch),
+                                                                         model._meta.pk.name, last_pk))
+            if len(batch) < batch_size:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS('{0} {1} of {2} {3} rows'.format(self.verb, updated, rows,
+                                                                              model.__name__)))
+
+    def get_columns(self, model, options):
+        """
+        get_columns returns the expressions to read for each row, keyed by name. Rows are passed to update_batch as
+        tuples of the primary key followed by these in order.
+        """
+        raise NotImplementedError('subclasses of BatchCommand must provide a get_columns() method')
+
+    def update_batch(self, model, batch, database, options):
+        """
+        update_batch updates a locked batch of rows and returns how many it changed.
+        """
+        raise NotImplementedError('subclasses of BatchCommand must provide an update_batch() method')
@@ -0,0 +1,48 @@
+from django.core.management.base import CommandError
+from django.db.models import Case, CharField, F, Value, When
+
+from rest_framework_simplify.fields import SimplifyBlindIndexField, get_blind_index
+from rest_framework_simplify.management.base import BatchCommand, get_stored
+
+
+class Command(BatchCommand):
+    help = 'Fills the blind indexes of a model for rows saved before they were added, a batch of rows at a time so ' \
+           'it can run against a live table'
+    verb = 'Filled'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--rebuild', action='store_true',
+                            help='recompute every row rather than only empty ones, e.g. after DB_BLIND_INDEX_KEY '
+                                 'changes')
+
+    def get_columns(self, model, options):
+        self.blind_indexes = [field for field in model._meta.concrete_fields
+                              if isinstance(field, SimplifyBlindIndexField)]
+        if not self.blind_indexes:
+            raise CommandError('{0} has no blind indexes'.format(model.__name__))
+        columns = {}
+        for blind_index in self.blind_indexes:
+            columns['stored_' + blind_index.name] = get_stored(model._meta.get_field(blind_index.source))
+            columns['current_' + blind_index.name] = F(blind_index.name)
+        return columns
+
+    def update_batch(self, model, batch, database, options):
+        updated_pks = set()
+        updates = {}
+        for index, blind_index in enumerate(self.blind_indexes):
+            source = model._meta.get_field(blind_index.source)
+            stored, current = 1 + index * 2, 2 + index * 2
+            rows = [row for row in batch if row[stored] is not None and (options['rebuild'] or row[current] is None)]
+            hashes = [get_blind_index(value) for value in source.decrypt_many([row[stored] for row in rows])]
+            changes = [(row[0], hashed) for row, hashed in zip(rows, hashes) if hashed != row[current]]
+            # an index left behind by a value that has since been emptied
+            changes += [(row[0], None) for row in batch if row[stored] is None and row[current] is not None]
+            if changes:
+                updates[blind_index.name] = Case(*[When(pk=pk, then=Value(hashed)) for pk, hashed in changes],
+                                                 default=F(blind_index.name), output_field=CharField())
+                updated_pks.update(pk for pk, hashed in changes)
+
+        if updates:
+            model._base_manager.using(database).filter(pk__in=updated_pks).update(**updates)
+        return len(updated_pks)
@@ -0,0 +1,62 @@
+from django.core.management.base import CommandError
+from django.db.models import BinaryField, Case, F, Value, When
+
+from rest_framework_simplify.fields import SimplifyEncryptedField
+from rest_framework_simplify.management.base import BatchCommand, get_stored
+
+
+class Command(BatchCommand):
+    help = 'Re-encrypts the encrypted fields of a model with the first key in DB_ENCRYPTION_KEY, a batch of rows at ' \
+           'a time so it can run against a live table'
+    verb = 'Re-encrypted'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--fields', default=None,
+                            help='comma separated encrypted fields to re-encrypt, defaults to all of them')
+
+    def get_columns(self, model, options):
+        fields = [field for field in model._meta.concrete_fields if isinstance(field, SimplifyEncryptedField)]
+        if options['fields']:
+            names = [name.strip() for name in options['fields'].split(',')]
+            for name in names:
+                if name not in [field.name for field in fields]:
+                    raise CommandError('{0} is not an encrypted field on {1}'.format(name, model.__name__))
+            fields = [field for field in fields if field.name in names]
+        if not fields:
+            raise CommandError('{0} has no encrypted fields'.format(model.__name__))
+        self.fields = fields
+        return {'stored_' + field.name: get_stored(field) for field in fields}
+
+    def update_batch(self, model, batch, database, options):
+        """
+        update_batch re-encrypts the values in a batch that aren't stored the way they would be encrypted now. Values
+        are re-encrypted as they were stored rather than as the model reads them, so fields with display_chars keep the
+        whole value. A value that doesn't decrypt with exactly one key stops the command before anything in the batch
+        is written, since re-encrypting it would make a guess permanent.
+        """
+        updated_pks = set()
+        updates = {}
+        for index, field in enumerate(self.fields, start=1):
+            stored = [(row[0], bytes(row[index])) for row in batch
+                      if row[index] is not None and not field.is_current(row[index])]
+            stale = []
+            for (pk, ciphertext), decryptions in zip(stored, field.get_decryptions([c for pk, c in stored])):
+                if len(decryptions) != 1:
+                    raise CommandError('{0} of {1} {2} {3} decrypts with {4} of the keys in DB_ENCRYPTION_KEY, '
+                                       'it has to decrypt with exactly one to be re-encrypted'.format(
+                                           field.name, model.__name__, model._meta.pk.name, pk, len(decryptions)))
+                encrypted = field.encrypt(decryptions[0][1])
+                if encrypted != ciphertext:
+                    stale.append((pk, encrypted))
+            if not stale:
+                continue
+            updates[field.name] = Case(
+                *[When(pk=pk, then=Value(encrypted, output_field=BinaryField())) for pk, encrypted in stale],
+                default=F(field.name), output_field=BinaryField()
+            )
+            updated_pks.update(pk for pk, encrypted in stale)
+
+        if updates:
+            model._base_manager.using(database).filter(pk__in=updated_pks).update(**updates)
+        return len(updated_pks)
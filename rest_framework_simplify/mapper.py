@@ -1,5 +1,7 @@
 import re
 
+from rest_framework_simplify.fields import LazyJson
+
 
 class Mapper:
 
@@ -87,6 +89,10 @@ class Mapper:
 
     @staticmethod
     def dict_underscore_to_camelcase(obj):
+        # checked first since isinstance would decode it
+        if type(obj) is LazyJson and obj.is_raw_camelcase:
+            return obj
+
         if isinstance(obj, dict):
             return {
                 Mapper.string_underscore_to_camelcase(key) : Mapper.dict_underscore_to_camelcase(value)
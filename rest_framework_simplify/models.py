@@ -1,17 +1,84 @@
 import datetime
 import decimal
 
+from itertools import islice
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
-from django.db.models import Model as DjangoModel
+from django.db.models import JSONField, Model as DjangoModel, QuerySet, prefetch_related_objects
+from django.db.models.signals import class_prepared
 from django.db.models.fields import BinaryField, DateTimeField as DjangoDateTimeField, DecimalField
 from django.db.models.fields.related import ForeignKey as DjangoForeignKey, OneToOneField
+from django.utils.functional import cached_property
+from rest_framework.utils.encoders import JSONEncoder
 
-from .fields import SimplifyEncryptedField, SimplifyEncryptedCharField
+from .fields import PendingDecryption, SimplifyEncryptedField, SimplifyEncryptedCharField, decrypt_pending, \
+    deferred_decryption
 from .errors import ErrorMessages
 from .exceptions import ParseException
 from .helpers import parse_binary, parse_date
 from .mapper import Mapper
+from .read_models import deferred_refreshes
+
+
+def resolve_pending_decryption(item):
+    """
+    resolve_pending_decryption swaps every PendingDecryption in a model instance, including the ones it joined with
+    select_related, or in a row from values() or values_list() for its decrypted value. Annotations that read an
+    encrypted column, like annotate(copy=F('encrypted_val')), are swapped along with the fields themselves.
+    """
+    if isinstance(item, PendingDecryption):
+        return item.value
+    if isinstance(item, DjangoModel):
+        data = item.__dict__
+        for key, value in data.items():
+            if type(value) is PendingDecryption:
+                data[key] = value.value
+        for related_item in item._state.fields_cache.values():
+            if related_item is not None:
+                resolve_pending_decryption(related_item)
+    elif isinstance(item, dict):
+        for key, value in item.items():
+            if type(value) is PendingDecryption:
+                item[key] = value.value
+    elif isinstance(item, tuple):
+        values = [value.value if isinstance(value, PendingDecryption) else value for value in item]
+        # values_list(named=True) rows are namedtuples
+        item = item._make(values) if hasattr(item, '_make') else tuple(values)
+    return item
+
+
+def fetch_decrypted(rows):
+    with deferred_decryption() as pending:
+        rows = list(rows)
+    if not pending:
+        return rows
+    decrypt_pending(pending)
+    return [resolve_pending_decryption(row) for row in rows]
+
+
+class SimplifyQuerySet(QuerySet):
+    """
+    SimplifyQuerySet decrypts the SimplifyEncryptedFields it loads a column at a time once its rows have been read,
+    rather than a value at a time as each row is read.
+    """
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            self._result_cache = fetch_decrypted(self._iterable_class(self))
+        # prefetches run as usual once the rows are decrypted
+        super()._fetch_all()
+
+    def _iterator(self, use_chunked_fetch, chunk_size):
+        # iterator() decrypts and prefetches a chunk at a time
+        batch_size = chunk_size or 2000
+        rows = iter(self._iterable_class(self, chunked_fetch=use_chunked_fetch, chunk_size=batch_size))
+        while True:
+            results = fetch_decrypted(islice(rows, batch_size))
+            if not results:
+                return
+            if self._prefetch_related_lookups and chunk_size is not None:
+                prefetch_related_objects(results, *self._prefetch_related_lookups)
+            yield from results
 
 
 class SimplifyModel(DjangoModel):
@@ -19,32 +86,41 @@ class SimplifyModel(DjangoModel):
     class Meta:
         abstract = True
 
+    objects = SimplifyQuerySet.as_manager()
+
     parseable_levels = 1
     resource_mapping = {}
 
-    def __init__(self, *args, **kwargs):
-        super(SimplifyModel, self).__init__(*args, **kwargs)
-        self.related_items_to_be_saved = []
-        self.encrypted_fields = []
-        if hasattr(self, 'change_tracking_fields'):
-            for x in self._meta.local_concrete_fields:
-                if x.name in self.change_tracking_fields:
-                    setattr(self, '_{0}_initial'.format(x.attname), self.__dict__.get(x.attname))
+    @cached_property
+    def related_items_to_be_saved(self):
+        return []
+
+    @cached_property
+    def encrypted_fields(self):
+        return []
 
     def change_tracking_field_has_changed(self, field_name):
         if hasattr(self, 'change_tracking_fields') and field_name in self.change_tracking_fields:
             field = self._meta.get_field(field_name)
-            return getattr(self, '_{0}_initial'.format(field.attname)) != getattr(self, field.attname)
+            return self._get_change_tracking_initial(field.attname) != getattr(self, field.attname)
         else:
             raise Exception('{0} is not in the change_tracking_fields attribute'.format(field_name))
 
     def get_change_tracking_field_initial_value(self, field_name):
         if hasattr(self, 'change_tracking_fields') and field_name in self.change_tracking_fields:
             field = self._meta.get_field(field_name)
-            return getattr(self, '_{0}_initial'.format(field.attname))
+            return self._get_change_tracking_initial(field.attname)
         else:
             raise Exception('{0} is not in the change_tracking_fields attribute'.format(field_name))
 
+    def _get_change_tracking_initial(self, attname):
+        # the snapshot only holds fields that have been written since the instance was loaded, anything else
+        # still has its initial value
+        initial = self.__dict__.get('_change_tracking_initial')
+        if initial is not None and attname in initial:
+            return initial[attname]
+        return self.__dict__.get(attname)
+
     @classmethod
     def parse(cls, data, existing_id=None, reference_fields=None, current_parse_level=1, request=None):
         """Parses a dictionary into a domain model.
@@ -194,12 +270,14 @@ class SimplifyModel(DjangoModel):
         return obj
 
     def cascade_save(self, write_db='default'):
-        # todo: check into optimizing this with a possible related_item.reload instead of setting the attr
-        for related_item_to_be_saved in self.related_items_to_be_saved:
-            related_item = getattr(self, related_item_to_be_saved)
-            related_item.cascade_save(write_db=write_db)
-            setattr(self, related_item_to_be_saved, related_item)
-        self.save(using=write_db)
+        # read models are refreshed once every related item has been saved rather than after each save
+        with deferred_refreshes():
+            # todo: check into optimizing this with a possible related_item.reload instead of setting the attr
+            for related_item_to_be_saved in self.related_items_to_be_saved:
+                related_item = getattr(self, related_item_to_be_saved)
+                related_item.cascade_save(write_db=write_db)
+                setattr(self, related_item_to_be_saved, related_item)
+            self.save(using=write_db)
 
     @classmethod
     def get_meta_data(cls):
@@ -225,3 +303,71 @@ class SimplifyModel(DjangoModel):
     def parseable_related_fields(self):
         return []
 
+
+class SimplifyReadModel(DjangoModel):
+    """
+    SimplifyReadModel is a table holding a source model's items already serialized with a set of includes, so a
+    SimplifyView listing them with those includes reads one row per item instead of joining and prefetching every
+    related table. The primary key has to be a OneToOneField to the source model:
+
+        class BasicClassReadModel(SimplifyReadModel):
+            source = models.OneToOneField(BasicClass, primary_key=True, on_delete=models.CASCADE)
+            include = ['child_one__nested_child', 'child_three']
+
+    Rows are refreshed when the source item or anything it includes is saved, deleted or linked.
+    """
+
+    class Meta:
+        abstract = True
+
+    include = []
+
+    data = JSONField(encoder=JSONEncoder)
+
+
+
+class ChangeTrackingAttribute:
+    """
+    ChangeTrackingAttribute is mixed into the attribute class of a field listed in change_tracking_fields. Instances
+    loaded from the db don't pay anything for change tracking until a tracked field is written to again, at which
+    point the value it is replacing is stored in the instance's _change_tracking_initial dict. The write itself is
+    left to the field's own attribute, e.g. so a foreign key still clears the related item it has cached.
+    """
+
+    def __set__(self, instance, value):
+        data = instance.__dict__
+        attname = self.field.attname
+        if attname in data:
+            initial = data.get('_change_tracking_initial')
+            if initial is None:
+                initial = data['_change_tracking_initial'] = {}
+            if attname not in initial:
+                initial[attname] = data[attname]
+
+        set_value = getattr(super(), '__set__', None)
+        if set_value is None:
+            # DeferredAttribute doesn't define __set__, values are written straight to the instance
+            data[attname] = value
+        else:
+            set_value(instance, value)
+
+
+_change_tracking_attribute_classes = {}
+
+
+def get_change_tracking_attribute_class(descriptor_class):
+    if descriptor_class not in _change_tracking_attribute_classes:
+        _change_tracking_attribute_classes[descriptor_class] = type(
+            'ChangeTracking' + descriptor_class.__name__, (ChangeTrackingAttribute, descriptor_class), {})
+    return _change_tracking_attribute_classes[descriptor_class]
+
+
+def add_change_tracking_attributes(sender, **kwargs):
+    if not issubclass(sender, SimplifyModel) or not hasattr(sender, 'change_tracking_fields'):
+        return
+    for field in sender._meta.local_concrete_fields:
+        if field.name in sender.change_tracking_fields:
+            setattr(sender, field.attname, get_change_tracking_attribute_class(field.descriptor_class)(field))
+
+
+class_prepared.connect(add_change_tracking_attributes)
@@ -0,0 +1,263 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router
+from django.db.models import OneToOneField
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from rest_framework_simplify.errors import ErrorMessages
+from rest_framework_simplify.fieldsets import get_related_lookups, get_relation_field
+from rest_framework_simplify.registry import get_model_capabilities
+from rest_framework_simplify.serializer import SQLEngineSerializer
+
+# source items read and serialized at a time when a whole read model is refreshed
+DEFAULT_REFRESH_CHUNK_SIZE = 500
+
+# model -> [(read_model, lookup from the read model's source model to it, whether a save can move its links)]
+_dependencies = {}
+# m2m through model -> [(read_model, lookup for the model the field is on, lookup for the model it points to)]
+_m2m_dependencies = {}
+# (read_model, using) -> source primary keys waiting to be refreshed inside deferred_refreshes
+_pending_refreshes = ContextVar('simplify_pending_refreshes', default=None)
+
+
+def get_source_model(read_model):
+    return read_model._meta.pk.related_model
+
+
+def get_data_lookup(read_model):
+    # what the source model's querysets join the read model's data on
+    return read_model._meta.pk.related_query_name() + '__data'
+
+
+def get_serializer(read_model):
+    source_model = get_source_model(read_model)
+    return SQLEngineSerializer(include=list(read_model.include),
+                               exclude=list(get_model_capabilities(source_model).excludes))
+
+
+def refresh_read_model(read_model, pks=None, using='default', chunk_size=DEFAULT_REFRESH_CHUNK_SIZE):
+    """
+    refresh_read_model serializes the source items with a primary key in pks, or every source item when pks is None,
+    and writes them to read_model. Rows for items that no longer exist are deleted. Returns the data written keyed by
+    primary key.
+    """
+    source_model = get_source_model(read_model)
+    if pks is None:
+        pks = source_model._base_manager.using(using).order_by('pk').values_list('pk', flat=True)
+    pks = list(pks)
+
+    refreshed = {}
+    for start in range(0, len(pks), chunk_size):
+        refreshed.update(refresh_read_model_rows(read_model, pks[start:start + chunk_size], using))
+    return refreshed
+
+
+def serialize_read_model_rows(read_model, pks, using):
+    """
+    serialize_read_model_rows serializes the source items with a primary key in pks the way read_model holds them,
+    without writing anything. Returns the data keyed by primary key, items that don't exist are left out.
+    """
+    source_model = get_source_model(read_model)
+    serializer = get_serializer(read_model)
+    items = get_related_lookups(source_model, read_model.include, [], using) \
+        .apply(source_model._base_manager.using(using).filter(pk__in=pks))
+    return {item.pk: serializer.serialize(item) for item in items}
+
+
+def refresh_read_model_rows(read_model, pks, using):
+    refreshed = serialize_read_model_rows(read_model, pks, using)
+
+    manager = read_model._base_manager.using(using)
+    if refreshed:
+        pk_field = read_model._meta.pk
+        manager.bulk_create(
+            [read_model(**{pk_field.attname: pk, 'data': data}) for pk, data in refreshed.items()],
+            update_conflicts=True, unique_fields=[pk_field.name], update_fields=['data']
+        )
+    deleted = set(pks) - set(refreshed)
+    if deleted:
+        manager.filter(pk__in=deleted).delete()
+    return refreshed
+
+
+@contextmanager
+def deferred_refreshes():
+    """
+    deferred_refreshes holds back the read model refreshes signalled inside it and runs them together on the way out,
+    so saving an item along with its related items refreshes each affected row once. Nothing is refreshed if the
+    block raises.
+    """
+    if _pending_refreshes.get() is not None:
+        yield
+        return
+
+    pending = {}
+    token = _pending_refreshes.set(pending)
+    try:
+        yield
+    finally:
+        _pending_refreshes.reset(token)
+    for (read_model, using), pks in pending.items():
+        refresh_read_model(read_model, pks, using)
+
+
+def queue_refresh(read_model, pks, using):
+    # routers can keep a read model off some of the databases its source model is on
+    if not pks or not router.allow_migrate_model(using, read_model):
+        return
+    pending = _pending_refreshes.get()
+    if pending is None:
+        refresh_read_model(read_model, pks, using)
+    else:
+        pending.setdefault((read_model, using), set()).update(pks)
+
+
+def get_affected_pks(read_model, lookup, pks, using):
+    if not lookup:
+        return set(pks)
+    return set(
+        get_source_model(read_model)._base_manager.using(using)
+        .filter(**{lookup + '__in': pks})
+        .values_list('pk', flat=True)
+    )
+
+
+def stash_affected_pks(instance, using, moving_only):
+    affected = {}
+    for read_model, lookup, moves in _dependencies.get(type(instance), ()):
+        if lookup and (moves or not moving_only):
+            affected[read_model] = get_affected_pks(read_model, lookup, [instance.pk], using)
+    if affected:
+        # the relations can change or be gone by the time the post signal is sent
+        instance.__dict__['_read_model_affected_pks'] = affected
+
+
+def refresh_affected(instance, using, deleted=False):
+    stashed = instance.__dict__.pop('_read_model_affected_pks', {})
+    for read_model, lookup, moves in _dependencies.get(type(instance), ()):
+        if deleted:
+            # rows for a deleted source item are deleted with it
+            pks = stashed.get(read_model, set())
+        else:
+            pks = get_affected_pks(read_model, lookup, [instance.pk], using) | stashed.get(read_model, set())
+        queue_refresh(read_model, pks, using)
+
+
+def handle_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    if not raw and not instance._state.adding:
+        stash_affected_pks(instance, using, moving_only=True)
+
+
+def handle_post_save(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        refresh_affected(instance, using)
+
+
+def handle_pre_delete(sender, instance, using=None, **kwargs):
+    stash_affected_pks(instance, using, moving_only=False)
+
+
+def handle_post_delete(sender, instance, using=None, **kwargs):
+    refresh_affected(instance, using, deleted=True)
+
+
+def handle_m2m_changed(sender, instance, action, reverse, pk_set=None, using=None, **kwargs):
+    for read_model, forward_lookup, reverse_lookup in _m2m_dependencies.get(sender, ()):
+        # reverse is True when instance is on the side the field points to
+        instance_lookup, related_lookup = (reverse_lookup, forward_lookup) if reverse else \
+            (forward_lookup, reverse_lookup)
+        key = '_read_model_m2m_affected_pks'
+        if action in ('pre_remove', 'pre_clear'):
+            # the links are gone by the time the post signal is sent
+            instance.__dict__.setdefault(key, {})[read_model] = \
+                get_affected_pks(read_model, instance_lookup, [instance.pk], using)
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            pks = get_affected_pks(read_model, instance_lookup, [instance.pk], using)
+            pks |= instance.__dict__.get(key, {}).pop(read_model, set())
+            if pk_set:
+                pks |= get_affected_pks(read_model, related_lookup, pk_set, using)
+            queue_refresh(read_model, pks, using)
+
+
+def join_lookup(*parts):
+    return '__'.join(part for part in parts if part)
+
+
+def add_dependency(read_model, model, lookup, moves):
+    dependency = (read_model, lookup, moves)
+    if dependency not in _dependencies.setdefault(model, []):
+        _dependencies[model].append(dependency)
+
+
+def add_m2m_dependencies(read_model, field, lookup, related_lookup):
+    if field.concrete:
+        # field is the ManyToManyField on the model being walked
+        through = field.remote_field.through
+        forward_lookup, reverse_lookup = lookup, related_lookup
+        link_name = field.m2m_field_name()
+    else:
+        through = field.through
+        forward_lookup, reverse_lookup = related_lookup, lookup
+        link_name = field.field.m2m_reverse_field_name()
+
+    dependency = (read_model, forward_lookup, reverse_lookup)
+    if dependency not in _m2m_dependencies.setdefault(through, []):
+        _m2m_dependencies[through].append(dependency)
+    if not through._meta.auto_created:
+        # links made by saving a through model directly don't send m2m_changed
+        link = through._meta.get_field(link_name)
+        add_dependency(read_model, through, join_lookup(lookup, link.related_query_name()), True)
+
+
+def add_read_model(read_model):
+    """
+    add_read_model finds every model a read model's rows are built from by walking its includes and records the
+    lookup from the source model to each one, so a change to any of them can find the rows it affects.
+    """
+    source_field = read_model._meta.pk
+    if not isinstance(source_field, OneToOneField):
+        raise ImproperlyConfigured(ErrorMessages.READ_MODEL_WITHOUT_SOURCE.format(read_model.__name__))
+    source_model = source_field.related_model
+    capabilities = get_model_capabilities(source_model)
+
+    add_dependency(read_model, source_model, '', False)
+    for include in read_model.include:
+        if include not in capabilities.include_set:
+            raise ImproperlyConfigured(ErrorMessages.INVALID_READ_MODEL_INCLUDE.format(
+                read_model.__name__, include, source_model.__name__))
+
+        model = source_model
+        lookup = ''
+        for name in include.split('__'):
+            field = get_relation_field(model, name)
+            if field is None:
+                # properties are refreshed with the item they are on
+                break
+            related_lookup = join_lookup(lookup, name)
+            # a link stored on the related model moves when it is saved, one stored on this side or in a through
+            # table doesn't
+            add_dependency(read_model, field.related_model, related_lookup,
+                           not field.concrete and not field.many_to_many)
+            if field.many_to_many:
+                add_m2m_dependencies(read_model, field, lookup, related_lookup)
+            model = field.related_model
+            lookup = related_lookup
+
+
+def connect_read_models():
+    # imported here since models can't be imported before the app registry is ready
+    from rest_framework_simplify.models import SimplifyReadModel
+
+    for model in apps.get_models():
+        if issubclass(model, SimplifyReadModel):
+            add_read_model(model)
+
+    if _dependencies:
+        for signal, handler in ((pre_save, handle_pre_save), (post_save, handle_post_save),
+                                (pre_delete, handle_pre_delete), (post_delete, handle_post_delete)):
+            signal.connect(handler, dispatch_uid='simplify_read_models')
+    if _m2m_dependencies:
+        m2m_changed.connect(handle_m2m_changed, dispatch_uid='simplify_read_models')
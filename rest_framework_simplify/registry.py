@@ -0,0 +1,159 @@
+from types import MappingProxyType
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import BinaryField
+
+from rest_framework_simplify.aggregates import AGGREGATE_FUNCTIONS
+from rest_framework_simplify.errors import ErrorMessages
+from rest_framework_simplify.fields import SimplifyBlindIndexField, SimplifyEncryptedField
+
+_registry = {}
+
+
+class ModelCapabilities:
+    """
+    ModelCapabilities holds what a model declares in get_filters, get_includes, get_excludes,
+    get_property_dependencies, get_heavy_fields, get_aggregates and get_group_by, built once at startup so requests
+    only do lookups. It can't be changed after it is built.
+
+    get_filterable_properties isn't collected since building the expressions is allowed to query the database,
+    SimplifyView builds them once per request instead.
+    """
+    __slots__ = ('model', 'filters', 'filter_names', 'list_filters', 'property_filters', 'includes', 'include_set',
+                 'excludes', 'property_dependencies', 'heavy_fields', 'aggregates', 'group_by',
+                 'has_filterable_properties')
+
+    def __init__(self, model, filters, includes, excludes, property_dependencies=None, heavy_fields=(),
+                 aggregates=None, group_by=()):
+        set_attribute = super().__setattr__
+        set_attribute('model', model)
+        set_attribute('filters', MappingProxyType({
+            filter_name: MappingProxyType(dict(definition)) for filter_name, definition in filters.items()
+        }))
+        set_attribute('filter_names', frozenset(filters))
+        set_attribute('list_filters', frozenset(
+            filter_name for filter_name, definition in filters.items() if definition.get('list')
+        ))
+        set_attribute('property_filters', frozenset(
+            filter_name for filter_name, definition in filters.items() if definition.get('property')
+        ))
+        set_attribute('includes', tuple(includes))
+        set_attribute('include_set', frozenset(includes))
+        set_attribute('excludes', frozenset(excludes))
+        set_attribute('property_dependencies', MappingProxyType({
+            property_name: frozenset(columns) for property_name, columns in (property_dependencies or {}).items()
+        }))
+        set_attribute('heavy_fields', frozenset(heavy_fields))
+        set_attribute('aggregates', MappingProxyType({
+            field_name: frozenset(functions) for field_name, functions in (aggregates or {}).items()
+        }))
+        set_attribute('group_by', frozenset(group_by))
+        set_attribute('has_filterable_properties', hasattr(model, 'get_filterable_properties'))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(ErrorMessages.MODEL_CAPABILITIES_FROZEN.format(self.model.__name__))
+
+
+def validate_path(model, method_name, path, allow_lookups=False):
+    current_model = model
+    for index, part in enumerate(path.split('__')):
+        try:
+            field = current_model._meta.get_field(part)
+        except FieldDoesNotExist:
+            # properties can be filtered and included and anything after a field can be a lookup
+            if hasattr(current_model, part) or (index > 0 and allow_lookups):
+                return
+            raise ImproperlyConfigured(
+                ErrorMessages.INVALID_MODEL_CAPABILITY.format(model.__name__, method_name, path, part,
+                                                              current_model.__name__)
+            )
+        if not field.is_relation or field.related_model is None:
+            return
+        current_model = field.related_model
+
+
+def validate_column(model, method_name, column):
+    try:
+        field = model._meta.get_field(column)
+    except FieldDoesNotExist:
+        field = None
+    if field is None or not field.concrete or field.many_to_many:
+        raise ImproperlyConfigured(ErrorMessages.INVALID_MODEL_COLUMN.format(model.__name__, method_name, column))
+
+
+def get_default_heavy_fields(model):
+    """
+    get_default_heavy_fields returns every BinaryField and SimplifyEncryptedField on model. Binary columns are decoded
+    and encrypted columns decrypted for every row they are loaded in, so a model can return this from get_heavy_fields
+    to only load them when they are asked for.
+    """
+    return [
+        field.name for field in model._meta.concrete_fields
+        if isinstance(field, (BinaryField, SimplifyEncryptedField))
+    ]
+
+
+def build_model_capabilities(model):
+    """
+    build_model_capabilities collects a model's declarations and checks every name they use against its _meta,
+    raising ImproperlyConfigured for any that don't exist.
+    """
+    filters = model.get_filters() if hasattr(model, 'get_filters') else {}
+    includes = model.get_includes() if hasattr(model, 'get_includes') else []
+    excludes = model.get_excludes() if hasattr(model, 'get_excludes') else []
+    # blind indexes are only there to filter on so they are never returned
+    excludes = list(excludes) + [
+        field.name for field in model._meta.concrete_fields
+        if isinstance(field, SimplifyBlindIndexField) and field.name not in excludes
+    ]
+    property_dependencies = model.get_property_dependencies() if hasattr(model, 'get_property_dependencies') else {}
+    heavy_fields = model.get_heavy_fields() if hasattr(model, 'get_heavy_fields') else []
+    aggregates = model.get_aggregates() if hasattr(model, 'get_aggregates') else {}
+    group_by = model.get_group_by() if hasattr(model, 'get_group_by') else []
+
+    for filter_name, definition in filters.items():
+        if 'type' not in definition or 'list' not in definition:
+            raise ImproperlyConfigured(ErrorMessages.INVALID_FILTER_DEFINITION.format(model.__name__, filter_name))
+        validate_path(model, 'get_filters', filter_name, allow_lookups=True)
+    for include in includes:
+        validate_path(model, 'get_includes', include)
+    for exclude in excludes:
+        validate_path(model, 'get_excludes', exclude)
+    for property_name, columns in property_dependencies.items():
+        validate_path(model, 'get_property_dependencies', property_name)
+        for column in columns:
+            validate_column(model, 'get_property_dependencies', column)
+    for heavy_field in heavy_fields:
+        validate_column(model, 'get_heavy_fields', heavy_field)
+    for field_name, functions in aggregates.items():
+        validate_path(model, 'get_aggregates', field_name)
+        for function in functions:
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ImproperlyConfigured(ErrorMessages.INVALID_AGGREGATE_FUNCTION.format(
+                    model.__name__, field_name, function, ', '.join(AGGREGATE_FUNCTIONS)))
+    for field_name in group_by:
+        validate_path(model, 'get_group_by', field_name)
+
+    return ModelCapabilities(model, filters, includes, excludes, property_dependencies, heavy_fields, aggregates,
+                             group_by)
+
+
+def build_registry():
+    # imported here since models can't be imported before the app registry is ready
+    from rest_framework_simplify.models import SimplifyModel
+
+    for model in apps.get_models():
+        if issubclass(model, SimplifyModel):
+            _registry[model] = build_model_capabilities(model)
+
+
+def get_model_capabilities(model):
+    """
+    get_model_capabilities returns the ModelCapabilities for model. Models that weren't around when the registry was
+    built, like ones that aren't SimplifyModels, are built on first use.
+    """
+    capabilities = _registry.get(model)
+    if capabilities is None:
+        capabilities = _registry[model] = build_model_capabilities(model)
+    return capabilities
@@ -0,0 +1,50 @@
+import re
+import uuid
+
+from rest_framework.renderers import JSONRenderer
+
+from rest_framework_simplify.codec import dumps, loads
+from rest_framework_simplify.fields import LazyJson
+
+
+class SimplifyJSONRenderer(JSONRenderer):
+    """
+    SimplifyJSONRenderer renders the same json as JSONRenderer, with orjson when it is installed. SimplifyJsonTextField
+    values that were never decoded are written into the response as the text they were loaded as, once it has been
+    checked to be json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            # the codec only writes compact unescaped json
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+        marker = uuid.uuid4().hex
+        raw_values = []
+
+        def default(obj):
+            if type(obj) is LazyJson and not obj.is_decoded:
+                try:
+                    # text saved without the model being cleaned may not be json, which would break the whole body
+                    loads(obj.raw)
+                except Exception:
+                    # decoding raises the same ValidationError as loading text that isn't json
+                    obj._setup()
+                # a string to find and swap for the text once everything else is encoded
+                raw_values.append(obj.raw)
+                return '{0}{1}'.format(marker, len(raw_values) - 1)
+            return encoder.default(obj)
+
+        ret = dumps(data, default=default, allow_nan=not self.strict)
+        if raw_values:
+            ret = re.sub('"{0}([0-9]+)"'.format(marker), lambda match: raw_values[int(match.group(1))], ret)
+
+        # We always fully escape \u2028 and \u2029 to ensure we output JSON
+        # that is a strict javascript subset.
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
@@ -0,0 +1,193 @@
+import itertools
+import logging
+import random
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connections
+
+
+class ReadReplicaPool:
+    """
+    ReadReplicaPool spreads a SimplifyView's reads across several database aliases. Pass one in as read_db (or a
+    list of aliases for a round robin pool) and the view checks out an alias at the start of every request.
+
+    Pools keep their counters for the life of the process so they should be created once at module level rather
+    than in the view's __init__.
+    """
+    ROUND_ROBIN = 'round_robin'
+    LEAST_OUTSTANDING = 'least_outstanding'
+    LATENCY_WEIGHTED = 'latency_weighted'
+    POLICIES = [ROUND_ROBIN, LEAST_OUTSTANDING, LATENCY_WEIGHTED]
+
+    STICKY_CACHE_KEY = 'simplify-read-replica-sticky-{0}'
+    WRITE_METHODS = ['POST', 'PUT', 'PATCH', 'DELETE']
+
+    # how much the newest response time counts towards an alias' average latency
+    LATENCY_DECAY = 0.3
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    class ErrorMessages:
+        NO_ALIASES = 'ReadReplicaPool requires at least one database alias'
+        UNSUPPORTED_POLICY = '{0} is not a supported read replica policy'
+
+    def __init__(self, aliases, policy=ROUND_ROBIN, sticky_seconds=0, max_replication_lag=None,
+                 health_check_interval=10, eject_seconds=30, lag_check=None, client_key=None):
+        """
+        :param list aliases: database aliases to spread reads across
+        :param str policy: one of round_robin, least_outstanding or latency_weighted
+        :param int sticky_seconds: after a write, send the same client's reads to the write_db for this many seconds
+        :param float max_replication_lag: eject an alias whose replication lag (in seconds) is over this
+        :param int health_check_interval: seconds between replication lag checks for an alias
+        :param int eject_seconds: seconds an alias is left out after failing a lag check or a query
+        :param lag_check: callable taking an alias and returning its replication lag in seconds
+        :param client_key: callable taking a request and returning the key used for sticky reads
+        """
+        if not aliases:
+            raise ValueError(self.ErrorMessages.NO_ALIASES)
+        if policy not in self.POLICIES:
+            raise ValueError(self.ErrorMessages.UNSUPPORTED_POLICY.format(policy))
+
+        self.aliases = list(aliases)
+        self.policy = policy
+        self.sticky_seconds = sticky_seconds
+        self.max_replication_lag = max_replication_lag
+        self.health_check_interval = health_check_interval
+        self.eject_seconds = eject_seconds
+        self.lag_check = lag_check or self.get_replication_lag
+        self.client_key = client_key or self.get_client_key
+
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self.outstanding = {alias: 0 for alias in self.aliases}
+        self.latency = {alias: None for alias in self.aliases}
+        self.ejected_until = {alias: 0 for alias in self.aliases}
+        self.next_health_check = {alias: 0 for alias in self.aliases}
+
+    @classmethod
+    def for_aliases(cls, aliases):
+        # views are created per request so plain lists of aliases share one pool per process
+        key = tuple(aliases)
+        with cls._pools_lock:
+            if key not in cls._pools:
+                cls._pools[key] = cls(aliases)
+            return cls._pools[key]
+
+    def checkout(self, request, write_db='default'):
+        """
+        checkout picks the alias a request should read from and counts it as outstanding until release is called.
+        """
+        if self.sticky_seconds and cache.get(self.STICKY_CACHE_KEY.format(self.client_key(request))):
+            return write_db
+
+        healthy = self.get_healthy_aliases()
+        if not healthy:
+            # every replica is out so fall back to the primary rather than failing the request
+            return write_db
+
+        with self._lock:
+            if self.policy == self.LEAST_OUTSTANDING:
+                start = next(self._counter)
+                ordered = [healthy[(start + i) % len(healthy)] for i in range(len(healthy))]
+                alias = min(ordered, key=lambda a: self.outstanding[a])
+            elif self.policy == self.LATENCY_WEIGHTED:
+                alias = random.choices(healthy, weights=self.get_latency_weights(healthy))[0]
+            else:
+                alias = healthy[next(self._counter) % len(healthy)]
+            self.outstanding[alias] += 1
+        return alias
+
+    def release(self, alias, request, response=None, elapsed=None):
+        """
+        release records how long the request took against its alias and marks the client as sticky after a write.
+        """
+        if alias in self.outstanding:
+            with self._lock:
+                self.outstanding[alias] = max(self.outstanding[alias] - 1, 0)
+                if elapsed is not None:
+                    previous = self.latency[alias]
+                    self.latency[alias] = elapsed if previous is None \
+                        else previous + self.LATENCY_DECAY * (elapsed - previous)
+
+        if self.sticky_seconds and request.method in self.WRITE_METHODS \
+                and response is not None and response.status_code < 400:
+            cache.set(self.STICKY_CACHE_KEY.format(self.client_key(request)), True, self.sticky_seconds)
+
+    def eject(self, alias, seconds=None):
+        if alias in self.ejected_until:
+            with self._lock:
+                self.ejected_until[alias] = time.monotonic() + (self.eject_seconds if seconds is None else seconds)
+
+    def get_healthy_aliases(self):
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            if self.max_replication_lag is not None:
+                for alias in self.aliases:
+                    if now >= self.next_health_check[alias]:
+                        self.next_health_check[alias] = now + self.health_check_interval
+                        due.append(alias)
+        # the lag checks run queries so they are made without holding the lock
+        for alias in due:
+            self.check_replication_lag(alias)
+        with self._lock:
+            return [alias for alias in self.aliases if self.ejected_until[alias] <= now]
+
+    def check_replication_lag(self, alias):
+        try:
+            lag = self.lag_check(alias)
+        except Exception:
+            logging.getLogger('rest-framework-simplify').warning('Replication lag check failed for %s', alias,
+                                                                 exc_info=True)
+            self.eject(alias)
+            return
+        if lag is not None and lag > self.max_replication_lag:
+            self.eject(alias)
+
+    def get_latency_weights(self, aliases):
+        known = [self.latency[alias] for alias in aliases if self.latency[alias]]
+        # aliases we haven't timed yet are weighted like the fastest one so they get tried
+        fastest = min(known) if known else 1
+        return [1 / (self.latency[alias] or fastest) for alias in aliases]
+
+    def get_stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                alias: {
+                    'outstanding': self.outstanding[alias],
+                    'latency': self.latency[alias],
+                    'ejected': self.ejected_until[alias] > now
+                }
+                for alias in self.aliases
+            }
+
+    @staticmethod
+    def get_client_key(request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return 'user-{0}'.format(user.pk)
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key:
+            return 'session-{0}'.format(session.session_key)
+        return 'ip-{0}'.format(request.META.get('REMOTE_ADDR'))
+
+    @staticmethod
+    def get_replication_lag(alias):
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            # null on a primary, and zero when everything received has been replayed so an idle primary doesn't
+            # look like lag
+            cursor.execute('''
+                SELECT CASE
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                END
+            ''')
+            lag = cursor.fetchone()[0]
+        return float(lag) if lag is not None else None
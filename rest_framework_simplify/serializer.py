@@ -1,8 +1,9 @@
-from django.db.models import BinaryField, QuerySet as DjangoQuerySet, DecimalField, Manager
+from django.db.models import BinaryField, QuerySet as DjangoQuerySet, DecimalField, Manager, Model as DjangoModel
 from django.db.models.fields.related import ForeignKey as DjangoForeignKey, OneToOneField, ManyToManyField
 
 from rest_framework_simplify.helpers import binary_string_to_string
 from rest_framework_simplify.mapper import Mapper
+from rest_framework_simplify.registry import get_model_capabilities
 
 
 memoized_type_mappings = {}
@@ -42,7 +43,7 @@ class SQLEngineSerializer:
             return raw_models
 
     def one_model_to_dict(self, model):
-        foreign_key_fields, decimal_fields, binary_fields, all_fields = self.get_fields_by_type(type(model))
+        foreign_key_fields, decimal_fields, binary_fields, all_fields, default_fields = self.get_fields_by_type(type(model))
 
         if self.fields:
             field_names = [
@@ -55,11 +56,15 @@ class SQLEngineSerializer:
                 or Mapper.string_underscore_to_camelcase('{}_id'.format(field_name)) in self.fields
             ]
         else:
-            field_names = all_fields
+            field_names = default_fields
 
+        # excluded fields are skipped rather than read and removed since they may not have been loaded
+        excludes = self.get_excludes(model)
         raw_model = {}
 
         for field_name in field_names:
+            if field_name in excludes and field_name not in foreign_key_fields:
+                continue
             if field_name in foreign_key_fields:
                 id_key = '{}_id'.format(field_name)
                 raw_model[id_key] = getattr(model, id_key)
@@ -76,10 +81,9 @@ class SQLEngineSerializer:
                 else:
                     raw_model[field_name] = raw_attribute
 
-        if hasattr(model, 'get_excludes'):
-            for exclude in model.get_excludes():
-                if exclude in raw_model.keys():
-                    del raw_model[exclude]
+        for exclude in excludes:
+            if exclude in raw_model.keys():
+                del raw_model[exclude]
     
         return raw_model
 
@@ -90,7 +94,10 @@ class SQLEngineSerializer:
             foreign_key_fields = set((field.name for field in all_field_types if type(field) in [DjangoForeignKey, OneToOneField]))
             decimal_fields = set((field.name for field in all_field_types if type(field) is DecimalField))
             binary_fields = set((field.name for field in all_field_types if type(field) is BinaryField))
-            memoized_type_mappings[model_type] = (foreign_key_fields, decimal_fields, binary_fields, all_fields)
+            # heavy fields are only serialized when they are asked for in fields
+            default_fields = all_fields - get_model_capabilities(model_type).heavy_fields
+            memoized_type_mappings[model_type] = (foreign_key_fields, decimal_fields, binary_fields, all_fields,
+                                                  default_fields)
 
         return memoized_type_mappings[model_type]
 
@@ -188,12 +195,10 @@ class SQLEngineSerializer:
         # model to dict removes these but I want to make sure i also remove them here in case they try to include them
         if type(view_model) is list:
             for idx, vm in enumerate(view_model):
-                if hasattr(field_obj[idx], 'get_excludes'):
-                    self.remove_excludes_from_view_model(field_obj[idx].get_excludes(), vm)
+                self.remove_excludes_from_view_model(self.get_excludes(field_obj[idx]), vm)
 
         else:
-            if hasattr(field_obj, 'get_excludes'):
-                self.remove_excludes_from_view_model(field_obj.get_excludes(), view_model)
+            self.remove_excludes_from_view_model(self.get_excludes(field_obj), view_model)
 
         return view_model
 
@@ -230,6 +235,12 @@ class SQLEngineSerializer:
                 else:
                     view_model[field] = None
 
+    @staticmethod
+    def get_excludes(obj):
+        if isinstance(obj, DjangoModel):
+            return get_model_capabilities(type(obj)).excludes
+        return obj.get_excludes() if hasattr(obj, 'get_excludes') else []
+
     @staticmethod
     def remove_excludes_from_view_model(exclude_items, view_model):
         for exclude_item in exclude_items:
@@ -1,3 +1,18 @@
 class EngineNotSupported(Exception):
     def __init__(self, message):
-        super(EngineNotSupported, self).__init__(message)
\ No newline at end of file
+        super(EngineNotSupported, self).__init__(message)
+
+
+class PoolTimeout(Exception):
+    def __init__(self, message):
+        super(PoolTimeout, self).__init__(message)
+
+
+class StaleSignature(Exception):
+    """
+    StaleSignature carries the driver's error when a procedure was called with parameters it doesn't take, which is
+    what a cached signature that is out of date looks like.
+    """
+    def __init__(self, error):
+        super(StaleSignature, self).__init__(str(error))
+        self.error = error
@@ -0,0 +1,231 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from rest_framework_simplify.services.sql_executor.exceptions import PoolTimeout
+
+DEFAULT_POOL_SETTINGS = {
+    # connections kept open however long they sit idle
+    'min_size': 1,
+    # connections open at once, checkouts past this wait for one to be returned
+    'max_size': 10,
+    # seconds an idle connection over min_size is kept before it is closed
+    'idle_timeout': 300,
+    # seconds a checkout waits for a connection before raising PoolTimeout
+    'checkout_timeout': 30,
+    # connections idle for this many seconds are pinged before they are handed out
+    'health_check_interval': 10
+}
+
+
+def get_pool_settings():
+    return {**DEFAULT_POOL_SETTINGS, **getattr(settings, 'SIMPLIFY_SQL_EXECUTOR_POOL', {})}
+
+
+class ConnectionPool:
+    """
+    ConnectionPool keeps connections made by connect open between stored procedure calls so each call doesn't pay for
+    the connection and login. Connections are rolled back when they are returned and closed instead when that fails.
+
+    Pools are shared by every call with the same connection parameters for the life of the process, use for_params
+    rather than creating them directly.
+    """
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    class ErrorMessages:
+        INVALID_SIZE = 'ConnectionPool max_size must be at least 1 and at least min_size'
+        CHECKOUT_TIMEOUT = 'No connection to {0} was free within {1} seconds'
+
+    def __init__(self, name, connect, min_size=1, max_size=10, idle_timeout=300, checkout_timeout=30,
+                 health_check_interval=10):
+        """
+        :param str name: what the pool is called in its stats, which shouldn't include the password
+        :param connect: callable returning a new db api connection
+        :param int min_size: connections kept open however long they sit idle
+        :param int max_size: connections open at once
+        :param float idle_timeout: seconds an idle connection over min_size is kept before it is closed
+        :param float checkout_timeout: seconds a checkout waits for a connection before raising PoolTimeout
+        :param float health_check_interval: connections idle for this many seconds are pinged on checkout
+        """
+        if max_size < 1 or max_size < min_size:
+            raise ValueError(self.ErrorMessages.INVALID_SIZE)
+
+        self.name = name
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._condition = threading.Condition()
+        # (connection, time it was returned), the most recently returned last so the oldest age out
+        self._idle = []
+        # checked out connections, and ones being opened to be checked out
+        self.in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+
+    @classmethod
+    def for_params(cls, name, connect, key):
+        """
+        for_params returns the pool for key, creating it with connect and the SIMPLIFY_SQL_EXECUTOR_POOL settings the
+        first time it is asked for.
+        """
+        with cls._pools_lock:
+            if key not in cls._pools:
+                cls._pools[key] = cls(name, connect, **get_pool_settings())
+            return cls._pools[key]
+
+    @classmethod
+    def get_all_stats(cls):
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+        return {pool.name: pool.get_stats() for pool in pools}
+
+    @classmethod
+    def close_all(cls):
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def checkout(self):
+        """
+        checkout hands out an idle connection that passes its health check, or opens a new one if there is room,
+        waiting up to checkout_timeout for one to be returned when there isn't.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            conn = returned_at = None
+            with self._condition:
+                self.close_expired()
+                if not self._idle and self.in_use >= self.max_size:
+                    self.waits += 1
+                while not self._idle and self.in_use >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(self.ErrorMessages.CHECKOUT_TIMEOUT.format(self.name, self.checkout_timeout))
+                    self._condition.wait(remaining)
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                # a new connection is counted before it is open so other threads can't open past max_size meanwhile
+                self.in_use += 1
+
+            if conn is None:
+                try:
+                    conn = self.connect()
+                except BaseException:
+                    self.discard(None)
+                    raise
+                with self._condition:
+                    self.created += 1
+                    self.checkouts += 1
+                return conn
+
+            if self.is_healthy(conn, returned_at):
+                with self._condition:
+                    self.checkouts += 1
+                return conn
+            self.discard(conn)
+
+    def release(self, conn):
+        """
+        release rolls back whatever the connection was in the middle of and puts it back in the pool. A connection
+        that was closed or can't be rolled back, e.g. after the server went away, is dropped.
+        """
+        try:
+            reusable = not conn.closed
+            if reusable:
+                conn.rollback()
+        except Exception:
+            reusable = False
+
+        if not reusable:
+            self.discard(conn)
+            return
+        with self._condition:
+            self.in_use -= 1
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, conn):
+        # conn is None when opening it failed
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        with self._condition:
+            self.in_use -= 1
+            if conn is not None:
+                self.discarded += 1
+            self._condition.notify()
+
+    def is_healthy(self, conn, returned_at):
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.rollback()
+        except Exception:
+            logging.getLogger('rest-framework-simplify').info('Dropping broken pooled connection to %s', self.name,
+                                                               exc_info=True)
+            return False
+        return True
+
+    def close_expired(self):
+        # called holding the lock, the oldest idle connections are at the start
+        now = time.monotonic()
+        while self._idle and len(self._idle) + self.in_use > self.min_size \
+                and now - self._idle[0][1] >= self.idle_timeout:
+            conn, returned_at = self._idle.pop(0)
+            self.discarded += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self.discarded += len(idle)
+        for conn, returned_at in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                'size': len(self._idle) + self.in_use,
+                'idle': len(self._idle),
+                'in_use': self.in_use,
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'created': self.created,
+                'discarded': self.discarded
+            }
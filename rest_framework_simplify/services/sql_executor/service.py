@@ -2,11 +2,16 @@ import datetime
 import re
 import pymssql
 import psycopg2
+from psycopg2.errors import UndefinedFunction
+from contextlib import contextmanager
 from django.db import connection
 from django.conf import settings
 
 from rest_framework_simplify.mapper import Mapper
-from rest_framework_simplify.services.sql_executor.exceptions import EngineNotSupported
+from rest_framework_simplify.services.sql_executor.exceptions import EngineNotSupported, StaleSignature
+from rest_framework_simplify.services.sql_executor.pool import ConnectionPool
+from rest_framework_simplify.services.sql_executor.signatures import get_signature, invalidate_signatures, \
+    is_signature_cached
 
 
 class SQLExecutorService:
@@ -40,57 +45,140 @@ class SQLExecutorService:
         self.__class__ = self.engine_map.get(self.engine)
 
     def call_stored_procedure(self, procedure_name, params_formatter):
+        """
+        call_stored_procedure calls procedure_name with what params_formatter makes of its parameter names. When the
+        driver says the procedure doesn't take those parameters, its names are dropped from the cache since it may
+        have changed since they were read, and a call made with cached names is retried once with the names read
+        again. Nothing else is retried: the procedure didn't run, so it can't have been run twice.
+        """
+        cached = is_signature_cached(self.get_connection_key(), procedure_name)
+        try:
+            return self.execute_stored_procedure(procedure_name, params_formatter)
+        except StaleSignature as ex:
+            error = ex.error
+        # raised outside the except blocks so callers get the driver's error as it was
+        invalidate_signatures(procedure_name)
+        if not cached or not self.can_retry():
+            raise error
+        try:
+            return self.execute_stored_procedure(procedure_name, params_formatter)
+        except StaleSignature as ex:
+            error = ex.error
+        raise error
+
+    def execute_stored_procedure(self, procedure_name, params_formatter):
         raise NotImplementedError(self.ErrorMessages.METHOD_NOT_IMPLEMENTED)
 
+    def callproc(self, cursor, procedure_name, params=None):
+        try:
+            if params is None:
+                cursor.callproc(procedure_name)
+            else:
+                cursor.callproc(procedure_name, params)
+        except Exception as ex:
+            if self.is_signature_error(ex):
+                raise StaleSignature(ex)
+            raise
+
+    @staticmethod
+    def is_signature_error(error):
+        raise NotImplementedError(SQLExecutorService.ErrorMessages.METHOD_NOT_IMPLEMENTED)
+
+    def can_retry(self):
+        return True
+
+    def get_procedure_params(self, procedure_name):
+        raise NotImplementedError(self.ErrorMessages.METHOD_NOT_IMPLEMENTED)
+
+    def get_connection_key(self):
+        return (self.engine, self.connection_data['server'], self.connection_data['port'],
+                self.connection_data['database'], self.connection_data['username'])
+
+    def get_params(self, cursor, procedure_name):
+        # the parameters are read from the catalog once and cached, see signatures.get_signature
+        return get_signature(self.get_connection_key(), procedure_name,
+                             lambda: self.load_params(cursor, procedure_name))
+
+    @staticmethod
+    def load_params(cursor, procedure_name):
+        raise NotImplementedError(SQLExecutorService.ErrorMessages.METHOD_NOT_IMPLEMENTED)
+
 
 class PostgresExecutorService(SQLExecutorService):
     class Meta:
         proxy = True
 
+    @contextmanager
     def get_connection(self):
-        if (
+        """
+        get_connection yields django's connection when the procedure is on the default database and a connection from
+        the pool for its parameters when it isn't.
+        """
+        if self.uses_default_connection():
+            yield connection
+        else:
+            with self.get_pool().connection() as pooled_connection:
+                yield pooled_connection
+
+    def uses_default_connection(self):
+        return (
             settings.DATABASES['default']['HOST'] == self.connection_data['server'] and
             settings.DATABASES['default']['NAME'] == self.connection_data['database'] and
             settings.DATABASES['default']['USER'] == self.connection_data['username'] and
             settings.DATABASES['default']['PASSWORD'] == self.connection_data['password'] and
             settings.DATABASES['default']['PORT'] == str(self.connection_data['port'])
-        ):
-            return connection, True
-        else:
-            return psycopg2.connect('dbname={0} user={1} password={2} host={3} port={4}'.format(
-                self.connection_data['database'], self.connection_data['username'], self.connection_data['password'],
-                self.connection_data['server'], self.connection_data['port'])
-            ), False
+        )
+
+    def can_retry(self):
+        # a failed call inside atomic() leaves django's connection unusable until the transaction is rolled back.
+        # pooled connections are rolled back when they are returned
+        return not (self.uses_default_connection() and connection.in_atomic_block)
+
+    def get_pool(self):
+        data = self.connection_data
+        return ConnectionPool.for_params(
+            'postgres://{0}@{1}:{2}/{3}'.format(data['username'], data['server'], data['port'], data['database']),
+            lambda: psycopg2.connect('dbname={0} user={1} password={2} host={3} port={4}'.format(
+                data['database'], data['username'], data['password'], data['server'], data['port'])),
+            ('postgres', data['server'], data['port'], data['database'], data['username'], data['password'])
+        )
+
+    def execute_stored_procedure(self, procedure_name, params_formatter):
+        with self.get_connection() as connection, connection.cursor() as cursor:
+            params_result = self.get_params(cursor, procedure_name)
+            self.callproc(cursor, procedure_name, params_formatter(params_result))
+            result = self.dictfetchall(cursor)
 
-    def call_stored_procedure(self, procedure_name, params_formatter):
-        
-        connection, is_managed = self.get_connection()
-        
-        with connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT pg_catalog.pg_get_function_arguments(p.oid)
-                FROM pg_catalog.pg_proc p
-                WHERE p.proname = %s
-                    AND pg_catalog.pg_function_is_visible(p.oid)
-                LIMIT 1;
-            ''', (procedure_name.lower(),))
-            result = cursor.fetchall()
-            params_result = []
-            if len(result) == 0:
-                params_result = None
-            else:
-                for x in result[0][0].split(','):
-                    params_result.append(x.lstrip().split(' ')[0])
-                if len(params_result) == 1 and params_result[0] == '':
-                    params_result = []
+        return Mapper.camelcase_to_underscore(result)
 
-            cursor.callproc(procedure_name, params_formatter(params_result))
-            result = self.dictfetchall(cursor)
+    def get_procedure_params(self, procedure_name):
+        with self.get_connection() as connection, connection.cursor() as cursor:
+            return self.get_params(cursor, procedure_name)
 
-        if not is_managed:
-            connection.close()
+    @staticmethod
+    def is_signature_error(error):
+        # no function with that name takes those arguments. django wraps the driver's errors on its own connection
+        return isinstance(error, UndefinedFunction) or isinstance(error.__cause__, UndefinedFunction)
 
-        return Mapper.camelcase_to_underscore(result)
+    @staticmethod
+    def load_params(cursor, procedure_name):
+        cursor.execute('''
+            SELECT pg_catalog.pg_get_function_arguments(p.oid)
+            FROM pg_catalog.pg_proc p
+            WHERE p.proname = %s
+                AND pg_catalog.pg_function_is_visible(p.oid)
+            LIMIT 1;
+        ''', (procedure_name.lower(),))
+        result = cursor.fetchall()
+        params_result = []
+        if len(result) == 0:
+            params_result = None
+        else:
+            for x in result[0][0].split(','):
+                params_result.append(x.lstrip().split(' ')[0])
+            if len(params_result) == 1 and params_result[0] == '':
+                params_result = []
+        return params_result
 
     @staticmethod
     def dictfetchall(cursor):
@@ -106,26 +194,24 @@ class SQLServerExecutorService(SQLExecutorService):
     class Meta:
         proxy = True
 
-    def call_stored_procedure(self, procedure_name, params_formatter):
-        with pymssql.connect(self.connection_data['server'], self.connection_data['username'],
-                             self.connection_data['password'], self.connection_data['database']) as conn:
+    def get_connection(self):
+        return pymssql.connect(self.connection_data['server'], self.connection_data['username'],
+                               self.connection_data['password'], self.connection_data['database'])
+
+    def execute_stored_procedure(self, procedure_name, params_formatter):
+        with self.get_connection() as conn:
             
             with conn.cursor() as cursor:
-                # this may need to change to only get IN params not out params -- we will see
-                cursor.execute(
-                    'SELECT PARAMETER_NAME FROM INFORMATION_SCHEMA.PARAMETERS WHERE SPECIFIC_NAME=%s AND PARAMETER_MODE=%s ORDER BY ORDINAL_POSITION',
-                    (procedure_name, 'IN'))
-                result = cursor.fetchall()
-                params = [row[0] for row in result]
+                params = self.get_params(cursor, procedure_name) or []
 
                 # Use parameterized query instead of string concatenation for security
                 formatted_params = params_formatter(params)
                 
                 # Use callproc method for SQL Server stored procedures
                 if formatted_params:
-                    cursor.callproc(procedure_name, formatted_params)
+                    self.callproc(cursor, procedure_name, formatted_params)
                 else:
-                    cursor.callproc(procedure_name)
+                    self.callproc(cursor, procedure_name)
 
                 try:
                     result = cursor.fetchall()
@@ -144,4 +230,22 @@ class SQLServerExecutorService(SQLExecutorService):
                 camel_cased_results = Mapper.titlecase_to_camelcase(mapped_result)
                 snake_case_results = Mapper.camelcase_to_underscore(camel_cased_results)
 
-                return snake_case_results
\ No newline at end of file
+                return snake_case_results
+
+    def get_procedure_params(self, procedure_name):
+        with self.get_connection() as conn, conn.cursor() as cursor:
+            return self.get_params(cursor, procedure_name) or []
+
+    @staticmethod
+    def is_signature_error(error):
+        # a parameter that wasn't supplied, too many arguments, or a parameter the procedure doesn't have
+        return isinstance(error, pymssql.DatabaseError) and bool(error.args) and error.args[0] in (201, 8144, 8145)
+
+    @staticmethod
+    def load_params(cursor, procedure_name):
+        # this may need to change to only get IN params not out params -- we will see
+        cursor.execute(
+            'SELECT PARAMETER_NAME FROM INFORMATION_SCHEMA.PARAMETERS WHERE SPECIFIC_NAME=%s AND PARAMETER_MODE=%s ORDER BY ORDINAL_POSITION',
+            (procedure_name, 'IN'))
+        # a procedure without parameters looks the same as one that doesn't exist, so neither is cached
+        return [row[0] for row in cursor.fetchall()] or None
\ No newline at end of file
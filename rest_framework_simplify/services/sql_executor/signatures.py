@@ -0,0 +1,50 @@
+import threading
+import time
+
+from django.conf import settings
+
+# seconds a procedure's parameters are used before they are read from the catalog again
+DEFAULT_SIGNATURE_CACHE_SECONDS = 300
+
+# (connection key, procedure name) -> (parameter names, monotonic time they expire)
+_signatures = {}
+_signatures_lock = threading.Lock()
+
+
+def get_signature_cache_seconds():
+    return getattr(settings, 'SIMPLIFY_SP_SIGNATURE_CACHE_SECONDS', DEFAULT_SIGNATURE_CACHE_SECONDS)
+
+
+def get_signature(connection_key, procedure_name, load):
+    """
+    get_signature returns the parameter names of procedure_name on the database connection_key identifies, calling load
+    to read them from the catalog when they aren't cached or have expired. A procedure load doesn't find, which load
+    returns None for, isn't cached so it is picked up as soon as it is created.
+    """
+    key = (connection_key, procedure_name)
+    cached = _signatures.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return list(cached[0])
+
+    params = load()
+    cache_seconds = get_signature_cache_seconds()
+    if params is not None and cache_seconds > 0:
+        with _signatures_lock:
+            _signatures[key] = (tuple(params), time.monotonic() + cache_seconds)
+    return params
+
+
+def is_signature_cached(connection_key, procedure_name):
+    cached = _signatures.get((connection_key, procedure_name))
+    return cached is not None and cached[1] > time.monotonic()
+
+
+def invalidate_signatures(procedure_name=None):
+    """
+    invalidate_signatures drops the cached parameters of procedure_name on every database, or of every procedure when
+    procedure_name is None. Call it after changing a procedure's parameters so the next call reads them again.
+    """
+    with _signatures_lock:
+        for key in list(_signatures):
+            if procedure_name is None or key[1] == procedure_name:
+                del _signatures[key]
@@ -2,7 +2,16 @@ import uuid
 import unittest
 import unittest.mock
 
-from rest_framework_simplify.services.sql_executor.exceptions import EngineNotSupported
+import psycopg2
+import pymssql
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework_simplify.services.sql_executor import signatures
+from rest_framework_simplify.services.sql_executor.exceptions import EngineNotSupported, PoolTimeout
+from rest_framework_simplify.services.sql_executor.pool import ConnectionPool
 from rest_framework_simplify.services.sql_executor.service import SQLExecutorService, SQLServerExecutorService, PostgresExecutorService
 
 
@@ -27,3 +36,344 @@ class SQLExecutorServiceTests(unittest.TestCase):
 
         # assert
         self.assertIsInstance(service, PostgresExecutorService)
+
+
+class FakeConnection:
+    def __init__(self, fail_rollback=False, fail_ping=False):
+        self.closed = 0
+        self.rollbacks = 0
+        self.fail_rollback = fail_rollback
+        self.fail_ping = fail_ping
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise psycopg2.InterfaceError('connection already closed')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+    def cursor(self):
+        cursor = unittest.mock.MagicMock()
+        if self.fail_ping:
+            cursor.__enter__.return_value.execute.side_effect = psycopg2.OperationalError('server closed the connection')
+        return cursor
+
+
+class ConnectionPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        # pools are shared by the whole process, so stats start from a pool no other test has used
+        ConnectionPool.close_all()
+
+    def tearDown(self):
+        ConnectionPool.close_all()
+
+    def build_pool(self, **kwargs):
+        connections = []
+
+        def connect():
+            connections.append(FakeConnection())
+            return connections[-1]
+        return ConnectionPool('test', connect, **kwargs), connections
+
+    def test_returned_connection_is_rolled_back_and_reused(self):
+        # arrange
+        pool, connections = self.build_pool()
+
+        # act
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        # assert
+        self.assertIs(first, second)
+        self.assertEqual(len(connections), 1)
+        self.assertEqual(first.rollbacks, 2)
+        self.assertEqual(pool.get_stats()['checkouts'], 2)
+        self.assertEqual(pool.get_stats()['created'], 1)
+
+    def test_connection_that_cannot_be_rolled_back_is_dropped(self):
+        # arrange
+        pool, connections = self.build_pool()
+
+        # act
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                conn.fail_rollback = True
+                raise ValueError()
+        with pool.connection() as next_conn:
+            pass
+
+        # assert
+        self.assertTrue(conn.closed)
+        self.assertIsNot(conn, next_conn)
+        self.assertEqual(pool.get_stats()['discarded'], 1)
+        self.assertEqual(pool.get_stats()['size'], 1)
+
+    def test_idle_connection_failing_health_check_is_replaced(self):
+        # arrange
+        pool, connections = self.build_pool(health_check_interval=0)
+        with pool.connection() as conn:
+            conn.fail_ping = True
+
+        # act
+        with pool.connection() as next_conn:
+            pass
+
+        # assert
+        self.assertTrue(conn.closed)
+        self.assertIsNot(conn, next_conn)
+        self.assertEqual(len(connections), 2)
+
+    def test_checkout_past_max_size_times_out(self):
+        # arrange
+        pool, connections = self.build_pool(max_size=1, checkout_timeout=0.01)
+
+        # act
+        with pool.connection():
+            with self.assertRaises(PoolTimeout):
+                pool.checkout()
+
+        # assert
+        self.assertEqual(pool.get_stats()['timeouts'], 1)
+        self.assertEqual(pool.get_stats()['waits'], 1)
+        self.assertEqual(len(connections), 1)
+
+    def test_idle_connections_over_min_size_are_closed(self):
+        # arrange
+        pool, connections = self.build_pool(min_size=1, idle_timeout=0)
+        first = pool.checkout()
+        second = pool.checkout()
+        pool.release(first)
+        pool.release(second)
+
+        # act
+        with pool.connection():
+            stats = pool.get_stats()
+
+        # assert
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(sum(conn.closed for conn in connections), 1)
+
+    def test_failed_connect_frees_its_place(self):
+        # arrange
+        pool = ConnectionPool('test', unittest.mock.Mock(side_effect=psycopg2.OperationalError()), max_size=1)
+
+        # act
+        for i in range(2):
+            with self.assertRaises(psycopg2.OperationalError):
+                pool.checkout()
+
+        # assert
+        self.assertEqual(pool.get_stats()['in_use'], 0)
+
+    def test_postgres_service_reuses_pooled_connection_for_other_databases(self):
+        # arrange
+        database = settings.DATABASES['readreplica']
+        service = SQLExecutorService('127.0.0.1', database['NAME'], database['USER'], database['PASSWORD'],
+                                     port=database['PORT'], engine='postgres')
+
+        # act
+        first = service.call_stored_procedure('now', lambda params: params)
+        second = service.call_stored_procedure('now', lambda params: params)
+        stats = ConnectionPool.get_all_stats()['postgres://{0}@127.0.0.1:{1}/{2}'.format(
+            database['USER'], database['PORT'], database['NAME'])]
+
+        # assert
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['idle'], 1)
+
+
+class SignatureCacheTests(unittest.TestCase):
+
+    def tearDown(self):
+        signatures.invalidate_signatures()
+
+    def test_parameters_are_loaded_once(self):
+        # arrange
+        load = unittest.mock.Mock(return_value=['var_int', 'var_str'])
+
+        # act
+        first = signatures.get_signature('db', 'proc', load)
+        second = signatures.get_signature('db', 'proc', load)
+
+        # assert
+        self.assertEqual(first, ['var_int', 'var_str'])
+        self.assertEqual(second, ['var_int', 'var_str'])
+        self.assertEqual(load.call_count, 1)
+
+    def test_procedure_that_is_not_found_is_not_cached(self):
+        # arrange
+        load = unittest.mock.Mock(return_value=None)
+
+        # act
+        signatures.get_signature('db', 'proc', load)
+        result = signatures.get_signature('db', 'proc', load)
+
+        # assert
+        self.assertIsNone(result)
+        self.assertEqual(load.call_count, 2)
+
+    def test_invalidated_parameters_are_loaded_again(self):
+        # arrange
+        load = unittest.mock.Mock(return_value=['var_int'])
+        other_load = unittest.mock.Mock(return_value=['var_str'])
+        signatures.get_signature('db', 'proc', load)
+        signatures.get_signature('db', 'other_proc', other_load)
+
+        # act
+        signatures.invalidate_signatures('proc')
+        signatures.get_signature('db', 'proc', load)
+        signatures.get_signature('db', 'other_proc', other_load)
+
+        # assert
+        self.assertEqual(load.call_count, 2)
+        self.assertEqual(other_load.call_count, 1)
+
+    @override_settings(SIMPLIFY_SP_SIGNATURE_CACHE_SECONDS=0)
+    def test_zero_cache_seconds_loads_every_time(self):
+        # arrange
+        load = unittest.mock.Mock(return_value=['var_int'])
+
+        # act
+        signatures.get_signature('db', 'proc', load)
+        signatures.get_signature('db', 'proc', load)
+
+        # assert
+        self.assertEqual(load.call_count, 2)
+
+    def test_postgres_service_reads_catalog_once(self):
+        # arrange
+        database = settings.DATABASES['default']
+        service = SQLExecutorService(database['HOST'], database['NAME'], database['USER'], database['PASSWORD'],
+                                     port=int(database['PORT']), engine='postgres')
+
+        # act
+        with CaptureQueriesContext(connection) as first_queries:
+            service.call_stored_procedure('now', lambda params: params)
+        with CaptureQueriesContext(connection) as second_queries:
+            result = service.call_stored_procedure('now', lambda params: params)
+
+        # assert
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len(first_queries.captured_queries), 1)
+        self.assertIn('pg_get_function_arguments', first_queries.captured_queries[0]['sql'])
+        self.assertEqual(len(second_queries.captured_queries), 0)
+
+    def test_postgres_service_retries_once_with_parameters_read_again_when_cached_ones_fail(self):
+        # arrange
+        database = settings.DATABASES['default']
+        service = SQLExecutorService(database['HOST'], database['NAME'], database['USER'], database['PASSWORD'],
+                                     port=int(database['PORT']), engine='postgres')
+        # parameters cached before the procedure changed
+        signatures.get_signature(service.get_connection_key(), 'now', lambda: ['removed_param'])
+
+        # act
+        with unittest.mock.patch.object(service, 'execute_stored_procedure',
+                                        wraps=service.execute_stored_procedure) as execute:
+            result = service.call_stored_procedure('now', lambda params: params)
+
+        # assert
+        self.assertEqual(len(result), 1)
+        self.assertEqual(execute.call_count, 2)
+        self.assertEqual(service.get_procedure_params('now'), [])
+
+    def test_postgres_service_does_not_retry_when_parameters_were_not_cached(self):
+        # arrange
+        database = settings.DATABASES['default']
+        service = SQLExecutorService(database['HOST'], database['NAME'], database['USER'], database['PASSWORD'],
+                                     port=int(database['PORT']), engine='postgres')
+
+        # act
+        with unittest.mock.patch.object(service, 'execute_stored_procedure',
+                                        wraps=service.execute_stored_procedure) as execute:
+            with self.assertRaises(DatabaseError):
+                service.call_stored_procedure('now', lambda params: ['not a parameter'])
+
+        # assert
+        self.assertEqual(execute.call_count, 1)
+        self.assertFalse(signatures.is_signature_cached(service.get_connection_key(), 'now'))
+
+    def build_postgres_service(self):
+        database = settings.DATABASES['default']
+        return SQLExecutorService(database['HOST'], database['NAME'], database['USER'], database['PASSWORD'],
+                                  port=int(database['PORT']), engine='postgres')
+
+    def test_postgres_service_does_not_retry_errors_raised_by_the_procedure(self):
+        # arrange
+        service = self.build_postgres_service()
+        signatures.get_signature(service.get_connection_key(), 'sqrt', lambda: ['value'])
+
+        # act
+        with unittest.mock.patch.object(service, 'execute_stored_procedure',
+                                        wraps=service.execute_stored_procedure) as execute:
+            with self.assertRaises(DatabaseError):
+                service.call_stored_procedure('sqrt', lambda params: [-1])
+
+        # assert
+        self.assertEqual(execute.call_count, 1)
+        self.assertTrue(signatures.is_signature_cached(service.get_connection_key(), 'sqrt'))
+
+    def test_pool_timeouts_and_connection_errors_are_not_retried(self):
+        # arrange
+        service = self.build_postgres_service()
+        signatures.get_signature(service.get_connection_key(), 'now', lambda: [])
+
+        for error in [PoolTimeout('no connection was free'), OperationalError('could not connect to server')]:
+            # act
+            with unittest.mock.patch.object(service, 'execute_stored_procedure', side_effect=error) as execute:
+                with self.assertRaises(type(error)):
+                    service.call_stored_procedure('now', lambda params: params)
+
+            # assert
+            self.assertEqual(execute.call_count, 1)
+            self.assertTrue(signatures.is_signature_cached(service.get_connection_key(), 'now'))
+
+    def build_sql_server_cursor(self, callproc_errors, fetchall):
+        cursor = unittest.mock.MagicMock()
+        cursor.callproc.side_effect = callproc_errors
+        cursor.fetchall.side_effect = fetchall
+        cursor.description = [('Id',)]
+        conn = unittest.mock.MagicMock()
+        conn.__enter__.return_value = conn
+        conn.cursor.return_value.__enter__.return_value = cursor
+        return conn, cursor
+
+    def test_sql_server_service_retries_calls_the_procedure_rejected_the_parameters_of(self):
+        # arrange
+        service = SQLExecutorService('server', 'database', 'user', 'password', engine='sqlserver')
+        signatures.get_signature(service.get_connection_key(), 'proc', lambda: ['@removed'])
+        stale = pymssql.ProgrammingError(8144, b'Procedure or function proc has too many arguments specified.')
+        # the second fetchall reads the parameters again
+        conn, cursor = self.build_sql_server_cursor([stale, None], [[('@id',)], [(1,)]])
+
+        # act
+        with unittest.mock.patch.object(SQLServerExecutorService, 'get_connection', return_value=conn):
+            result = service.call_stored_procedure('proc', lambda params: params)
+
+        # assert
+        self.assertEqual(result, [{'id': 1}])
+        self.assertEqual([call.args for call in cursor.callproc.call_args_list],
+                         [('proc', ['@removed']), ('proc', ['@id'])])
+
+    def test_sql_server_service_does_not_retry_after_the_procedure_committed(self):
+        # arrange
+        service = SQLExecutorService('server', 'database', 'user', 'password', engine='sqlserver')
+        signatures.get_signature(service.get_connection_key(), 'proc', lambda: ['@id'])
+        conn, cursor = self.build_sql_server_cursor([None], [[(1,)]])
+
+        # act
+        with unittest.mock.patch.object(SQLServerExecutorService, 'get_connection', return_value=conn):
+            with unittest.mock.patch('rest_framework_simplify.services.sql_executor.service.Mapper'
+                                     '.titlecase_to_camelcase', side_effect=ValueError('could not map')):
+                with self.assertRaises(ValueError):
+                    service.call_stored_procedure('proc', lambda params: params)
+
+        # assert
+        self.assertEqual(cursor.callproc.call_count, 1)
+        conn.commit.assert_called_once_with()
+
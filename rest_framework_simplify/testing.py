@@ -0,0 +1,142 @@
+import re
+
+from contextlib import ContextDecorator
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils.regex_helper import normalize
+
+from rest_framework_simplify.errors import ErrorMessages
+from rest_framework_simplify.exceptions import QueryBudgetExceeded
+
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+[\["`]?(\w+)', re.IGNORECASE)
+
+
+class QueryBudget(ContextDecorator):
+    """
+    QueryBudget records the queries run inside it and fails with QueryBudgetExceeded if there are more than queries
+    in total, or more than tables[table_name] against a table. It can be used as a context manager or a decorator:
+
+        with QueryBudget(2, tables={'test_app_childclass': 1}):
+            client.get('/basicClass?include=childThree')
+
+    Views can also declare a QueryBudget for each of their GET methods in query_budgets so that
+    assert_query_budgets can check every route at once.
+    """
+
+    def __init__(self, queries=None, tables=None, query_string='', using=None):
+        """
+        :param int queries: the most queries that can run
+        :param dict tables: the most queries that can touch each table, keyed by table name
+        :param str query_string: query params assert_query_budgets adds to the url when checking a view's budget
+        :param using: database alias or list of aliases to count queries on, defaults to all of them
+        """
+        self.queries = queries
+        self.tables = tables or {}
+        self.query_string = query_string
+        self.using = using
+        self.captured_queries = []
+        self._contexts = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        if exc_type is None:
+            self.check()
+        return False
+
+    def start(self):
+        aliases = self.using or list(connections)
+        if isinstance(aliases, str):
+            aliases = [aliases]
+        self.captured_queries = []
+        self._contexts = [CaptureQueriesContext(connections[alias]) for alias in aliases]
+        for context in self._contexts:
+            context.__enter__()
+
+    def stop(self):
+        for context in self._contexts:
+            context.__exit__(None, None, None)
+            self.captured_queries.extend(context.captured_queries)
+        self._contexts = []
+
+    def get_table_counts(self):
+        table_counts = {}
+        for query in self.captured_queries:
+            for table in set(TABLE_PATTERN.findall(query['sql'])):
+                table_counts[table] = table_counts.get(table, 0) + 1
+        return table_counts
+
+    def get_failures(self):
+        failures = []
+        if self.queries is not None and len(self.captured_queries) > self.queries:
+            failures.append(ErrorMessages.QUERY_BUDGET_EXCEEDED.format(len(self.captured_queries), self.queries))
+        table_counts = self.get_table_counts()
+        for table, budget in self.tables.items():
+            if table_counts.get(table, 0) > budget:
+                failures.append(ErrorMessages.TABLE_QUERY_BUDGET_EXCEEDED.format(table_counts[table], table, budget))
+        return failures
+
+    def check(self):
+        failures = self.get_failures()
+        if failures:
+            queries = '\n'.join('  {0}'.format(query['sql']) for query in self.captured_queries)
+            raise QueryBudgetExceeded('{0}\n{1}'.format('\n'.join(failures), queries))
+
+
+def get_routes(patterns, prefix=''):
+    for pattern in patterns:
+        regex = prefix + pattern.pattern.regex.pattern.lstrip('^')
+        if isinstance(pattern, URLResolver):
+            yield from get_routes(pattern.url_patterns, regex)
+        elif isinstance(pattern, URLPattern):
+            yield regex, pattern.callback
+
+
+def assert_query_budgets(client, url_kwargs, urlconf=None):
+    """
+    assert_query_budgets sends a GET to every route whose view declares a budget in query_budgets and raises
+    QueryBudgetExceeded listing every route that went over. url_kwargs fills in the route's named groups, e.g.
+    {'pk': 1, 'parent_resource': 'basicClasses', 'parent_pk': 1}, and can be a callable taking the view class for
+    views that need different values. Routes with a group that isn't in url_kwargs are skipped.
+    """
+    failures = []
+    for regex, callback in get_routes(get_resolver(urlconf).url_patterns):
+        view_class = getattr(callback, 'view_class', None)
+        query_budgets = getattr(view_class, 'query_budgets', None)
+        if not query_budgets:
+            continue
+
+        kwargs = url_kwargs(view_class) if callable(url_kwargs) else url_kwargs
+        for path_format, params in normalize(regex):
+            if any(param not in kwargs for param in params):
+                continue
+            url_kwargs_for_path = {param: kwargs[param] for param in params}
+            url = '/' + path_format % url_kwargs_for_path
+            # the view decides which GET method a request is, e.g. lives_on_parent routes are GET_SUB without a pk
+            view = view_class(**getattr(callback, 'view_initkwargs', {}))
+            budget = query_budgets.get(view.get_get_method(url, **url_kwargs_for_path))
+            if budget is None:
+                continue
+
+            if budget.query_string:
+                url += '?' + budget.query_string
+            budget = QueryBudget(budget.queries, budget.tables, budget.query_string, budget.using)
+            # a cached response would run no queries at all
+            cache.clear()
+            budget.start()
+            try:
+                response = client.get(url)
+            finally:
+                budget.stop()
+            if response.status_code >= 400:
+                failures.append(ErrorMessages.QUERY_BUDGET_REQUEST_FAILED.format(url, response.status_code))
+            for failure in budget.get_failures():
+                failures.append('GET {0}: {1}'.format(url, failure))
+
+    if failures:
+        raise QueryBudgetExceeded('\n'.join(failures))
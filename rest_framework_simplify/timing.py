@@ -0,0 +1,108 @@
+import time
+
+from contextlib import contextmanager, nullcontext
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class RequestTimer:
+    """
+    RequestTimer records how long each phase of a request takes along with the number of queries, the time spent in
+    the database and the number of rows handled in that phase. It is installed as an execute wrapper on the view's
+    connections so queries are counted without any extra work in the phases themselves.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self.current = None
+        self.queries = 0
+        self.db_time = 0.0
+
+    @contextmanager
+    def phase(self, name):
+        phase = {'name': name, 'duration': 0.0, 'queries': 0, 'db_time': 0.0, 'rows': None}
+        # phases are listed in the order they started so nested ones come after the phase they are part of
+        self.phases.append(phase)
+        parent = self.current
+        self.current = phase
+        started = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            phase['duration'] = time.perf_counter() - started
+            self.current = parent
+
+    def set_rows(self, rows):
+        if self.current is not None:
+            self.current['rows'] = rows
+
+    def add_phase(self, name, duration):
+        self.phases.append({'name': name, 'duration': duration, 'queries': 0, 'db_time': 0.0, 'rows': None})
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if self.current is not None:
+                self.current['queries'] += 1
+                self.current['db_time'] += elapsed
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'queries': self.queries,
+            'db_time': self.db_time,
+            'phases': list(self.phases)
+        }
+
+    def as_server_timing(self):
+        metrics = []
+        for phase in self.phases:
+            metric = '{0};dur={1:.2f}'.format(phase['name'], phase['duration'] * 1000)
+            if phase['queries']:
+                metric += ';desc="{0} queries {1:.2f}ms db"'.format(phase['queries'], phase['db_time'] * 1000)
+            elif phase['rows'] is not None:
+                metric += ';desc="{0} rows"'.format(phase['rows'])
+            metrics.append(metric)
+        metrics.append('db;dur={0:.2f};desc="{1} queries"'.format(self.db_time * 1000, self.queries))
+        metrics.append('total;dur={0:.2f}'.format(self.total * 1000))
+        return ', '.join(metrics)
+
+
+class NullTimer:
+    """
+    NullTimer stands in for RequestTimer when timing is turned off so the views don't need to check.
+    """
+
+    def phase(self, name):
+        return nullcontext()
+
+    def set_rows(self, rows):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def is_timing_enabled():
+    return getattr(settings, 'SIMPLIFY_SERVER_TIMING', False)
+
+
+def get_timing_sink():
+    """
+    get_timing_sink returns the callable set in SIMPLIFY_TIMING_SINK. It is called with the request and the timings
+    of every timed request once the response has been rendered.
+    """
+    sink = getattr(settings, 'SIMPLIFY_TIMING_SINK', None)
+    if isinstance(sink, str):
+        sink = import_string(sink)
+    return sink
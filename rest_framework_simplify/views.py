@@ -1,36 +1,191 @@
+import asyncio
 import datetime
 import dateutil.parser
+import time
 
+from asgiref.sync import markcoroutinefunction, sync_to_async
 from collections import OrderedDict
+from contextlib import ExitStack
 from decimal import Decimal
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import F, CharField, Value
-from django.db.models.fields.related import ForeignKey, OneToOneField, ManyToOneRel, ManyToManyRel, OneToOneRel
+from django.db import InterfaceError, OperationalError, connections
+from django.db.models import Case, Count, Exists, F, CharField, OuterRef, Q, Value
+from django.db.models.functions import Upper
+from django.db.models.fields.related import ForeignKey, OneToOneField
+from django.http import StreamingHttpResponse
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
+from rest_framework_simplify.aggregates import get_alias, parse_aggregates, parse_group_by
+from rest_framework_simplify.concurrency import arun_concurrently, prefetch_concurrently, run_concurrently
+from rest_framework_simplify.export import EXPORT_FORMATS, aiterate, get_export_chunk_size, group_rows
+from rest_framework_simplify.fieldsets import get_related_lookups
 from rest_framework_simplify.helpers import handle_bytes_decoding
+from rest_framework_simplify.json_paths import can_read_json_paths_in_database, get_json_path_expressions, \
+    parse_json_paths, project_json_paths
 from rest_framework_simplify.mapper import Mapper
+from rest_framework_simplify.read_models import deferred_refreshes, get_data_lookup, serialize_read_model_rows
+from rest_framework_simplify.registry import get_model_capabilities
+from rest_framework_simplify.routing import ReadReplicaPool
 from rest_framework_simplify.serializer import SQLEngineSerializer
+from rest_framework_simplify.timing import NULL_TIMER, RequestTimer, get_timing_sink, is_timing_enabled
 from rest_framework_simplify.errors import ErrorMessages
+from rest_framework_simplify.exceptions import SimplifyAPIException
+
+# longer __revicontains values are matched row by row rather than expanded into every substring
+DEFAULT_REVICONTAINS_MAX_LENGTH = 64
+
+
+class SimplifyQuery:
+    """
+    SimplifyQuery holds everything SimplifyView.get works out from the request's query params, so the queries it
+    describes can be run by either the sync or the async view.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.include = []
+        self.requested_fields = []
+        self.fields = []
+        self.excludes = []
+        self.full_includes = []
+        self.multi_field = []
+        self.simple = True
+        self.order_by = None
+        self.page = None
+        self.page_size = None
+        self.count_only = False
+        self.data_only = False
+        self.aggregates = {}
+        self.group_by = []
+        self.facets = []
+        self.json_paths = []
+        self.json_paths_in_database = False
+
+    @property
+    def is_paged(self):
+        return bool(self.page and self.page_size)
+
+    def project_json_paths(self, items):
+        for item in items:
+            project_json_paths(item, self.json_paths, self.json_paths_in_database)
+
+    def paginate(self):
+        # todo: if they didnt pass in an order_by and there is paging use default models paging if that doesnt
+        # todo: exist use id -- if that doesnt exist dont order
+        page = int(self.page)
+        page_size = int(self.page_size)
+        start = (page - 1) * page_size
+        end = start + page_size
+        self.obj = self.obj[start:end]
 
 
 class SimplifyView(APIView):
-
-    def __init__(self, model, linked_objects=[], supported_methods=[], read_db='default', write_db='default'):
-        self.read_db = read_db
+    # QueryBudgets for GET, GET_LIST, GET_SUB and GET_LIST_SUB checked by testing.assert_query_budgets
+    query_budgets = {}
+    # SimplifyReadModels of the view's model that lists asking for exactly their includes are read from
+    read_models = []
+
+    def __init__(self, model, linked_objects=[], supported_methods=[], read_db='default', write_db='default',
+                 concurrent_queries=False):
+        # read_db can be a pool of aliases, in which case one is checked out for each request in initial
+        if isinstance(read_db, (list, tuple)):
+            read_db = ReadReplicaPool.for_aliases(read_db)
+        self.read_db_pool = read_db if isinstance(read_db, ReadReplicaPool) else None
+        self.read_db = read_db.aliases[0] if self.read_db_pool else read_db
         self.write_db = write_db
+        self.concurrent_queries = concurrent_queries
         self.model = model
         self.supported_methods = supported_methods
         self.linked_objects = linked_objects
         self.DoesNotExist = ObjectDoesNotExist
         self.serializer = SQLEngineSerializer
+        self.timer = NULL_TIMER
+        self._filterable_properties = None
 
     def get_db_engine(self):
         return 'sql'
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.read_db_pool:
+            self.read_db = self.read_db_pool.checkout(request, write_db=self.write_db)
+            self._read_db_checked_out_at = time.monotonic()
+        if is_timing_enabled():
+            self.start_timing()
+
+    def handle_exception(self, exc):
+        # a replica that can't be reached is left out of the pool for a while
+        if self.read_db_pool and isinstance(exc, (OperationalError, InterfaceError)) and self.is_read_db_unreachable():
+            self.read_db_pool.eject(self.read_db)
+        return super().handle_exception(exc)
+
+    def is_read_db_unreachable(self):
+        """
+        is_read_db_unreachable checks the read_db connection after a database error, so a replica is only ejected when
+        it is the one that failed and not for an error on the write_db or a query that failed or timed out on a replica
+        that is still up.
+        """
+        if self.read_db == self.write_db:
+            return False
+        connection = connections[self.read_db]
+        try:
+            if connection.connection is None:
+                connection.ensure_connection()
+                return False
+            return not connection.is_usable()
+        except (OperationalError, InterfaceError):
+            return True
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.read_db_pool and hasattr(self, '_read_db_checked_out_at'):
+            elapsed = time.monotonic() - self._read_db_checked_out_at
+            self.read_db_pool.release(self.read_db, request, response=response, elapsed=elapsed)
+            del self._read_db_checked_out_at
+        if self.timer is not NULL_TIMER:
+            self.finish_timing(request, response)
+        return response
+
+    def start_timing(self):
+        """
+        start_timing turns on the phase timers for this request and counts every query run on the view's databases.
+        """
+        self.timer = RequestTimer()
+        self._timing_wrappers = ExitStack()
+        for alias in {self.read_db, self.write_db}:
+            self._timing_wrappers.enter_context(connections[alias].execute_wrapper(self.timer))
+
+    def finish_timing(self, request, response):
+        """
+        finish_timing adds the Server-Timing header and hands the timings to the SIMPLIFY_TIMING_SINK. Responses are
+        rendered after the view returns so rendering is timed with a post render callback when it can be.
+        """
+        timer = self.timer
+        self.timer = NULL_TIMER
+        self._timing_wrappers.close()
+
+        def report(rendered_response):
+            rendered_response['Server-Timing'] = timer.as_server_timing()
+            sink = get_timing_sink()
+            if sink:
+                sink(request, timer.as_dict())
+
+        if getattr(response, 'is_rendered', True):
+            report(response)
+            return
+
+        render_started = time.perf_counter()
+
+        def report_rendered(rendered_response):
+            timer.add_phase('render', time.perf_counter() - render_started)
+            report(rendered_response)
+
+        response.add_post_render_callback(report_rendered)
+
     def get_queryset(self):
         """
         get_queryset returns the base manager for the SimplifyView's model. This method can be
@@ -87,13 +242,139 @@ class SimplifyView(APIView):
         cache_key = None
         if hasattr(self.model, 'CACHE'):
             cache_key = request.get_full_path()
-            result = cache.get(cache_key, None)
+            with self.timer.phase('cache'):
+                result = cache.get(cache_key, None)
             if result:
                 return self.create_response(body=result, using_cache=True, cache_key=cache_key)
 
+        with self.timer.phase('parse'):
+            obj, is_single_result, empty_is_error = self.get_obj(request, pk, parent_resource, parent_pk)
+            query = self.build_query(request, obj)
+
+        export_format = request.query_params.get('export', None)
+        if export_format:
+            return self.create_export_response(query, export_format, is_single_result)
+
+        if query.aggregates:
+            with self.timer.phase('aggregate'):
+                body, total_items = self.get_aggregate_body(query)
+                self.timer.set_rows(len(body))
+            return self.create_response(body=body, serialize=True, count=total_items, cache_key=cache_key,
+                                        optimized_serialize=True)
+
+        facets = None
+        if query.facets and not is_single_result:
+            with self.timer.phase('facets'):
+                facets = self.get_facets(query)
+
+        # handle paging Mr. Herman
+        if query.count_only:
+            with self.timer.phase('count'):
+                total_items = query.obj.using(self.read_db).count()
+            return self.create_response(body=[], serialize=True, include=None, exclude=None, fields=None,
+                                        count=total_items, facets=facets, using_cache=False, cache_key=None,
+                                        optimized_serialize=True)
+
+        total_items = None
+        count_obj = None
+        if query.is_paged:
+            # need to get total items for response if paging
+            if query.data_only:
+                total_items = -1
+            else:
+                count_obj = query.obj.using(self.read_db)
+            query.paginate()
+
+        read_model = None if is_single_result else self.get_read_model(query)
+        if read_model is not None:
+            fetch = lambda: self.fetch_read_model_items(query, read_model)
+        elif query.simple:
+            fetch = lambda: list(query.obj.values(*query.fields))
+        else:
+            fetch = lambda: self.fetch_objs(query.obj)
+
+        # the count doesn't depend on the page so they can run at the same time when asked to
+        if count_obj is not None and self.concurrent_queries:
+            with self.timer.phase('page'):
+                body, total_items = run_concurrently(fetch, count_obj.count)
+                self.timer.set_rows(len(body))
+        else:
+            if count_obj is not None:
+                with self.timer.phase('count'):
+                    total_items = count_obj.count()
+            with self.timer.phase('page'):
+                body = fetch()
+                self.timer.set_rows(len(body))
+
+        if read_model is not None:
+            return self.create_response(body=body, serialize=True, count=total_items, facets=facets,
+                                        cache_key=cache_key, optimized_serialize=True)
+
+        if query.simple:
+            with self.timer.phase('merge'):
+                body = self.merge_simple_body(query, body)
+                query.project_json_paths(body)
+                self.timer.set_rows(len(body))
+            body = self.get_single_result(body, is_single_result, empty_is_error, pk)
+            # TODO must make this check in order for permission classes to work with objects
+            # see pull request #59 for details.
+            # self.check_object_permissions(request, obj.first())
+            return self.create_response(body=body, serialize=True, include=query.include, exclude=query.excludes,
+                                        fields=query.fields, count=total_items, facets=facets, using_cache=False,
+                                        cache_key=cache_key, optimized_serialize=True)
+        else:
+            query.project_json_paths(body)
+            body = self.get_single_result(body, is_single_result, empty_is_error, pk)
+            if is_single_result and body:
+                self.check_object_permissions(request, body)
+
+            return self.create_response(body=body, serialize=True, include=query.include, exclude=query.excludes,
+                                        fields=query.requested_fields, count=total_items, facets=facets,
+                                        using_cache=False, cache_key=cache_key)
+
+    def get_read_model(self, query):
+        """
+        get_read_model returns the read model declared in read_models whose includes are the ones asked for, as long as
+        no fields were asked for.
+        """
+        if not self.read_models or query.requested_fields:
+            return None
+        include = set(query.include)
+        for read_model in self.read_models:
+            if set(read_model.include) == include:
+                return read_model
+        return None
+
+    def fetch_read_model_items(self, query, read_model):
+        """
+        fetch_read_model_items reads the already serialized items for the filtered, ordered and paged query from
+        read_model, joined on the primary key. Items that don't have a row, e.g. because the read db hasn't caught up
+        yet, are serialized from the source model on the read db. Nothing is written, a GET never touches the write db.
+        """
+        rows = list(query.obj.prefetch_related(None).values_list('pk', get_data_lookup(read_model)))
+        missing = [pk for pk, data in rows if data is None]
+        if missing:
+            refreshed = serialize_read_model_rows(read_model, missing, using=self.read_db)
+            rows = [(pk, refreshed.get(pk) if data is None else data) for pk, data in rows]
+        return [data for pk, data in rows if data is not None]
+
+    def fetch_objs(self, obj):
+        """
+        fetch_objs evaluates the query for the full model path. With concurrent_queries the prefetches for each
+        included relation run at the same time instead of one after another.
+        """
+        lookups = obj._prefetch_related_lookups
+        if not self.concurrent_queries or len(lookups) < 2:
+            return list(obj)
+        return prefetch_concurrently(list(obj.prefetch_related(None)), lookups)
+
+    def get_obj(self, request, pk=None, parent_resource=None, parent_pk=None):
+        """
+        get_obj returns the base queryset for a GET along with whether a single result is expected and whether an
+        empty result should be treated as an error.
+        """
         is_single_result = False
         empty_is_error = False
-        simple = True
         obj = None
         # if we have a primary key we are returning one result
         if pk:
@@ -117,16 +398,11 @@ class SimplifyView(APIView):
         else:
             # we could be a sub resource so we need to check if a parent_resource was passed in
             if parent_pk and parent_resource and self.linked_objects:
-
-                snake_cased_url_tail = Mapper.camelcase_to_underscore(request.get_full_path().split('/')[-1])
-                lives_on_parent_results = [i for i in self.linked_objects if 'lives_on_parent' in i
-                                           and i['lives_on_parent'] and i['sub_resource_name'] == snake_cased_url_tail]
-
-                if len(lives_on_parent_results) > 0:
+                linked_object = self.get_lives_on_parent_linked_object(request)
+                if linked_object:
                     if 'GET_SUB' not in self.supported_methods:
                         raise Exception(ErrorMessages.GET_SUB_NOT_SUPPORTED.format(self.model.__name__))
 
-                    linked_object = lives_on_parent_results[0]
                     child_id_field_name = linked_object['sub_resource_name']+'_id'
                     child_id = linked_object['parent_cls'].objects.using(self.read_db).values(child_id_field_name).get(pk=parent_pk)[child_id_field_name]
                     obj = self.get_queryset().using(self.read_db).filter(pk=child_id)
@@ -138,9 +414,6 @@ class SimplifyView(APIView):
                         raise Exception(ErrorMessages.GET_LIST_SUB_NOT_SUPPORTED.format(self.model.__name__))
                     # find the resource that this request is looking for
                     obj = self.get_obj_from_linked_objects(pk, parent_resource, parent_pk)
-                    if pk is not None:
-                        is_single_result = True
-                        empty_is_error = True
 
             else:
                 # trying to get ALL items in DB
@@ -148,14 +421,43 @@ class SimplifyView(APIView):
                     raise Exception(ErrorMessages.GET_LIST_NOT_SUPPORTED.format(self.model.__name__))
                 obj = self.get_queryset().using(self.read_db).all()
 
+        return obj, is_single_result, empty_is_error
+
+    def get_get_method(self, path, pk=None, parent_resource=None, parent_pk=None):
+        """
+        get_get_method returns which of the GET supported_methods get_obj checks a GET to path against.
+        """
+        if parent_resource and parent_pk and self.linked_objects:
+            if pk or self.get_lives_on_parent_linked_object_for_path(path):
+                return 'GET_SUB'
+            return 'GET_LIST_SUB'
+        return 'GET' if pk else 'GET_LIST'
+
+    def get_lives_on_parent_linked_object(self, request):
+        return self.get_lives_on_parent_linked_object_for_path(request.get_full_path())
+
+    def get_lives_on_parent_linked_object_for_path(self, path):
+        snake_cased_url_tail = Mapper.camelcase_to_underscore(path.split('/')[-1])
+        lives_on_parent_results = [i for i in self.linked_objects if 'lives_on_parent' in i
+                                   and i['lives_on_parent'] and i['sub_resource_name'] == snake_cased_url_tail]
+        return lives_on_parent_results[0] if len(lives_on_parent_results) > 0 else None
+
+    def build_query(self, request, obj):
+        """
+        build_query works out the includes, fields, filters, ordering and paging requested in the query params and
+        applies them to obj. No queries are run against the database here.
+        """
+        query = SimplifyQuery(obj)
+
         # handle includes
         req_includes = request.query_params.get('include', [])
         if req_includes:
             req_includes = req_includes.split(',')
             if type(req_includes) is not list:
                 req_includes = [req_includes]
-        model_includes = self.model.get_includes() if hasattr(self.model, 'get_includes') else []
-        include = [Mapper.camelcase_to_underscore(include.strip()) for include in req_includes if Mapper.camelcase_to_underscore(include.strip()) in model_includes]
+        capabilities = get_model_capabilities(self.model)
+        include = [Mapper.camelcase_to_underscore(include.strip()) for include in req_includes if Mapper.camelcase_to_underscore(include.strip()) in capabilities.include_set]
+        query.include = include
 
         # handle fields
         # if they explicitly ask for the field do we need to make them pass includes as well? currently yes
@@ -179,18 +481,27 @@ class SimplifyView(APIView):
             or field.strip() in include
             or Mapper.camelcase_to_underscore(field.strip()) in foreign_key_ids
         ]
-        fields = requested_fields
+        # paths into json text fields like jsonText.status ask for the field with only those values in it
+        query.json_paths = parse_json_paths(self.model, req_fields, requested_fields, capabilities.excludes)
+        for json_path in query.json_paths:
+            if json_path.field_name not in requested_fields:
+                requested_fields.append(json_path.field_name)
+        # postgres reads the values out of the documents so the rest of them never leave the database
+        query.json_paths_in_database = bool(query.json_paths) and can_read_json_paths_in_database(connections[self.read_db])
+        query.requested_fields = requested_fields
+        fields = list(requested_fields)
 
         if len(fields) > 0:
-            model_primary_key_name = [field.attname for field in self.model._meta.get_fields() if hasattr(field, 'primary_key') and field.primary_key][0]
-            if model_primary_key_name not in fields:
-                simple = False
+            if self.get_primary_key_name() not in fields:
+                query.simple = False
 
-        if simple and len(req_fields) == 0:
-            fields = [field.attname for field in self.model._meta.get_fields() if not field.auto_created and field.concrete]
+        # heavy fields are only loaded when they are asked for by name
+        if query.simple and len(req_fields) == 0:
+            fields = [
+                field.attname for field in self.model._meta.get_fields()
+                if not field.auto_created and field.concrete and field.name not in capabilities.heavy_fields
+            ]
 
-        full_includes = []
-        multi_field = []
         if len(include) > 0:
             includes_on_model = []
             for field_name in include:
@@ -198,292 +509,511 @@ class SimplifyView(APIView):
                     includes_on_model.append(self.get_field_tree(field_name))
                 except:
                     # handling property includes is insanity. Give up on optimizations and use the old way
-                    simple = False
+                    query.simple = False
 
             # nested includes are not currently supported in the happy path
             if len([include for include in includes_on_model if len(include) > 2]) > 0:
-                simple = False
+                query.simple = False
 
-            if simple:
+            if query.simple:
                 for include_field_tree in includes_on_model:
                     for include_field in include_field_tree[1:]:
                         if hasattr(include_field, 'related_model'):
-                            exclude_fields = include_field.related_model.get_excludes() if hasattr(include_field.related_model, 'get_excludes') else []
+                            related_capabilities = get_model_capabilities(include_field.related_model)
                             include_fields = [
                                 include_field.name + '__' + field.attname
                                 for field in include_field.related_model._meta.get_fields()
-                                if not field.auto_created and field.concrete and field.name not in exclude_fields
+                                if not field.auto_created and field.concrete
+                                and field.name not in related_capabilities.excludes
+                                and (field.name not in related_capabilities.heavy_fields or field.name in requested_fields)
                             ]
                             fields.extend(include_fields)
-                            full_includes.append(include_field.name)
+                            query.full_includes.append(include_field.name)
                         if hasattr(include_field, 'multiple') and include_field.multiple:
-                            multi_field.append(include_field.name)
-            else:
-                for include_field_tree in includes_on_model:
-                    if len(include_field_tree) == 2 and type(include_field_tree[1]) == ForeignKey:
-                        obj = obj.select_related(include_field_tree[0])
-                    elif type(include_field_tree[1]) in (ForeignKey, ManyToManyRel, ManyToOneRel, OneToOneRel):
-                        obj = obj.prefetch_related(include_field_tree[0])
+                            query.multi_field.append(include_field.name)
+
+        if not query.simple:
+            # load the relations the serializer walks and, if fields were asked for, only the columns it reads
+            query.obj = get_related_lookups(self.model, include, self.get_loaded_fields(query), self.read_db) \
+                .apply(query.obj)
 
         # gefilter fish
         filters = request.query_params.get('filters', [])
         if filters:
-            filter_kwargs = {}
-            exclude_filter_kwargs = {}
-            isolated_filter_kwargs = {}
-            filterable_properties = {}
-            filterable_property_kwargs = {}
-
-            filters = filters.split('|')
-            # todo: rename this
-            for filter in filters:
-                exclude_filter = False
-                isolate_filter = False
-
-                filter_array = filter.split('=')
-                filter_name = filter_array[0]
-                filter_value = filter_array[1] if len(filter_array) > 1 else None
-
-                # check if this is a filterable property
-                if hasattr(self.model, 'get_filterable_properties'):
-                    filterable_property = filter_name in self.model.get_filterable_properties().keys()
-                else:
-                    filterable_property = False
-
-                # snake case the name
-                filter_name = Mapper.camelcase_to_underscore(filter_name)
-                if filter_name[0] == '!':
-                    if filter_value:
-                        exclude_filter = True
-                    filter_name = filter_name[1:]
-
-                if '__contains_all' in filter_name:
-                    isolate_filter = True
-
-                # if filter is in model filters then add it to the kwargs
-                model_filters = self.model.get_filters()
-                if filter_name in model_filters.keys():
-                    if model_filters[filter_name]['list']:
-                        filter_value = [self.format_filter(filter_name, item, model_filters) for item in filter_value.split(',')]
-                        # if its a not we need to add it to excluded filters
-
-                        if exclude_filter:
-                            exclude_filter_kwargs[filter_name] = filter_value
-                        elif isolate_filter:
-                            isolated_filter_kwargs[filter_name] = filter_value
-                        elif filterable_property:
-                            filterable_property_query = self.model.get_filterable_properties()[filter_name]['query']
-                            # todo: i don't like this but don't have the time to make this better
-                            # todo: if we are annotating we should automatically account for the __in
-                            filterable_properties[filter_name.rstrip('__in')] = filterable_property_query
-                            filterable_property_kwargs[filter_name] = filter_value
-                        else:
-                            filter_kwargs[filter_name] = filter_value
-                    else:
-                        if exclude_filter:
-                            exclude_filter_kwargs[filter_name] = self.format_filter(filter_name, filter_value,
-                                                                                    model_filters)
-                        elif isolate_filter:
-                            isolated_filter_kwargs[filter_name] = self.format_filter(filter_name, filter_value,
-                                                                                     model_filters)
-                        else:
-                            if filterable_property:
-                                filterable_property_query = self.model.get_filterable_properties()[filter_name]['query']
-                                filterable_properties[filter_name] = filterable_property_query
-                                filterable_property_kwargs[filter_name] = self.format_filter(filter_name, filter_value,
-                                                                                             model_filters)
-                            elif 'revicontains' in filter_name:
-                                # create an annotation that is the field name + _rev and pass that to filter
-                                # with an F function to query each row in the db to see if it contains a substr
-                                # of the passed in filter
-                                field_name = filter_name.split('__')[0]
-                                field_rev = field_name + '_rev'
-                                annotate_kwargs = {
-                                    field_rev: Value(filter_value, output_field=CharField())
-                                }
-                                obj = obj.using(self.read_db).annotate(**annotate_kwargs)
-                                filter_kwargs[field_rev + '__icontains'] = F(field_name)
-                            else:
-                                filter_kwargs[filter_name] = self.format_filter(filter_name,
-                                                                                filter_value, model_filters)
-            # narrow down items with the filters
-            obj = obj.using(self.read_db).filter(**filter_kwargs)
-
-            # filter out filterable properties
-            if filterable_properties:
-                obj = obj.using(self.read_db).annotate(**filterable_properties).filter(**filterable_property_kwargs)
-
-            for filter_name, filter_value in isolated_filter_kwargs.items():
-                filter_name = filter_name.replace('__contains_all', '')
-
-                for x in range(0, len(filter_value)):
-                    kwargs = {
-                        '{0}'.format(filter_name): filter_value[x]
-                    }
-                    obj = obj.using(self.read_db).filter(**kwargs)
-
-            # exclude any items that shouldnt be in the final list
-            obj = obj.using(self.read_db).exclude(**exclude_filter_kwargs)
+            query.obj = self.apply_filters(query.obj, filters)
 
         # handle distinct
         distinct = request.query_params.get('distinct', False)
         if distinct:
-            obj = obj.using(self.read_db).distinct()
+            query.obj = query.obj.using(self.read_db).distinct()
+
+        # handle aggregates
+        aggregate = request.query_params.get('aggregate', None)
+        group_by = request.query_params.get('groupBy', None)
+        if group_by and not aggregate:
+            raise SimplifyAPIException(ErrorMessages.GROUP_BY_WITHOUT_AGGREGATE, status.HTTP_400_BAD_REQUEST)
+        if aggregate:
+            query.aggregates = parse_aggregates(aggregate, capabilities)
+            query.group_by = parse_group_by(group_by, capabilities) if group_by else []
+
+        # facets count the items for each value of a field that can be grouped by
+        facets = request.query_params.get('facets', None)
+        if facets:
+            query.facets = parse_group_by(facets, capabilities)
 
         # handle ordering
         order_by = request.query_params.get('orderBy', None)
         if order_by:
             order_by = Mapper.camelcase_to_underscore(order_by)
-            obj = obj.using(self.read_db).order_by(order_by)
+            # aggregates can be ordered by their own names so the grouped query is ordered once it is built
+            if not query.aggregates:
+                query.obj = query.obj.using(self.read_db).order_by(order_by)
+        query.order_by = order_by
 
         # handle paging Mr. Herman
-        page = request.query_params.get('page', None)
-        page_size = request.query_params.get('pageSize', None)
+        query.page = request.query_params.get('page', None)
+        query.page_size = request.query_params.get('pageSize', None)
         count_only = request.query_params.get('countOnly', None)
-        data_only = request.query_params.get('noCount', None)
-        total_items = None
-        if count_only or (page_size and int(page_size) == 0):
-            total_items = obj.using(self.read_db).count()
-            return self.create_response(body=[], serialize=True, include=None, exclude=None, fields=None,
-                                        count=total_items, using_cache=False, cache_key=None, optimized_serialize=True)
-
-        if page and page_size:
-            # todo: if they didnt pass in an order_by and there is paging use default models paging if that doesnt
-            # todo: exist use id -- if that doesnt exist dont order
-            # need to get total items for response if paging
-            if data_only:
-                total_items = -1
-            else:
-                total_items = obj.using(self.read_db).count()
-            page = int(page)
-            page_size = int(page_size)
-            start = (page - 1) * page_size
-            end = start + page_size
-            obj = obj[start:end]
+        query.count_only = bool(count_only or (query.page_size and int(query.page_size) == 0))
+        query.data_only = bool(request.query_params.get('noCount', None))
 
         # setup excludes
-        excludes = self.model.get_excludes() if hasattr(self.model, 'get_excludes') else []
+        query.excludes = list(capabilities.excludes)
 
-        if simple:
-            fields = [field for field in fields if field not in excludes]
+        if query.simple:
+            fields = [field for field in fields if field not in capabilities.excludes]
 
             for field_name in fields:
                 try:
                     field = self.model._meta.get_field(field_name)
                     if hasattr(field, 'multiple') and field.multiple:
-                        multi_field.append(field.name)
+                        query.multi_field.append(field.name)
                 except:
                     pass
+        query.fields = fields
 
-            body = list(obj.values(*fields))
+        if query.json_paths_in_database and not query.aggregates:
+            query.obj = query.obj.annotate(**get_json_path_expressions(query.json_paths))
+            if query.simple:
+                query.fields = self.get_loaded_fields(query) + [json_path.alias for json_path in query.json_paths]
 
-            if order_by:
-                body_by_primary_key = OrderedDict()
-            else:
-                body_by_primary_key = {}
-            # pk is not always id
-            model_primary_key_name = [field.attname for field in self.model._meta.get_fields() if hasattr(field, 'primary_key') and field.primary_key][0]
-            for body_item in body:
-                if body_item[model_primary_key_name] not in body_by_primary_key:
-                    body_by_primary_key[body_item[model_primary_key_name]] = []
-                body_by_primary_key[body_item[model_primary_key_name]].append(body_item)
-
-            for primary_key in body_by_primary_key:
-                body_items = body_by_primary_key[primary_key]
-
-                # process full includes
-                if full_includes:
-                    for body_item in body_items:
-                        for include_field in full_includes:
-                            field_names = [field for field in body_item if include_field + '__' in field]
-                            field_names_to_remove = [field for field in field_names if field not in include]
-
-                            body_item[include_field] = {
-                                field_name.replace(include_field + "__", ''):body_item[field_name]
-                                for field_name in field_names
-                            }
-
-                            if all (val == None for val in body_item[include_field].values()):
-                                if include_field in multi_field:
-                                    body_item[include_field] = []
-                                else:
-                                    body_item[include_field] = None
-
-                            for field_name in field_names_to_remove:
-                                del body_item[field_name]
-
-                # handle possible many to many relationships
-                if len(body_items) > 1:
-                    keys = [key for key in body_items[0]]
-                    checked_values = {}
-                    differences = set()
-                    for item in body_items:
-                        for key in keys:
-                            if key not in checked_values:
-                                checked_values[key] = item[key]
-                            if checked_values[key] != item[key]:
-                                differences.add(key)
-
-                    if len(differences) > 0:
-                        item = body_items[0]
-                        for difference in differences:
-                            all_items = [body_item[difference] for body_item in body_items]
-                            if all(type(item) is dict for item in all_items):
-                                # a little uniquefying magic, courtesy of stack overflow https://stackoverflow.com/a/7090833
-                                item[difference] = [
-                                    dict(tupleized)
-                                    for tupleized in
-                                    set(tuple(item.items())
-                                    for item in all_items)
-                                ]
-                            else:
-                                item[difference] = all_items
-                        body_by_primary_key[primary_key] = [item]
+        return query
+
+    def get_loaded_fields(self, query):
+        """
+        get_loaded_fields returns the fields to load from the table for the query. Json text fields that are only asked
+        for by path are left out when the paths are read in the database.
+        """
+        fields = query.fields if query.simple else query.requested_fields
+        if not query.json_paths_in_database:
+            return fields
+        projected = {json_path.field_name for json_path in query.json_paths}
+        # without any other fields every column would be loaded
+        return [field for field in fields if field not in projected] or [self.get_primary_key_name()]
+
+    def apply_filters(self, obj, filters):
+        filter_kwargs = {}
+        exclude_filter_kwargs = {}
+        isolated_filter_kwargs = {}
+        filterable_properties = {}
+        filterable_property_kwargs = {}
+        filterable_property_conditions = []
+        model_filterable_properties = self.get_filterable_properties()
+        capabilities = get_model_capabilities(self.model)
+
+        filters = filters.split('|')
+        # todo: rename this
+        for filter in filters:
+            exclude_filter = False
+            isolate_filter = False
+
+            filter_array = filter.split('=')
+            filter_name = filter_array[0]
+            filter_value = filter_array[1] if len(filter_array) > 1 else None
+
+            # check if this is a filterable property
+            filterable_property = filter_name in model_filterable_properties
+
+            # snake case the name
+            filter_name = Mapper.camelcase_to_underscore(filter_name)
+            if filter_name[0] == '!':
+                if filter_value:
+                    exclude_filter = True
+                filter_name = filter_name[1:]
+
+            if '__contains_all' in filter_name:
+                isolate_filter = True
+
+            # if filter is in model filters then add it to the kwargs
+            model_filters = capabilities.filters
+            if filter_name in model_filters.keys():
+                if model_filters[filter_name]['list']:
+                    filter_value = [self.format_filter(filter_name, item, model_filters) for item in filter_value.split(',')]
+                    # if its a not we need to add it to excluded filters
+
+                    if exclude_filter:
+                        exclude_filter_kwargs[filter_name] = filter_value
+                    elif isolate_filter:
+                        isolated_filter_kwargs[filter_name] = filter_value
+                    elif filterable_property:
+                        filterable_property_query = model_filterable_properties[filter_name]['query']
+                        condition = self.get_filterable_property_condition(filterable_property_query, filter_value)
+                        if condition is not None:
+                            filterable_property_conditions.append(condition)
+                        else:
+                            # todo: i don't like this but don't have the time to make this better
+                            # todo: if we are annotating we should automatically account for the __in
+                            filterable_properties[filter_name.rstrip('__in')] = filterable_property_query
+                            filterable_property_kwargs[filter_name] = filter_value
                     else:
-                        raise Exception('duplicate object for key')
+                        filter_kwargs[filter_name] = filter_value
+                else:
+                    if exclude_filter:
+                        exclude_filter_kwargs[filter_name] = self.format_filter(filter_name, filter_value,
+                                                                                model_filters)
+                    elif isolate_filter:
+                        isolated_filter_kwargs[filter_name] = self.format_filter(filter_name, filter_value,
+                                                                                 model_filters)
+                    else:
+                        if filterable_property:
+                            filterable_property_query = model_filterable_properties[filter_name]['query']
+                            filter_value = self.format_filter(filter_name, filter_value, model_filters)
+                            condition = self.get_filterable_property_condition(filterable_property_query,
+                                                                               [filter_value])
+                            if condition is not None:
+                                filterable_property_conditions.append(condition)
+                            else:
+                                filterable_properties[filter_name] = filterable_property_query
+                                filterable_property_kwargs[filter_name] = filter_value
+                        elif 'revicontains' in filter_name:
+                            field_name = filter_name.split('__')[0]
+                            field_rev = field_name + '_rev'
+                            candidates = self.get_revicontains_candidates(
+                                filter_value, model_filters[filter_name].get('prefix', False))
+                            if candidates is not None:
+                                # the field has to be one of the substrings of the passed in filter so look
+                                # them all up at once, which can use an index on UPPER(field)
+                                obj = obj.using(self.read_db).alias(**{field_rev: Upper(field_name)})
+                                filter_kwargs[field_rev + '__in'] = candidates
+                            else:
+                                # create an annotation that is the field name + _rev and pass that to filter
+                                # with an F function to query each row in the db to see if it contains a substr
+                                # of the passed in filter
+                                annotate_kwargs = {
+                                    field_rev: Value(filter_value, output_field=CharField())
+                                }
+                                obj = obj.using(self.read_db).annotate(**annotate_kwargs)
+                                filter_kwargs[field_rev + '__icontains'] = F(field_name)
+                        else:
+                            filter_kwargs[filter_name] = self.format_filter(filter_name,
+                                                                            filter_value, model_filters)
+        # narrow down items with the filters
+        obj = obj.using(self.read_db).filter(**filter_kwargs)
+
+        # filter out filterable properties
+        if filterable_property_conditions:
+            obj = obj.using(self.read_db).filter(*filterable_property_conditions)
+        if filterable_properties:
+            obj = obj.using(self.read_db).annotate(**filterable_properties).filter(**filterable_property_kwargs)
+
+        for filter_name, filter_value in isolated_filter_kwargs.items():
+            filter_name = filter_name.replace('__contains_all', '')
+            if type(filter_value) is not list:
+                filter_value = [filter_value]
+            obj = obj.using(self.read_db).filter(pk__in=self.get_contains_all_subquery(filter_name, filter_value))
+
+        # exclude any items that shouldnt be in the final list
+        obj = obj.using(self.read_db).exclude(**exclude_filter_kwargs)
+        return obj
+
+    def get_filterable_properties(self):
+        """
+        get_filterable_properties returns the model's filterable properties. Building them can hit the database so
+        they are only built once for each request.
+        """
+        if self._filterable_properties is None:
+            if get_model_capabilities(self.model).has_filterable_properties:
+                self._filterable_properties = self.model.get_filterable_properties()
+            else:
+                self._filterable_properties = {}
+        return self._filterable_properties
+
+    def get_filterable_property_condition(self, query, filter_values):
+        """
+        get_filterable_property_condition turns a boolean filterable property, Case(When(Q(...), then=True),
+        default=False), into a correlated EXISTS. Annotating the Case joins every to-many relation in the condition
+        and returns a row per match, EXISTS doesn't. An item matches when any of its joined rows has the value, the
+        same as when the Case was annotated. Returns None for any other kind of expression so it can be annotated as
+        before.
+        """
+        if not isinstance(query, Case) or len(query.cases) != 1:
+            return None
+        when = query.cases[0]
+        if not isinstance(when.condition, Q) or not isinstance(when.result, Value) \
+                or not isinstance(query.default, Value):
+            return None
+        if type(when.result.value) is not bool or query.default.value is not (not when.result.value):
+            return None
 
-                # at this point it should be one item
-                for field_name in multi_field:
-                    if not type(body_by_primary_key[primary_key][0][field_name]) is list:
-                        body_by_primary_key[primary_key][0][field_name] = [body_by_primary_key[primary_key][0][field_name]]
+        filter_values = set(filter_values)
+        if len(filter_values) != 1 or type(next(iter(filter_values))) is not bool:
+            # a filter on both true and false keeps everything
+            return Q() if filter_values == {True, False} else None
 
-            body = [body_by_primary_key[primary_key][0] for primary_key in body_by_primary_key]
+        filter_value = next(iter(filter_values))
+        if filter_value is when.result.value:
+            return Exists(self.model._base_manager.filter(when.condition, pk=OuterRef('pk')))
+        # the default is what each joined row that doesn't match gets, including the one an item without any related
+        # rows is joined to, so the Case is evaluated for each of them inside the subquery
+        return Exists(self.model._base_manager.annotate(_filterable_property=query)
+                      .filter(_filterable_property=filter_value, pk=OuterRef('pk')))
 
+    @staticmethod
+    def get_revicontains_candidates(filter_value, prefix=False):
+        """
+        get_revicontains_candidates returns every upper cased substring of filter_value (or just its prefixes when the
+        filter is marked as a prefix filter) for __revicontains to match against. It returns None when there would be
+        too many to be worth it, or when upper casing might not match the database's, so the row by row lookup is used.
+        """
+        max_length = getattr(settings, 'SIMPLIFY_REVICONTAINS_MAX_LENGTH', DEFAULT_REVICONTAINS_MAX_LENGTH)
+        if filter_value is None or len(filter_value) > max_length or not filter_value.isascii():
+            return None
+
+        filter_value = filter_value.upper()
+        if prefix:
+            candidates = {filter_value[:end] for end in range(len(filter_value) + 1)}
+        else:
+            candidates = {
+                filter_value[start:end]
+                for start in range(len(filter_value))
+                for end in range(start + 1, len(filter_value) + 1)
+            }
+            candidates.add('')
+        return sorted(candidates)
+
+    def get_contains_all_subquery(self, filter_name, filter_value):
+        """
+        get_contains_all_subquery returns the primary keys of the rows related to every value in filter_value. It
+        joins the relation once and counts the distinct matches per row, so it costs the same however many values
+        there are.
+        """
+        return self.model._base_manager.using(self.read_db) \
+            .filter(**{filter_name + '__in': filter_value}) \
+            .values('pk') \
+            .annotate(contains_all_count=Count(filter_name, distinct=True)) \
+            .filter(contains_all_count=len(set(filter_value))) \
+            .values('pk')
+
+    def merge_simple_body(self, query, body):
+        """
+        merge_simple_body folds the flat rows returned by values() back into one dict per primary key, nesting the
+        included related items and collecting to-many values into lists.
+        """
+        if query.order_by:
+            body_by_primary_key = OrderedDict()
+        else:
+            body_by_primary_key = {}
+        # pk is not always id
+        model_primary_key_name = self.get_primary_key_name()
+        for body_item in body:
+            if body_item[model_primary_key_name] not in body_by_primary_key:
+                body_by_primary_key[body_item[model_primary_key_name]] = []
+            body_by_primary_key[body_item[model_primary_key_name]].append(body_item)
+
+        body = [self.merge_rows(query, body_items) for body_items in body_by_primary_key.values()]
+
+        with self.timer.phase('decode'):
             for item in body:
                 handle_bytes_decoding(item)
 
-            if is_single_result:
-                if len(body) == 0:
-                    if empty_is_error:
-                        raise self.DoesNotExist(ErrorMessages.DOES_NOT_EXIST.format(self.model.__name__, pk))
-                    body = {}
-                elif len(body) == 1:
-                    body = body[0]
-                    # TODO must make this check in order for permission classes to work with objects
-                    # see pull request #59 for details.
-                    # self.check_object_permissions(request, obj.first())
-                else:
-                    raise Exception('duplicate object for key')
+        return body
 
+    def merge_rows(self, query, body_items):
+        """
+        merge_rows folds the rows values() returned for one primary key into a single dict.
+        """
+        include = query.include
+        full_includes = query.full_includes
+        multi_field = query.multi_field
+
+        # process full includes
+        if full_includes:
+            for body_item in body_items:
+                for include_field in full_includes:
+                    field_names = [field for field in body_item if include_field + '__' in field]
+                    field_names_to_remove = [field for field in field_names if field not in include]
+
+                    body_item[include_field] = {
+                        field_name.replace(include_field + "__", ''):body_item[field_name]
+                        for field_name in field_names
+                    }
 
-            return self.create_response(body=body, serialize=True, include=include, exclude=excludes, fields=fields,
-                                        count=total_items, using_cache=False, cache_key=cache_key, optimized_serialize=True)
+                    if all (val == None for val in body_item[include_field].values()):
+                        if include_field in multi_field:
+                            body_item[include_field] = []
+                        else:
+                            body_item[include_field] = None
+
+                    for field_name in field_names_to_remove:
+                        del body_item[field_name]
+
+        item = body_items[0]
+        # handle possible many to many relationships
+        if len(body_items) > 1:
+            keys = [key for key in body_items[0]]
+            checked_values = {}
+            differences = set()
+            for body_item in body_items:
+                for key in keys:
+                    if key not in checked_values:
+                        checked_values[key] = body_item[key]
+                    if checked_values[key] != body_item[key]:
+                        differences.add(key)
+
+            if len(differences) > 0:
+                for difference in differences:
+                    all_items = [body_item[difference] for body_item in body_items]
+                    if all(type(item) is dict for item in all_items):
+                        # a little uniquefying magic, courtesy of stack overflow https://stackoverflow.com/a/7090833
+                        item[difference] = [
+                            dict(tupleized)
+                            for tupleized in
+                            set(tuple(item.items())
+                            for item in all_items)
+                        ]
+                    else:
+                        item[difference] = all_items
+            else:
+                raise Exception('duplicate object for key')
+
+        # at this point it should be one item
+        for field_name in multi_field:
+            if not type(item[field_name]) is list:
+                item[field_name] = [item[field_name]]
+
+        return item
+
+    def get_facet_queries(self, query):
+        """
+        get_facet_queries returns a query for each requested facet counting the items that match the filters for each
+        value of the facet's field, keyed by the name the facet is returned under.
+        """
+        obj = query.obj.order_by()
+        facet_queries = {}
+        for field_name in query.facets:
+            # to many filters can join the same item in more than once
+            facet_queries[get_alias(field_name)] = obj.values_list(field_name) \
+                .annotate(facet_count=Count('pk', distinct=True)) \
+                .order_by('-facet_count', field_name)
+        return facet_queries
+
+    def get_facets(self, query):
+        """
+        get_facets runs a grouped count for each requested facet, at the same time with concurrent_queries.
+        """
+        facet_queries = self.get_facet_queries(query)
+        fetches = [
+            lambda facet_query=facet_query: self.get_facet_counts(facet_query) for facet_query in facet_queries.values()
+        ]
+        if self.concurrent_queries and len(fetches) > 1:
+            results = run_concurrently(*fetches)
         else:
-            # evaluate the query
-            body = list(obj)
-            if is_single_result:
-                if len(body) == 0:
-                    if empty_is_error:
-                        raise self.DoesNotExist(ErrorMessages.DOES_NOT_EXIST.format(self.model.__name__, pk))
-                    body = {}
-                elif len(body) == 1:
-                    body = body[0]
-                    self.check_object_permissions(request, body)
-                else:
-                    raise Exception('duplicate object for key')
+            results = [fetch() for fetch in fetches]
+        return dict(zip(facet_queries, results))
 
-            return self.create_response(body=body, serialize=True, include=include, exclude=excludes, fields=requested_fields,
-                                                count=total_items, using_cache=False, cache_key=cache_key)
+    @staticmethod
+    def get_facet_counts(rows):
+        return [{'value': value, 'count': count} for value, count in rows]
+
+    def get_aggregate_body(self, query):
+        """
+        get_aggregate_body runs the requested aggregates as one GROUP BY over the filtered query and returns a row for
+        each group, or a single row when nothing is grouped. Groups can be ordered by any grouped field or aggregate and
+        are paged like any other list.
+        """
+        if not query.group_by:
+            return [query.obj.order_by().aggregate(**query.aggregates)], None
+
+        # related fields are selected under their flattened alias
+        group_fields = [field_name for field_name in query.group_by if '__' not in field_name]
+        group_expressions = {
+            get_alias(field_name): F(field_name) for field_name in query.group_by if '__' in field_name
+        }
+        group_aliases = group_fields + list(group_expressions)
+        rows = query.obj.values(*group_fields, **group_expressions).annotate(**query.aggregates)
+
+        if query.order_by and query.order_by.lstrip('-') in set(group_aliases) | set(query.aggregates):
+            rows = rows.order_by(query.order_by)
+        else:
+            rows = rows.order_by(*group_aliases)
+
+        total_items = None
+        if query.is_paged:
+            total_items = -1 if query.data_only else rows.count()
+            page = int(query.page)
+            page_size = int(query.page_size)
+            rows = rows[(page - 1) * page_size:page * page_size]
+        return list(rows), total_items
+
+    def create_export_response(self, query, export_format, is_single_result=False, is_async=False):
+        """
+        create_export_response streams every item the query matches as csv or ndjson. Paging is ignored and no count is
+        run, rows are read with a server side cursor and encoded as they arrive so memory doesn't grow with the export.
+        Single items are refused since they'd skip their object permission checks, and so are aggregates, which export
+        doesn't compute.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise SimplifyAPIException(
+                ErrorMessages.INVALID_EXPORT_FORMAT.format(export_format, ', '.join(EXPORT_FORMATS)),
+                status.HTTP_400_BAD_REQUEST
+            )
+        if is_single_result:
+            raise SimplifyAPIException(ErrorMessages.EXPORT_SINGLE_RESULT, status.HTTP_400_BAD_REQUEST)
+        if query.aggregates:
+            raise SimplifyAPIException(ErrorMessages.EXPORT_WITH_AGGREGATE, status.HTTP_400_BAD_REQUEST)
+        content_type, encode = EXPORT_FORMATS[export_format]
+
+        content = encode(self.get_export_items(query))
+        if is_async:
+            content = aiterate(content, get_export_chunk_size())
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="{0}.{1}"'.format(
+            Mapper.titlecase_to_camelcase(self.model.__name__), export_format)
+        return response
+
+    def get_export_items(self, query):
+        chunk_size = get_export_chunk_size()
+        if query.simple:
+            # the rows values() returns for a primary key have to be next to each other to be merged as they stream
+            ordering = [query.order_by] if query.order_by else list(self.model._meta.ordering)
+            rows = query.obj.order_by(*ordering, 'pk').values(*query.fields).iterator(chunk_size=chunk_size)
+            for body_items in group_rows(rows, self.get_primary_key_name()):
+                item = self.merge_rows(query, body_items)
+                handle_bytes_decoding(item)
+                query.project_json_paths([item])
+                yield Mapper.dict_underscore_to_camelcase(item)
+        else:
+            serializer = self.serializer(exclude=query.excludes, include=query.include, fields=query.requested_fields)
+            for obj in query.obj.iterator(chunk_size=chunk_size):
+                query.project_json_paths([obj])
+                yield Mapper.dict_underscore_to_camelcase(serializer.serialize(obj))
+
+    def get_single_result(self, body, is_single_result, empty_is_error, pk):
+        if not is_single_result:
+            return body
+
+        if len(body) == 0:
+            if empty_is_error:
+                raise self.DoesNotExist(ErrorMessages.DOES_NOT_EXIST.format(self.model.__name__, pk))
+            return {}
+        elif len(body) == 1:
+            return body[0]
+        else:
+            raise Exception('duplicate object for key')
+
+    def get_primary_key_name(self):
+        # pk is not always id
+        return [field.attname for field in self.model._meta.get_fields() if hasattr(field, 'primary_key') and field.primary_key][0]
 
     def get_field_nested(self, field_long_name):
         tree = field_long_name.split('__')
@@ -513,61 +1043,72 @@ class SimplifyView(APIView):
 
     def get_obj_from_linked_objects(self, pk, parent_resource, parent_pk):
         # find the resource that this request is looking for
-        for linked_object in self.linked_objects:
-            if linked_object['parent_resource'] == parent_resource:
-                # setup kwargs for django's orm to query
-                if linked_object['parent_cls']:
-                    if not linked_object['linking_cls']:
-                        if linked_object['parent_name'][-3:] == '_id':
-                            parent_field_name = linked_object['parent_name'][:-3]
-                        else:
-                            parent_field_name = linked_object['parent_name']
-
-                        field = self.get_field_nested(parent_field_name)
-                        if hasattr(field, 'multiple') and field.multiple:
-                            kwargs = {
-                                parent_field_name+'__id': parent_pk
-                            }
-                        else:
-                            kwargs = {
-                                parent_field_name+'_id': parent_pk
-                            }
-                    else:
-                        kwargs = {
-                            linked_object['parent_name']+'_id': parent_pk
-                        }
+        linked_object = self.get_linked_object(parent_resource)
+        if linked_object is None:
+            return None
+        kwargs = self.get_linked_object_kwargs(linked_object, parent_pk)
+
+        # if there is a linking table do that logic
+        if linked_object['linking_cls']:
+            # we have pk so we only need to check if the one linker exists
+            if pk:
+                kwargs[linked_object['sub_resource_name']] = pk
+                if linked_object['linking_cls'].objects.using(self.read_db).filter(**kwargs).exists():
+                    return self.get_queryset().using(self.read_db).filter(pk=pk)
                 else:
-                    kwargs = {
-                        linked_object['parent_name']: parent_pk
-                    }
+                    raise self.DoesNotExist(ErrorMessages.DOES_NOT_EXIST.format(self.model.__name__, pk))
 
-                # if there is a linking table do that logic
-                if linked_object['linking_cls']:
-                    # we have pk so we only need to check if the one linker exists
-                    if pk:
-                            kwargs[linked_object['sub_resource_name']] = pk
-                            if linked_object['linking_cls'].objects.using(self.read_db).filter(**kwargs).exists():
-                                return self.get_queryset().using(self.read_db).filter(pk=pk)
-                            else:
-                                raise self.DoesNotExist(ErrorMessages.DOES_NOT_EXIST.format(self.model.__name__, pk))
+            else:
+                # get the linking table items
+                linked_objs = linked_object['linking_cls'].objects.using(self.read_db).filter(**kwargs)
 
-                    else:
-                        # get the linking table items
-                        linked_objs = linked_object['linking_cls'].objects.using(self.read_db).filter(**kwargs)
+                # go through linking table items and get the sub resources from each entry into a list
+                linked_obj_ids = linked_objs.values_list(linked_object['sub_resource_name'] + '__id', flat=True)
 
-                        # go through linking table items and get the sub resources from each entry into a list
-                        linked_obj_ids = linked_objs.values_list(linked_object['sub_resource_name'] + '__id', flat=True)
+                return self.get_queryset().using(self.read_db).filter(pk__in=linked_obj_ids)
+        # no linking table and the link is on this obj itself
+        else:
+            # if we have a pk we only want the exact resource we are looking for
+            if pk:
+                kwargs['pk'] = pk
+                return self.get_queryset().using(self.read_db).filter(**kwargs)
+            # no pk was passed in meaning we are getting the entire list of items that match the parent resource
+            else:
+                return self.get_queryset().using(self.read_db).filter(**kwargs)
 
-                        return self.get_queryset().using(self.read_db).filter(pk__in=linked_obj_ids)
-                # no linking table and the link is on this obj itself
+    def get_linked_object(self, parent_resource):
+        for linked_object in self.linked_objects:
+            if linked_object['parent_resource'] == parent_resource:
+                return linked_object
+        return None
+
+    def get_linked_object_kwargs(self, linked_object, parent_pk):
+        # setup kwargs for django's orm to query
+        if linked_object['parent_cls']:
+            if not linked_object['linking_cls']:
+                if linked_object['parent_name'][-3:] == '_id':
+                    parent_field_name = linked_object['parent_name'][:-3]
                 else:
-                    # if we have a pk we only want the exact resource we are looking for
-                    if pk:
-                        kwargs['pk'] = pk
-                        return self.get_queryset().using(self.read_db).filter(**kwargs)
-                    # no pk was passed in meaning we are getting the entire list of items that match the parent resource
-                    else:
-                        return self.get_queryset().using(self.read_db).filter(**kwargs)
+                    parent_field_name = linked_object['parent_name']
+
+                field = self.get_field_nested(parent_field_name)
+                if hasattr(field, 'multiple') and field.multiple:
+                    kwargs = {
+                        parent_field_name+'__id': parent_pk
+                    }
+                else:
+                    kwargs = {
+                        parent_field_name+'_id': parent_pk
+                    }
+            else:
+                kwargs = {
+                    linked_object['parent_name']+'_id': parent_pk
+                }
+        else:
+            kwargs = {
+                linked_object['parent_name']: parent_pk
+            }
+        return kwargs
 
     def post(self, request, parent_resource=None, parent_pk=None):
         # check we are authorized to POST
@@ -664,7 +1205,7 @@ class SimplifyView(APIView):
         """
         pass
 
-    def create_response(self, body=None, response_status=None, error_message=None, content_type='application/json', serialize=False, exclude=[], include=[], fields=[], count=None, using_cache=False, cache_key=None, optimized_serialize=False):
+    def create_response(self, body=None, response_status=None, error_message=None, content_type='application/json', serialize=False, exclude=[], include=[], fields=[], count=None, using_cache=False, cache_key=None, optimized_serialize=False, facets=None):
         if using_cache:
             response = Response(body, status=status.HTTP_200_OK, content_type=content_type)
             response['Hit'] = 1
@@ -685,14 +1226,22 @@ class SimplifyView(APIView):
                 body = {}
             else:
                 if not optimized_serialize:
-                    serializer = self.serializer(exclude=exclude, include=include, fields=fields)
-                    body = serializer.serialize(body)
-                body = Mapper.dict_underscore_to_camelcase(body)
+                    with self.timer.phase('serialize'):
+                        serializer = self.serializer(exclude=exclude, include=include, fields=fields)
+                        body = serializer.serialize(body)
+                with self.timer.phase('camelcase'):
+                    body = Mapper.dict_underscore_to_camelcase(body)
                 if count is not None:
                     body = {
                         'count': count if count != -1 else None,
                         'data': body
                     }
+                if facets is not None:
+                    if count is None:
+                        body = {
+                            'data': body
+                        }
+                    body['facets'] = Mapper.dict_underscore_to_camelcase(facets)
         if cache_key and response_status == status.HTTP_200_OK:
             if hasattr(self.model, 'CACHE_TIME'):
                 cache_time = self.model.CACHE_TIME
@@ -714,24 +1263,287 @@ class SimplifyView(APIView):
 
     @staticmethod
     def execute_on_linked_object(obj, linked_objects, passed_in_parent_resource, parent_pk, snake_cased_url_tail, write_db):
-        linking_class_results = [i for i in linked_objects if
-                                 i['parent_resource'] == passed_in_parent_resource and i['linking_cls']]
-        lives_on_parent_results = [i for i in linked_objects if 'lives_on_parent' in i
-                                   and i['lives_on_parent'] and i['sub_resource_name'] == snake_cased_url_tail]
+        # the parent and the linking item are saved before the read models they are in are refreshed
+        with deferred_refreshes():
+            linking_class_results = [i for i in linked_objects if
+                                     i['parent_resource'] == passed_in_parent_resource and i['linking_cls']]
+            lives_on_parent_results = [i for i in linked_objects if 'lives_on_parent' in i
+                                       and i['lives_on_parent'] and i['sub_resource_name'] == snake_cased_url_tail]
+
+            if len(lives_on_parent_results) > 0:
+                linked_object = lives_on_parent_results[0]
+                parent_obj = linked_object['parent_cls'].objects.get(pk=parent_pk)
+                setattr(parent_obj, linked_object['sub_resource_name'], obj)
+                parent_obj.save(using=write_db)
+            elif len(linking_class_results) > 0:
+                linked_object = linking_class_results[0]
+                parent_obj = linked_object['parent_cls'].objects.get(pk=parent_pk)
+                # create new linking table
+                new_linking_obj = linked_object['linking_cls']()
+                setattr(new_linking_obj, linked_object['parent_name'], parent_obj)
+                setattr(new_linking_obj, linked_object['sub_resource_name'], obj)
+                new_linking_obj.save(using=write_db)
+
+
+class AsyncSimplifyView(SimplifyView):
+    """
+    AsyncSimplifyView serves the same contract as SimplifyView for ASGI deployments. Reads use Django's async ORM
+    and cache calls so a slow query doesn't hold a worker thread. Writes still run the sync parse and cascade_save
+    in a thread since parsing validates against the database at every level.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # csrf_exempt hides that the view is a coroutine function before Django 5.0
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # authentication, permission and throttle checks can all hit the database
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = await self.ahandle_exception(exc)
 
-        if len(lives_on_parent_results) > 0:
-            linked_object = lives_on_parent_results[0]
-            parent_obj = linked_object['parent_cls'].objects.get(pk=parent_pk)
-            setattr(parent_obj, linked_object['sub_resource_name'], obj)
-            parent_obj.save(using=write_db)
-        elif len(linking_class_results) > 0:
-            linked_object = linking_class_results[0]
-            parent_obj = linked_object['parent_cls'].objects.get(pk=parent_pk)
-            # create new linking table
-            new_linking_obj = linked_object['linking_cls']()
-            setattr(new_linking_obj, linked_object['parent_name'], parent_obj)
-            setattr(new_linking_obj, linked_object['sub_resource_name'], obj)
-            new_linking_obj.save(using=write_db)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ahandle_exception(self, exc):
+        # checking whether the read_db can be reached touches its connection, which can't be done on the event loop
+        return await sync_to_async(self.handle_exception)(exc)
+
+    async def delete(self, request, pk=None, parent_resource=None, parent_pk=None):
+        if parent_pk and parent_resource and self.linked_objects:
+            if 'DELETE_SUB' not in self.supported_methods:
+                raise Exception(ErrorMessages.DELETE_SUB_NOT_SUPPORTED.format(self.model.__name__))
+        else:
+            if 'DELETE' not in self.supported_methods:
+                raise Exception(ErrorMessages.DELETE_NOT_SUPPORTED.format(self.model.__name__))
+
+        try:
+            obj = await self.get_queryset().using(self.read_db).aget(pk=pk)
+        except self.DoesNotExist:
+            raise self.DoesNotExist(ErrorMessages.DOES_NOT_EXIST.format(self.model.__name__, pk))
+        await sync_to_async(self.check_object_permissions)(request, obj)
+
+        # check query param to only delete linker
+        delete_link_only = request.query_params.get('deleteLinkOnly', False)
+
+        # further checks
+        for linked_object in self.linked_objects:
+            # we have a linking table we need to clear the linking table objects
+            if linked_object['sub_resource_name'] and linked_object['linking_cls']:
+                kwargs = {
+                    linked_object['sub_resource_name']: obj
+                }
+                # get the linking table items
+                linked_objs = linked_object['linking_cls'].objects.using(self.read_db).filter(**kwargs)
+                async for linked_obj in linked_objs:
+                    await linked_obj.adelete(using=self.read_db)
+
+        if not delete_link_only:
+            await obj.adelete(using=self.write_db)
+
+        return self.create_response()
+
+    async def get(self, request, pk=None, parent_resource=None, parent_pk=None):
+        meta_request = request.query_params.get('meta', False)
+        if meta_request:
+            # grab models fields and return them as a dict
+            meta_data = self.model.get_meta_data()
+            return self.create_response(body=meta_data)
+
+        # handle caching
+        cache_key = None
+        if hasattr(self.model, 'CACHE'):
+            cache_key = request.get_full_path()
+            with self.timer.phase('cache'):
+                result = await cache.aget(cache_key, None)
+            if result:
+                return self.create_response(body=result, using_cache=True, cache_key=cache_key)
+
+        with self.timer.phase('parse'):
+            obj, is_single_result, empty_is_error = await self.aget_obj(request, pk, parent_resource, parent_pk)
+            if get_model_capabilities(self.model).has_filterable_properties:
+                # filterable property expressions are allowed to query the database while they are built
+                query = await sync_to_async(self.build_query)(request, obj)
+            else:
+                query = self.build_query(request, obj)
+
+        export_format = request.query_params.get('export', None)
+        if export_format:
+            return self.create_export_response(query, export_format, is_single_result, is_async=True)
+
+        if query.aggregates:
+            with self.timer.phase('aggregate'):
+                body, total_items = await sync_to_async(self.get_aggregate_body)(query)
+                self.timer.set_rows(len(body))
+            return await self.acreate_response(body=body, serialize=True, count=total_items, cache_key=cache_key,
+                                               optimized_serialize=True)
+
+        facets = None
+        if query.facets and not is_single_result:
+            with self.timer.phase('facets'):
+                facets = await self.aget_facets(query)
+
+        # handle paging Mr. Herman
+        if query.count_only:
+            with self.timer.phase('count'):
+                total_items = await query.obj.using(self.read_db).acount()
+            return self.create_response(body=[], serialize=True, include=None, exclude=None, fields=None,
+                                        count=total_items, facets=facets, using_cache=False, cache_key=None,
+                                        optimized_serialize=True)
+
+        total_items = None
+        count_obj = None
+        if query.is_paged:
+            # need to get total items for response if paging
+            if query.data_only:
+                total_items = -1
+            else:
+                count_obj = query.obj.using(self.read_db)
+            query.paginate()
+
+        read_model = None if is_single_result else self.get_read_model(query)
+        if read_model is not None:
+            fetch = lambda: self.fetch_read_model_items(query, read_model)
+        elif query.simple:
+            fetch = lambda: list(query.obj.values(*query.fields))
+        else:
+            fetch = lambda: self.fetch_objs(query.obj)
+
+        if self.concurrent_queries:
+            # the async orm runs every query on one thread so hand them to the pool to run at the same time
+            with self.timer.phase('page'):
+                if count_obj is not None:
+                    body, total_items = await arun_concurrently(fetch, count_obj.count)
+                else:
+                    body, = await arun_concurrently(fetch)
+                self.timer.set_rows(len(body))
+        else:
+            if count_obj is not None:
+                with self.timer.phase('count'):
+                    total_items = await count_obj.acount()
+            with self.timer.phase('page'):
+                if read_model is not None:
+                    # items missing from the read model are serialized from the source model, which runs sync queries
+                    body = await sync_to_async(fetch)()
+                elif query.simple:
+                    body = [item async for item in query.obj.values(*query.fields)]
+                else:
+                    body = [item async for item in query.obj]
+                self.timer.set_rows(len(body))
+
+        if read_model is not None:
+            return await self.acreate_response(body=body, serialize=True, count=total_items, facets=facets,
+                                               cache_key=cache_key, optimized_serialize=True)
+
+        if query.simple:
+            with self.timer.phase('merge'):
+                body = self.merge_simple_body(query, body)
+                query.project_json_paths(body)
+                self.timer.set_rows(len(body))
+            body = self.get_single_result(body, is_single_result, empty_is_error, pk)
+            return await self.acreate_response(body=body, serialize=True, include=query.include,
+                                               exclude=query.excludes, fields=query.fields, count=total_items,
+                                               facets=facets, cache_key=cache_key, optimized_serialize=True)
+        else:
+            query.project_json_paths(body)
+            body = self.get_single_result(body, is_single_result, empty_is_error, pk)
+            if is_single_result and body:
+                await sync_to_async(self.check_object_permissions)(request, body)
+
+            # serializing model instances can lazily load relations and properties so it has to happen in a thread
+            response = await sync_to_async(self.create_response)(body=body, serialize=True, include=query.include,
+                                                                 exclude=query.excludes,
+                                                                 fields=query.requested_fields, count=total_items,
+                                                                 facets=facets)
+            await self.aset_cache(cache_key, response)
+            return response
+
+    async def aget_facets(self, query):
+        facet_queries = self.get_facet_queries(query)
+        if self.concurrent_queries:
+            results = await arun_concurrently(*[
+                lambda facet_query=facet_query: self.get_facet_counts(facet_query)
+                for facet_query in facet_queries.values()
+            ])
+        else:
+            results = [
+                self.get_facet_counts([row async for row in facet_query]) for facet_query in facet_queries.values()
+            ]
+        return dict(zip(facet_queries, results))
+
+    async def aget_obj(self, request, pk=None, parent_resource=None, parent_pk=None):
+        """
+        aget_obj is the async version of get_obj. Only the lookups that have to run before the base queryset can be
+        built are awaited, everything else is lazy.
+        """
+        if pk and parent_resource and parent_pk and self.linked_objects:
+            if 'GET_SUB' not in self.supported_methods:
+                raise Exception(ErrorMessages.GET_SUB_NOT_SUPPORTED.format(self.model.__name__))
+            obj = await self.aget_obj_from_linked_objects(pk, parent_resource, parent_pk)
+            return obj, True, True
+
+        if not pk and parent_pk and parent_resource and self.linked_objects:
+            linked_object = self.get_lives_on_parent_linked_object(request)
+            if linked_object:
+                if 'GET_SUB' not in self.supported_methods:
+                    raise Exception(ErrorMessages.GET_SUB_NOT_SUPPORTED.format(self.model.__name__))
+
+                child_id_field_name = linked_object['sub_resource_name']+'_id'
+                parent = await linked_object['parent_cls'].objects.using(self.read_db).values(child_id_field_name).aget(pk=parent_pk)
+                obj = self.get_queryset().using(self.read_db).filter(pk=parent[child_id_field_name])
+                # there is no empty_is_error here to preserve legacy behavior of empty object in this specific case
+                return obj, True, False
+
+        # nothing left needs the database before the queryset is evaluated
+        return self.get_obj(request, pk, parent_resource, parent_pk)
+
+    async def aget_obj_from_linked_objects(self, pk, parent_resource, parent_pk):
+        linked_object = self.get_linked_object(parent_resource)
+        if linked_object and linked_object['linking_cls'] and pk:
+            # we have pk so we only need to check if the one linker exists
+            kwargs = self.get_linked_object_kwargs(linked_object, parent_pk)
+            kwargs[linked_object['sub_resource_name']] = pk
+            if await linked_object['linking_cls'].objects.using(self.read_db).filter(**kwargs).aexists():
+                return self.get_queryset().using(self.read_db).filter(pk=pk)
+            else:
+                raise self.DoesNotExist(ErrorMessages.DOES_NOT_EXIST.format(self.model.__name__, pk))
+
+        return self.get_obj_from_linked_objects(pk, parent_resource, parent_pk)
+
+    async def post(self, request, parent_resource=None, parent_pk=None):
+        return await sync_to_async(super().post)(request, parent_resource=parent_resource, parent_pk=parent_pk)
+
+    async def put(self, request, pk):
+        return await sync_to_async(super().put)(request, pk)
+
+    async def acreate_response(self, cache_key=None, **kwargs):
+        response = self.create_response(**kwargs)
+        await self.aset_cache(cache_key, response)
+        return response
+
+    async def aset_cache(self, cache_key, response):
+        if cache_key and response.status_code == status.HTTP_200_OK:
+            if hasattr(self.model, 'CACHE_TIME'):
+                await cache.aset(cache_key, response.data, self.model.CACHE_TIME)
 
 
 class SimplifyStoredProcedureView(APIView):
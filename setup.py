@@ -7,7 +7,9 @@ setup(
     author='Skyler Cain',
     author_email='skylercain@gmail.com',
     url='https://github.com/Skylude/django-rest-framework-simplify',
-    packages=['rest_framework_simplify', 'rest_framework_simplify.services', 'rest_framework_simplify.services.sql_executor'],
+    packages=['rest_framework_simplify', 'rest_framework_simplify.management',
+              'rest_framework_simplify.management.commands', 'rest_framework_simplify.services',
+              'rest_framework_simplify.services.sql_executor'],
     install_requires=[
         'appdirs',
         'blinker',
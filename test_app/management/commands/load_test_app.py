@@ -0,0 +1,227 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+
+from test_app.models import BasicClass, LinkingClass, ModelWithParentResource
+
+
+def basic_list_cached(sample, rng):
+    # the same url every time so everything after the first request is served from the cache
+    return 'GET', '/basicClass?page=1&pageSize=25&orderBy=id', None
+
+
+def basic_list(sample, rng):
+    return 'GET', '/basicClass?page={0}&pageSize=25&orderBy=id&filters=name__icontains={1}'.format(
+        rng.randint(1, 20), rng.choice(['alpha', 'beta', 'gamma', 'delta', 'omega'])), None
+
+
+def basic_list_include(sample, rng):
+    return 'GET', '/basicClass?page={0}&pageSize=25&orderBy=id&include=childOne,childThree'.format(
+        rng.randint(1, 20)), None
+
+
+def basic_detail(sample, rng):
+    return 'GET', '/basicClass/{0}?include=childOne,childThree'.format(rng.choice(sample['basic_class_ids'])), None
+
+
+def linked_sub_resource(sample, rng):
+    basic_class_id, child_class_id = rng.choice(sample['linking_pairs'])
+    return 'GET', '/basicClasses/{0}/childClass/{1}'.format(basic_class_id, child_class_id), None
+
+
+def linked_sub_resource_list(sample, rng):
+    return 'GET', '/basicClasses/{0}/childClass'.format(rng.choice(sample['linking_basic_class_ids'])), None
+
+
+def async_linked_sub_resource_list(sample, rng):
+    return 'GET', '/basicClasses/{0}/asyncChildClass'.format(rng.choice(sample['linking_basic_class_ids'])), None
+
+
+def lives_on_parent(sample, rng):
+    return 'GET', '/basicClasses/{0}/childOne'.format(rng.choice(sample['basic_class_ids'])), None
+
+
+def parent_resource_list(sample, rng):
+    return 'GET', '/basicClasses/{0}/modelWithParentResources'.format(
+        rng.choice(sample['parent_resource_basic_class_ids'])), None
+
+
+def phase_groups_filtered(sample, rng):
+    return 'GET', '/phaseGroups?filters=active=true&page=1&pageSize=25', None
+
+
+def stored_procedure(sample, rng):
+    return 'POST', '/postgresStoredProcedures', {'spName': 'postgres_format', 'var_int': rng.randint(1, 1000)}
+
+
+PROFILES = {
+    'basic_list_cached': basic_list_cached,
+    'basic_list': basic_list,
+    'basic_list_include': basic_list_include,
+    'basic_detail': basic_detail,
+    'linked_sub_resource': linked_sub_resource,
+    'linked_sub_resource_list': linked_sub_resource_list,
+    'async_linked_sub_resource_list': async_linked_sub_resource_list,
+    'lives_on_parent': lives_on_parent,
+    'parent_resource_list': parent_resource_list,
+    'phase_groups_filtered': phase_groups_filtered,
+    'stored_procedure': stored_procedure
+}
+
+# the stored procedure only exists on postgres
+POSTGRES_ONLY_PROFILES = ['stored_procedure']
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0
+    index = min(int(round(percent / 100 * len(sorted_values) + 0.5)) - 1, len(sorted_values) - 1)
+    return sorted_values[max(index, 0)]
+
+
+class Command(BaseCommand):
+    help = 'Fires a mix of requests at the test_app endpoints from many threads and reports latency per endpoint. ' \
+           'Run seed_test_app first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=1000, help='total number of requests to send')
+        parser.add_argument('--duration', type=float, default=None,
+                            help='send requests for this many seconds instead of a fixed number')
+        parser.add_argument('--profiles', default=None,
+                            help='comma separated name=weight pairs, e.g. basic_list=3,basic_detail=1. '
+                                 'Defaults to every profile with a weight of 1. '
+                                 'Available: {0}'.format(', '.join(PROFILES)))
+        parser.add_argument('--base-url', default=None,
+                            help='send requests to a running server, e.g. http://localhost:8000, instead of '
+                                 'through the django test client')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.profiles, self.weights = self.get_profiles(options['profiles'])
+        self.sample = self.get_sample()
+        self.base_url = options['base_url']
+        self.seed = options['seed']
+        self.lock = threading.Lock()
+        self.results = {name: [] for name in self.profiles}
+        self.errors = {name: 0 for name in self.profiles}
+        self.remaining = options['requests']
+        self.deadline = time.monotonic() + options['duration'] if options['duration'] else None
+
+        threads = [threading.Thread(target=self.run_worker, args=(i,)) for i in range(options['threads'])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        self.report(elapsed)
+
+    def get_profiles(self, profiles_option):
+        if not profiles_option:
+            names = [name for name in PROFILES
+                     if connection.vendor == 'postgresql' or name not in POSTGRES_ONLY_PROFILES]
+            return names, [1] * len(names)
+
+        names = []
+        weights = []
+        for profile in profiles_option.split(','):
+            name, _, weight = profile.partition('=')
+            name = name.strip()
+            if name not in PROFILES:
+                raise CommandError('{0} is not a load profile. Available: {1}'.format(name, ', '.join(PROFILES)))
+            names.append(name)
+            weights.append(float(weight) if weight else 1)
+        return names, weights
+
+    def get_sample(self):
+        sample = {
+            'basic_class_ids': list(BasicClass.objects.order_by('?').values_list('id', flat=True)[:1000]),
+            'linking_pairs': list(
+                LinkingClass.objects.order_by('?').values_list('basic_class_id', 'child_class_id')[:1000]
+            ),
+            'parent_resource_basic_class_ids': list(
+                ModelWithParentResource.objects.order_by('?').values_list('basic_class_id', flat=True)[:1000]
+            )
+        }
+        sample['linking_basic_class_ids'] = [basic_class_id for basic_class_id, child_id in sample['linking_pairs']]
+        if not sample['basic_class_ids'] or not sample['linking_pairs'] or not sample['parent_resource_basic_class_ids']:
+            raise CommandError('There is no data to load test with. Run seed_test_app first.')
+        # the workers use their own connections
+        connection.close()
+        return sample
+
+    def take_request(self):
+        if self.deadline is not None:
+            return time.monotonic() < self.deadline
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def run_worker(self, worker_number):
+        rng = random.Random(None if self.seed is None else self.seed + worker_number)
+        send = self.get_sender()
+        try:
+            while self.take_request():
+                name = rng.choices(self.profiles, weights=self.weights)[0]
+                method, path, data = PROFILES[name](self.sample, rng)
+                started = time.perf_counter()
+                try:
+                    status_code = send(method, path, data)
+                except Exception:
+                    status_code = None
+                elapsed = time.perf_counter() - started
+                with self.lock:
+                    self.results[name].append(elapsed)
+                    if status_code is None or status_code >= 400:
+                        self.errors[name] += 1
+        finally:
+            connections.close_all()
+
+    def get_sender(self):
+        if self.base_url:
+            # requests is only needed when load testing a running server
+            import requests
+            session = requests.Session()
+
+            def send(method, path, data):
+                return session.request(method, self.base_url.rstrip('/') + path, json=data).status_code
+        else:
+            # localhost is allowed when DEBUG is on and testserver when running under the test runner
+            client = Client(HTTP_HOST='testserver' if 'testserver' in settings.ALLOWED_HOSTS else 'localhost')
+
+            def send(method, path, data):
+                if method == 'POST':
+                    return client.post(path, data, content_type='application/json').status_code
+                return client.get(path).status_code
+        return send
+
+    def report(self, elapsed):
+        row = '{0:<30} {1:>8} {2:>7} {3:>9} {4:>9} {5:>9} {6:>9} {7:>9}'
+        self.stdout.write(row.format('endpoint', 'requests', 'errors', 'req/s', 'mean ms', 'p50 ms', 'p95 ms',
+                                     'p99 ms'))
+        all_timings = []
+        for name in self.profiles:
+            timings = sorted(self.results[name])
+            all_timings.extend(timings)
+            self.stdout.write(self.format_row(row, name, timings, self.errors[name], elapsed))
+        self.stdout.write(self.format_row(row, 'total', sorted(all_timings), sum(self.errors.values()), elapsed))
+
+    @staticmethod
+    def format_row(row, name, timings, errors, elapsed):
+        mean = sum(timings) / len(timings) if timings else 0
+        return row.format(
+            name, len(timings), errors, '{0:.1f}'.format(len(timings) / elapsed),
+            '{0:.2f}'.format(mean * 1000),
+            '{0:.2f}'.format(percentile(timings, 50) * 1000),
+            '{0:.2f}'.format(percentile(timings, 95) * 1000),
+            '{0:.2f}'.format(percentile(timings, 99) * 1000)
+        )
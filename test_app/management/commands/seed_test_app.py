@@ -0,0 +1,132 @@
+import random
+import string
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from test_app.models import Application, BasicClass, ChildClass, Community, CommunityApplication, LinkingClass, \
+    ModelWithParentResource, PhaseGroup
+
+BATCH_SIZE = 2000
+
+# a few shared words in names so icontains filters match a realistic slice of the table
+NAME_WORDS = ['alpha', 'beta', 'gamma', 'delta', 'omega']
+
+
+class Command(BaseCommand):
+    help = 'Seeds the test_app models with synthetic data for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1000, help='number of basic classes to create')
+        parser.add_argument('--fan-out', type=int, default=3,
+                            help='average number of related rows for each to-many relation')
+        parser.add_argument('--shared-children', type=int, default=200,
+                            help='number of child classes the to-many relations are spread across')
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--seed', type=int, default=None, help='random seed so runs can be repeated')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.fan_out = options['fan_out']
+        database = options['database']
+
+        with transaction.atomic(using=database):
+            shared_children = ChildClass.objects.using(database).bulk_create([
+                ChildClass(name=self.get_name()) for i in range(options['shared_children'])
+            ])
+            basic_classes = []
+            for start in range(0, options['scale'], BATCH_SIZE):
+                size = min(BATCH_SIZE, options['scale'] - start)
+                basic_classes.extend(self.seed_basic_classes(database, size, shared_children))
+            phase_groups = self.seed_phase_groups(database, max(options['scale'] // 10, 1))
+
+        if connections[database].vendor == 'postgresql':
+            self.set_up_stored_procedures(database)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Seeded {0} basic classes, {1} shared child classes and {2} phase groups'.format(
+                len(basic_classes), len(shared_children), len(phase_groups))
+        ))
+
+    def seed_basic_classes(self, database, size, shared_children):
+        child_ones = ChildClass.objects.using(database).bulk_create([
+            ChildClass(name=self.get_name()) for i in range(size)
+        ])
+        basic_classes = BasicClass.objects.using(database).bulk_create([
+            BasicClass(name=self.get_name(), active=self.random.random() < 0.8, child_one=child_one)
+            for child_one in child_ones
+        ])
+
+        child_three_links = []
+        linking_classes = []
+        model_with_parent_resources = []
+        for basic_class in basic_classes:
+            for child in self.sample(shared_children):
+                child_three_links.append(
+                    BasicClass.child_three.through(basicclass_id=basic_class.id, childclass_id=child.id)
+                )
+            for child in self.sample(shared_children):
+                linking_classes.append(LinkingClass(basic_class=basic_class, child_class=child))
+            for i in range(self.get_fan_out()):
+                model_with_parent_resources.append(
+                    ModelWithParentResource(basic_class=basic_class, text_field=self.get_name(),
+                                            active=self.random.random() < 0.8)
+                )
+
+        BasicClass.child_three.through.objects.using(database).bulk_create(child_three_links, batch_size=BATCH_SIZE)
+        LinkingClass.objects.using(database).bulk_create(linking_classes, batch_size=BATCH_SIZE)
+        ModelWithParentResource.objects.using(database).bulk_create(model_with_parent_resources,
+                                                                    batch_size=BATCH_SIZE)
+        return basic_classes
+
+    def seed_phase_groups(self, database, size):
+        lead_mgmt = Application.objects.using(database).filter(name='Lead Mgmt').first()
+        if not lead_mgmt:
+            lead_mgmt = Application(name='Lead Mgmt')
+            lead_mgmt.save(using=database)
+        other = Application(name=self.get_name())
+        other.save(using=database)
+
+        phase_groups = PhaseGroup.objects.using(database).bulk_create([PhaseGroup() for i in range(size)])
+        communities = Community.objects.using(database).bulk_create([
+            Community(phase_group=phase_group)
+            for phase_group in phase_groups
+            for i in range(self.get_fan_out())
+        ], batch_size=BATCH_SIZE)
+        CommunityApplication.objects.using(database).bulk_create([
+            CommunityApplication(community=community, application=self.random.choice([lead_mgmt, other]),
+                                 active=self.random.random() < 0.5)
+            for community in communities
+        ], batch_size=BATCH_SIZE)
+        return phase_groups
+
+    @staticmethod
+    def set_up_stored_procedures(database):
+        with connections[database].cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE OR REPLACE FUNCTION postgres_format (
+                    var_int int,
+                    var_str varchar
+                )
+                RETURNS TABLE (
+                    amount DECIMAL
+                ) AS $result$
+                BEGIN
+                RETURN QUERY SELECT var_int::DECIMAL AS "amount";
+                END; $result$
+                LANGUAGE 'plpgsql';
+                """
+            )
+
+    def get_name(self):
+        # names are capped at 15 characters on the test models
+        suffix = ''.join(self.random.choices(string.ascii_lowercase + string.digits, k=10))
+        return '{0}{1}'.format(self.random.choice(NAME_WORDS), suffix)[:15]
+
+    def get_fan_out(self):
+        # most rows sit near the average with a long tail, like real to-many relations
+        return min(int(self.random.expovariate(1 / self.fan_out)), self.fan_out * 10) if self.fan_out else 0
+
+    def sample(self, population):
+        return self.random.sample(population, min(self.get_fan_out(), len(population)))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 11:06
+
+from django.db import migrations
+import rest_framework_simplify.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0015_childclass_active_modelwithparentresource_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='basicclass',
+            index=rest_framework_simplify.indexes.RevicontainsIndex('name', name='basicclass_name_revicontains'),
+        ),
+    ]
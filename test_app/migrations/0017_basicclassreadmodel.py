@@ -0,0 +1,25 @@
+# Generated by Django 4.2.8 on 2026-10-19 11:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import rest_framework.utils.encoders
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0016_basicclass_name_revicontains'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BasicClassReadModel',
+            fields=[
+                ('data', models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder)),
+                ('source', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='read_model', serialize=False, to='test_app.basicclass')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.8 on 2026-10-19 11:39
+
+from django.db import migrations
+import rest_framework_simplify.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0017_basicclassreadmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='encryptedclassnodisplaychars',
+            name='encrypted_val_index',
+            field=rest_framework_simplify.fields.SimplifyBlindIndexField(blank=True, db_index=True, max_length=64, null=True, source='encrypted_val'),
+        ),
+    ]
@@ -2,8 +2,10 @@ from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
 
-from rest_framework_simplify.models import SimplifyModel
-from rest_framework_simplify.fields import SimplifyEncryptedCharField, SimplifyJsonTextField
+from rest_framework_simplify.models import SimplifyModel, SimplifyReadModel
+from rest_framework_simplify.fields import SimplifyBlindIndexField, SimplifyEncryptedCharField, SimplifyJsonTextField
+from rest_framework_simplify.indexes import RevicontainsIndex
+from rest_framework_simplify.registry import get_default_heavy_fields
 
 
 class BasicClass(SimplifyModel):
@@ -23,10 +25,17 @@ class BasicClass(SimplifyModel):
 
     change_tracking_fields = ['name', 'child_one']
 
+    class Meta:
+        indexes = [RevicontainsIndex('name', name='basicclass_name_revicontains')]
+
     @property
     def test_prop(self):
         return True
 
+    @property
+    def display_name(self):
+        return '{0} ({1})'.format(self.name, 'active' if self.active else 'inactive')
+
     @staticmethod
     def get_filters():
         return {
@@ -59,12 +68,40 @@ class BasicClass(SimplifyModel):
 
     @staticmethod
     def get_includes():
-        return ['child_one__name', 'child_three', 'model_with_sensitive_data', 'child_one', 'child_one__nested_child']
+        return ['child_one__name', 'child_three', 'model_with_sensitive_data', 'child_one', 'child_one__nested_child',
+                'display_name', 'test_prop']
+
+    @staticmethod
+    def get_property_dependencies():
+        return {
+            'display_name': ['name', 'active']
+        }
+
+    @staticmethod
+    def get_aggregates():
+        return {
+            'id': ['count', 'sum', 'avg', 'min', 'max'],
+            'created': ['min', 'max']
+        }
+
+    @staticmethod
+    def get_group_by():
+        return ['name', 'active', 'child_one__name']
 
     @staticmethod
     def get_excludes():
         return ['exclude_field']
 
+    @classmethod
+    def get_heavy_fields(cls):
+        return get_default_heavy_fields(cls)
+
+
+class BasicClassReadModel(SimplifyReadModel):
+    source = models.OneToOneField('BasicClass', primary_key=True, related_name='read_model', on_delete=models.CASCADE)
+
+    include = ['child_one__nested_child', 'child_three', 'display_name']
+
 
 class ChildClass(SimplifyModel):
     CACHE = True
@@ -106,6 +143,20 @@ class EncryptedClass(SimplifyModel):
 class EncryptedClassNoDisplayChars(SimplifyModel):
     id = models.AutoField(primary_key=True)
     encrypted_val = SimplifyEncryptedCharField()
+    encrypted_val_index = SimplifyBlindIndexField(source='encrypted_val')
+
+    @staticmethod
+    def get_filters():
+        return {
+            'encrypted_val': {
+                'type': str,
+                'list': False
+            },
+            'encrypted_val__in': {
+                'type': str,
+                'list': True
+            }
+        }
 
 
 class JsonTextFieldClass(SimplifyModel):
@@ -85,6 +85,20 @@ class DataGenerator:
         encrypted_class_without_display_value.save()
         return encrypted_class_without_display_value
 
+    @staticmethod
+    def get_stored_encrypted_val(encrypted_class):
+        # the bytes in the column, before the field decrypts them
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT encrypted_val FROM {0} WHERE id = %s'.format(encrypted_class._meta.db_table),
+                           [encrypted_class.id])
+            return bytes(cursor.fetchone()[0])
+
+    @staticmethod
+    def set_stored_encrypted_val(encrypted_class, value):
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE {0} SET encrypted_val = %s WHERE id = %s'.format(encrypted_class._meta.db_table),
+                           [value, encrypted_class.id])
+
     @staticmethod
     def set_up_linking_class(basic_class=None, child_class=None):
         if not basic_class:
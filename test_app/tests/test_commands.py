@@ -0,0 +1,185 @@
+import django
+import os
+import unittest
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
+django.setup()
+
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from rest_framework_simplify.fields import get_key_id
+from test_app.models import BasicClass, EncryptedClass, EncryptedClassNoDisplayChars
+from test_app.tests.helpers import DataGenerator
+
+
+class SeedTestAppTests(unittest.TestCase):
+
+    def test_seed_creates_basic_classes(self):
+        # arrange
+        count = BasicClass.objects.count()
+        out = StringIO()
+
+        # act
+        call_command('seed_test_app', scale=5, fan_out=2, shared_children=3, seed=1, stdout=out)
+
+        # assert
+        self.assertEqual(BasicClass.objects.count(), count + 5)
+        self.assertIn('Seeded 5 basic classes', out.getvalue())
+
+
+class LoadTestAppTests(unittest.TestCase):
+
+    def test_load_reports_every_profile(self):
+        # arrange
+        call_command('seed_test_app', scale=5, fan_out=2, shared_children=3, seed=1, stdout=StringIO())
+        out = StringIO()
+
+        # act
+        call_command('load_test_app', requests=10, threads=2, profiles='basic_detail=2,lives_on_parent', seed=1,
+                     stdout=out)
+
+        # assert
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines], ['endpoint', 'basic_detail', 'lives_on_parent', 'total'])
+        self.assertEqual(lines[-1].split()[1:3], ['10', '0'])
+
+    def test_load_linked_sub_resource_lists_on_the_sync_and_async_views(self):
+        # arrange
+        call_command('seed_test_app', scale=5, fan_out=2, shared_children=3, seed=1, stdout=StringIO())
+        out = StringIO()
+
+        # act
+        call_command('load_test_app', requests=10, threads=2,
+                     profiles='linked_sub_resource_list,async_linked_sub_resource_list', seed=1, stdout=out)
+
+        # assert
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines],
+                         ['endpoint', 'linked_sub_resource_list', 'async_linked_sub_resource_list', 'total'])
+        self.assertEqual(lines[-1].split()[1:3], ['10', '0'])
+
+    def test_load_with_unknown_profile_raises(self):
+        # act / assert
+        with self.assertRaises(CommandError):
+            call_command('load_test_app', requests=1, profiles='not_a_profile', stdout=StringIO())
+
+
+class RotateEncryptionKeysTests(unittest.TestCase):
+    new_key = '1234567890abcdef'
+
+    def setUp(self):
+        self.old_key = EncryptedClass._meta.get_field('encrypted_val').keys[0]
+        self.values = ['1111222233334444', '5555666677778888', '9999000011112222']
+        # the first is written without a key id, the way values are until DB_ENCRYPTION_KEY_IDS is turned on
+        self.encrypted_classes = [DataGenerator.set_up_encrypted_class(value=self.values[0])]
+        with override_settings(DB_ENCRYPTION_KEY_IDS=True):
+            self.encrypted_classes += [DataGenerator.set_up_encrypted_class(value=value) for value in self.values[1:]]
+        self.start_after = self.encrypted_classes[0].id - 1
+
+    def tearDown(self):
+        # deleting loads the rows so the key they were rotated to is needed
+        with override_settings(DB_ENCRYPTION_KEY=[self.new_key, self.old_key]):
+            EncryptedClass.objects.filter(id__in=[e.id for e in self.encrypted_classes]).delete()
+
+    def test_rotate_re_encrypts_whole_values_with_the_first_key(self):
+        # arrange
+        out = StringIO()
+
+        # act
+        with override_settings(DB_ENCRYPTION_KEY=[self.new_key, self.old_key], DB_ENCRYPTION_KEY_IDS=True):
+            call_command('rotate_encryption_keys', 'test_app.EncryptedClass', batch_size=2,
+                         start_after=self.start_after, stdout=out)
+        with override_settings(DB_ENCRYPTION_KEY=self.new_key):
+            encrypted_returns = list(EncryptedClass.objects.filter(id__in=[e.id for e in self.encrypted_classes])
+                                     .order_by('id'))
+            stored = [DataGenerator.get_stored_encrypted_val(e) for e in self.encrypted_classes]
+            decrypted = EncryptedClass._meta.get_field('encrypted_val').decrypt_many(stored)
+
+        # assert
+        self.assertEqual([e.encrypted_val for e in encrypted_returns], [value[-4:] for value in self.values])
+        # display_chars only applies to reads, the whole value is kept
+        self.assertEqual(decrypted, self.values)
+        self.assertTrue(all(value[:4] == get_key_id(self.new_key) for value in stored))
+        self.assertEqual(out.getvalue().splitlines()[:2], [
+            'Re-encrypted 2 of 2 rows up to id {0}'.format(self.encrypted_classes[1].id),
+            'Re-encrypted 1 of 1 rows up to id {0}'.format(self.encrypted_classes[2].id)
+        ])
+
+    def test_rotate_skips_values_already_on_the_first_key(self):
+        # arrange
+        out = StringIO()
+
+        # act
+        with override_settings(DB_ENCRYPTION_KEY=[self.new_key, self.old_key], DB_ENCRYPTION_KEY_IDS=True):
+            call_command('rotate_encryption_keys', 'test_app.EncryptedClass', start_after=self.start_after,
+                         stdout=StringIO())
+            call_command('rotate_encryption_keys', 'test_app.EncryptedClass', start_after=self.start_after,
+                         stdout=out)
+
+        # assert
+        self.assertIn('Re-encrypted 0 of 3 EncryptedClass rows', out.getvalue())
+
+    def test_rotate_without_key_ids_writes_values_older_releases_can_read(self):
+        # arrange
+        out = StringIO()
+
+        # act
+        with override_settings(DB_ENCRYPTION_KEY=[self.new_key, self.old_key]):
+            call_command('rotate_encryption_keys', 'test_app.EncryptedClass', start_after=self.start_after,
+                         stdout=StringIO())
+            call_command('rotate_encryption_keys', 'test_app.EncryptedClass', start_after=self.start_after,
+                         stdout=out)
+            stored = [DataGenerator.get_stored_encrypted_val(e) for e in self.encrypted_classes]
+
+        # assert
+        self.assertTrue(all(len(value) % 16 == 0 for value in stored))
+        with override_settings(DB_ENCRYPTION_KEY=self.new_key):
+            self.assertEqual(EncryptedClass._meta.get_field('encrypted_val').decrypt_many(stored), self.values)
+        self.assertIn('Re-encrypted 0 of 3 EncryptedClass rows', out.getvalue())
+
+    def test_rotate_refuses_values_that_do_not_decrypt_with_exactly_one_key(self):
+        # arrange
+        stored = [DataGenerator.get_stored_encrypted_val(e) for e in self.encrypted_classes]
+
+        # act / assert
+        with override_settings(DB_ENCRYPTION_KEY=[self.new_key, self.old_key], DB_ENCRYPTION_KEY_IDS=True):
+            with patch('rest_framework_simplify.fields.parse_plaintext', return_value='a guess'):
+                with self.assertRaises(CommandError) as ex:
+                    call_command('rotate_encryption_keys', 'test_app.EncryptedClass', start_after=self.start_after,
+                                 stdout=StringIO())
+        with override_settings(DB_ENCRYPTION_KEY=self.new_key):
+            with self.assertRaises(CommandError):
+                call_command('rotate_encryption_keys', 'test_app.EncryptedClass', start_after=self.start_after,
+                             stdout=StringIO())
+        self.assertIn('decrypts with 2 of the keys', ex.exception.args[0])
+        self.assertEqual([DataGenerator.get_stored_encrypted_val(e) for e in self.encrypted_classes], stored)
+
+    def test_rotate_with_unknown_field_raises(self):
+        # act / assert
+        with self.assertRaises(CommandError):
+            call_command('rotate_encryption_keys', 'test_app.EncryptedClass', fields='not_a_field', stdout=StringIO())
+
+
+class FillBlindIndexesTests(unittest.TestCase):
+
+    def test_fill_sets_blind_indexes_saved_before_they_were_added(self):
+        # arrange
+        values = [DataGenerator.str(), DataGenerator.str()]
+        encrypted_classes = [DataGenerator.set_up_encrypted_class_with_no_display_value(value=value)
+                             for value in values]
+        EncryptedClassNoDisplayChars.objects.filter(id__in=[e.id for e in encrypted_classes]) \
+            .update(encrypted_val_index=None)
+        out = StringIO()
+
+        # act
+        call_command('fill_blind_indexes', 'test_app.EncryptedClassNoDisplayChars', batch_size=1,
+                     start_after=encrypted_classes[0].id - 1, stdout=out)
+
+        # assert
+        self.assertEqual([EncryptedClassNoDisplayChars.objects.get(encrypted_val=value).id for value in values],
+                         [e.id for e in encrypted_classes])
+        self.assertIn('Filled 2 of 2 EncryptedClassNoDisplayChars rows', out.getvalue())
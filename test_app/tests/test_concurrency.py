@@ -0,0 +1,72 @@
+import asyncio
+import django
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework_simplify import concurrency
+from rest_framework_simplify.concurrency import arun_concurrently, prefetch_concurrently, run_concurrently
+from test_app.tests.helpers import DataGenerator
+from test_app.models import ChildClass
+
+
+class RunConcurrentlyTests(unittest.TestCase):
+
+    def test_results_are_returned_in_order(self):
+        # arrange / act
+        results = run_concurrently(lambda: 1, lambda: 2, lambda: 3)
+
+        # assert
+        self.assertEqual(results, [1, 2, 3])
+
+    def test_exceptions_are_raised_in_caller(self):
+        # arrange
+        def throws():
+            raise ValueError('bad query')
+
+        # act / assert
+        with self.assertRaises(ValueError):
+            run_concurrently(lambda: 1, throws)
+
+    def test_nested_calls_on_a_full_pool_run_inline(self):
+        # arrange
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='simplify-query')
+
+        async def fetch():
+            # the outer function holds the only worker while it runs the nested ones
+            return await asyncio.wait_for(arun_concurrently(lambda: run_concurrently(lambda: 1, lambda: 2)), 5)
+
+        # act
+        with patch.object(concurrency, '_executor', executor):
+            results = asyncio.run(fetch())
+        executor.shutdown(wait=False)
+
+        # assert
+        self.assertEqual(results, [[1, 2]])
+
+
+class PrefetchConcurrentlyTests(unittest.TestCase):
+
+    def test_prefetches_every_relation(self):
+        # arrange
+        child_class = DataGenerator.set_up_child_class()
+        basic_class = DataGenerator.set_up_basic_class(child_three_count=0)
+        basic_class.child_three.add(child_class)
+        DataGenerator.set_up_linking_class(basic_class=basic_class, child_class=child_class)
+        objs = list(ChildClass.objects.filter(pk=child_class.pk))
+
+        # act
+        prefetch_concurrently(objs, ['basic_class_three', 'linking_classes'])
+
+        # assert
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([bc.id for bc in objs[0].basic_class_three.all()], [basic_class.id])
+            self.assertEqual(len(objs[0].linking_classes.all()), 1)
+        self.assertEqual(len(queries), 0)
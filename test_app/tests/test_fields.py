@@ -1,15 +1,19 @@
 import json
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
 from unittest import skip
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import django
 import os
 import unittest
 
-from django.core.exceptions import ValidationError
+from django.core.exceptions import FieldError, ValidationError
+from django.db.models import F
+from django.test import override_settings
 
-from rest_framework_simplify.fields import SimplifyJsonTextField
+from rest_framework_simplify.fields import SimplifyJsonTextField, get_blind_index, get_cipher, get_key_id, \
+    parse_plaintext
 
 os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
 django.setup()
@@ -45,6 +49,217 @@ class CustomFieldTests(unittest.TestCase):
 
         self.assertEqual(value, encrypted_return.encrypted_val)
 
+    def test_encrypted_fields_share_one_cipher_for_each_key_across_threads(self):
+        # arrange
+        field = EncryptedClass._meta.get_field('encrypted_val')
+        other_field = EncryptedClassNoDisplayChars._meta.get_field('encrypted_val')
+
+        # act
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ciphers = list(executor.map(lambda index: field.algorithm, range(8)))
+
+        # assert
+        self.assertTrue(all(cipher is get_cipher(field.keys[0]) for cipher in ciphers))
+        self.assertIs(other_field.algorithm, field.algorithm)
+
+    def test_encrypted_field_list_is_decrypted_with_one_call_for_the_column(self):
+        # arrange
+        values = ['first value', 'x', 'a value that is longer than a block']
+        ids = [DataGenerator.set_up_encrypted_class_with_no_display_value(value=value).id for value in values]
+        cipher = Mock(wraps=get_cipher(EncryptedClassNoDisplayChars._meta.get_field('encrypted_val').keys[0]))
+
+        # act
+        with patch('rest_framework_simplify.fields.get_cipher', return_value=cipher):
+            encrypted_returns = list(EncryptedClassNoDisplayChars.objects.filter(id__in=ids).order_by('id'))
+
+        # assert
+        self.assertEqual([encrypted_return.encrypted_val for encrypted_return in encrypted_returns], values)
+        self.assertEqual(cipher.decrypt.call_count, 1)
+
+    def test_encrypted_field_is_decrypted_in_values_and_iterator(self):
+        # arrange
+        values = ['123456789abcdefgfff', 'second']
+        ids = [DataGenerator.set_up_encrypted_class_with_no_display_value(value=value).id for value in values]
+        queryset = EncryptedClassNoDisplayChars.objects.filter(id__in=ids).order_by('id')
+
+        # act
+        dict_values = [row['encrypted_val'] for row in queryset.values('encrypted_val')]
+        list_values = [row[1] for row in queryset.values_list('id', 'encrypted_val')]
+        flat_values = list(queryset.values_list('encrypted_val', flat=True))
+        iterated_values = [encrypted_return.encrypted_val for encrypted_return in queryset.iterator(chunk_size=1)]
+
+        # assert
+        self.assertEqual(dict_values, values)
+        self.assertEqual(list_values, values)
+        self.assertEqual(flat_values, values)
+        self.assertEqual(iterated_values, values)
+
+    def test_encrypted_field_is_decrypted_in_annotations(self):
+        # arrange
+        value = 'annotated value'
+        encrypted_class = DataGenerator.set_up_encrypted_class_with_no_display_value(value=value)
+
+        # act
+        encrypted_return = EncryptedClassNoDisplayChars.objects.annotate(copy=F('encrypted_val')) \
+            .get(id=encrypted_class.id)
+
+        # assert
+        self.assertEqual(encrypted_return.copy, value)
+        self.assertEqual(encrypted_return.encrypted_val, value)
+
+    def test_encrypted_field_decrypts_values_from_a_rotated_key(self):
+        # arrange
+        field = EncryptedClassNoDisplayChars._meta.get_field('encrypted_val')
+        old_key = field.keys[0]
+        encrypted_class = DataGenerator.set_up_encrypted_class_with_no_display_value(value='before rotation')
+
+        # act
+        with override_settings(DB_ENCRYPTION_KEY=['1234567890abcdef', old_key], DB_ENCRYPTION_KEY_IDS=True):
+            encrypted_return = EncryptedClassNoDisplayChars.objects.get(id=encrypted_class.id)
+            rotated_class = DataGenerator.set_up_encrypted_class_with_no_display_value(value='after rotation')
+            rotated_value = EncryptedClassNoDisplayChars.objects.values_list('encrypted_val', flat=True) \
+                .get(id=rotated_class.id)
+            stored = DataGenerator.get_stored_encrypted_val(rotated_class)
+            # the rest of the tests only have the old key
+            rotated_class.delete()
+
+        # assert
+        self.assertEqual(encrypted_return.encrypted_val, 'before rotation')
+        self.assertEqual(rotated_value, 'after rotation')
+        self.assertEqual(stored[:4], get_key_id('1234567890abcdef'))
+
+    def test_encrypted_field_writes_key_ids_only_when_they_are_turned_on(self):
+        # act
+        encrypted_class = DataGenerator.set_up_encrypted_class_with_no_display_value(value='no key id')
+        with override_settings(DB_ENCRYPTION_KEY_IDS=True):
+            key_id_class = DataGenerator.set_up_encrypted_class_with_no_display_value(value='key id')
+
+        # assert
+        self.assertEqual(len(DataGenerator.get_stored_encrypted_val(encrypted_class)), 16)
+        self.assertEqual(len(DataGenerator.get_stored_encrypted_val(key_id_class)), 20)
+        self.assertEqual(EncryptedClassNoDisplayChars.objects.get(id=key_id_class.id).encrypted_val, 'key id')
+
+    def test_encrypted_field_tries_each_key_for_values_without_a_key_id(self):
+        # arrange
+        field = EncryptedClassNoDisplayChars._meta.get_field('encrypted_val')
+        old_key = field.keys[0]
+        encrypted_classes = [DataGenerator.set_up_encrypted_class_with_no_display_value(value=value)
+                             for value in ['legacy value', 'another legacy value']]
+
+        # act
+        with override_settings(DB_ENCRYPTION_KEY=['1234567890abcdef', old_key]):
+            values = list(EncryptedClassNoDisplayChars.objects.filter(id__in=[e.id for e in encrypted_classes])
+                          .order_by('id').values_list('encrypted_val', flat=True))
+        with override_settings(DB_ENCRYPTION_KEY=['1234567890abcdef']):
+            with self.assertRaises(ValidationError):
+                EncryptedClassNoDisplayChars.objects.get(id=encrypted_classes[0].id)
+
+        # assert
+        self.assertEqual(values, ['legacy value', 'another legacy value'])
+
+    def test_encrypted_field_value_without_a_key_id_uses_the_first_key_that_decrypts_it(self):
+        # arrange
+        field = EncryptedClassNoDisplayChars._meta.get_field('encrypted_val')
+        old_key = field.keys[0]
+        encrypted_class = DataGenerator.set_up_encrypted_class_with_no_display_value(value='legacy value')
+        stored = DataGenerator.get_stored_encrypted_val(encrypted_class)
+        # the new key decrypts the value to something that looks like a value too
+        plaintext = get_cipher(old_key).decrypt(stored)
+        parse = lambda decrypted: 'legacy value' if decrypted == plaintext else 'new key guess'
+
+        # act
+        with override_settings(DB_ENCRYPTION_KEY=[old_key, '1234567890abcdef']):
+            with patch('rest_framework_simplify.fields.parse_plaintext', side_effect=parse):
+                value = EncryptedClassNoDisplayChars.objects.get(id=encrypted_class.id).encrypted_val
+                decryptions = field.get_decryptions([stored])
+
+        # assert
+        self.assertEqual(value, 'legacy value')
+        self.assertEqual(len(decryptions[0]), 2)
+
+    def test_plaintext_without_padding_is_from_the_wrong_key(self):
+        # act / assert
+        self.assertEqual(parse_plaintext(b'value' + b'\0' * 11), 'value')
+        self.assertEqual(parse_plaintext(b'a whole block!!!' + b'\0' * 16), 'a whole block!!!')
+        self.assertIsNone(parse_plaintext(b'no padding at all'))
+        self.assertIsNone(parse_plaintext(b'value\0\0\0 trailing'))
+        self.assertIsNone(parse_plaintext(b'\0' * 32))
+
+    def test_blind_index_follows_the_encrypted_value_on_save(self):
+        # arrange
+        old_value = DataGenerator.str()
+        new_value = DataGenerator.str()
+        encrypted_class = DataGenerator.set_up_encrypted_class_with_no_display_value(value=old_value)
+
+        # act
+        encrypted_class.encrypted_val = new_value
+        encrypted_class.save()
+
+        # assert
+        self.assertEqual(encrypted_class.encrypted_val_index, get_blind_index(new_value))
+        self.assertFalse(EncryptedClassNoDisplayChars.objects.filter(encrypted_val=old_value).exists())
+        self.assertEqual(EncryptedClassNoDisplayChars.objects.get(encrypted_val=new_value).id, encrypted_class.id)
+
+    def test_encrypted_field_exact_lookups_need_a_blind_index(self):
+        # act / assert
+        with self.assertRaises(FieldError):
+            EncryptedClass.objects.filter(encrypted_val='1234')
+        with self.assertRaises(FieldError):
+            EncryptedClassNoDisplayChars.objects.filter(encrypted_val__icontains='1234')
+
+    def test_json_text_field_loads_plain_values_by_default(self):
+        # arrange
+        jt_class = DataGenerator.set_up_json_text_field_class(json_text={'description': 'outside'})
+
+        # act
+        jt_return = JsonTextFieldClass.objects.get(id=jt_class.id)
+
+        # assert
+        self.assertIs(type(jt_return.json_text), dict)
+        self.assertEqual(json.loads(json.dumps(jt_return.json_text)), {'description': 'outside'})
+
+    def test_json_text_field_decodes_value_when_it_is_first_used(self):
+        # arrange
+        jt_class = DataGenerator.set_up_json_text_field_class(json_text=[{'description': 'outside'}])
+
+        # act
+        with override_settings(SIMPLIFY_LAZY_JSON_TEXT=True):
+            jt_return = JsonTextFieldClass.objects.get(id=jt_class.id)
+        decoded_before_use = jt_return.json_text.is_decoded
+
+        # assert
+        self.assertFalse(decoded_before_use)
+        self.assertTrue(isinstance(jt_return.json_text, list))
+        self.assertEqual(jt_return.json_text[0]['description'], 'outside')
+        self.assertTrue(jt_return.json_text.is_decoded)
+
+    def test_json_text_field_saves_loaded_and_changed_values(self):
+        # arrange
+        jt_class = DataGenerator.set_up_json_text_field_class(json_text={'description': 'outside'})
+
+        # act
+        with override_settings(SIMPLIFY_LAZY_JSON_TEXT=True):
+            unchanged = JsonTextFieldClass.objects.get(id=jt_class.id)
+            changed = JsonTextFieldClass.objects.get(id=jt_class.id)
+            unchanged.save()
+            saved_unchanged = JsonTextFieldClass.objects.get(id=jt_class.id).json_text.raw
+            changed.json_text['description'] = 'inside'
+            changed.save()
+
+        # assert
+        self.assertEqual(saved_unchanged, unchanged.json_text.raw)
+        self.assertEqual(JsonTextFieldClass.objects.get(id=jt_class.id).json_text, {'description': 'inside'})
+
+    def test_json_text_field_only_checks_text_is_json_when_cleaned(self):
+        # arrange
+        jt_class = DataGenerator.set_up_json_text_field_class(json_text='not json')
+
+        # act / assert
+        with self.assertRaises(ValidationError):
+            jt_class.full_clean()
+        jt_class.json_text = '{"description": "outside"}'
+        jt_class.full_clean()
+
     def test_json_text_field_accepts_json_value(self):
         value = '123456789'
         encrypted_class = DataGenerator.set_up_encrypted_class(value=value)
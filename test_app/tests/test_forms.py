@@ -1,14 +1,60 @@
 import django
 import os
+import threading
 import unittest.mock
 
 os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
 django.setup()
 
 from rest_framework_simplify.exceptions import EmailTemplateException
-from rest_framework_simplify.forms import EmailTemplateForm
+from django.core.signals import request_started
+from django.test import override_settings
+
+from rest_framework_simplify.forms import EmailTemplateForm, warm_signatures_on_first_request, \
+    warm_stored_procedure_signatures
+from rest_framework_simplify.services.sql_executor import signatures
+from rest_framework_simplify.services.sql_executor.service import SQLServerExecutorService
 
 from test_app.email_templates import DynamicEmailTemplate, DynamicEmailAndSubjectTemplate, EmailWithExtraSimplifyMLTemplate, TemplateNameWithInvalidHtmlFileTemplate, TemplateWithoutSendEmailMethodTemplate, TemplateNameWithoutHtmlFileTemplate
+from test_app.forms import PostgresFormatForm
+
+
+class StoredProcedureFormTests(unittest.TestCase):
+
+    def tearDown(self):
+        signatures.invalidate_signatures()
+
+    @unittest.mock.patch.object(SQLServerExecutorService, 'get_procedure_params', side_effect=Exception('unreachable'))
+    def test_warm_stored_procedure_signatures_caches_parameters_and_skips_failures(self, mock_get_procedure_params):
+        # act
+        warmed = warm_stored_procedure_signatures()
+        load = unittest.mock.Mock()
+        params = signatures.get_signature(PostgresFormatForm().get_sp_service().get_connection_key(), 'postgres_format',
+                                          load)
+
+        # assert
+        self.assertEqual(warmed, ['postgres_format'])
+        self.assertEqual(params, ['var_int', 'var_str'])
+        load.assert_not_called()
+        mock_get_procedure_params.assert_called_once_with('TestStoredProcedure')
+
+    @override_settings(SIMPLIFY_WARM_SP_SIGNATURES=['test_app.forms'])
+    @unittest.mock.patch('rest_framework_simplify.forms.warm_stored_procedure_signatures')
+    def test_signatures_are_warmed_on_the_first_request_only(self, mock_warm):
+        # arrange
+        request_started.connect(warm_signatures_on_first_request, dispatch_uid='simplify_warm_sp_signatures')
+
+        # act
+        first = request_started.send(sender=None)
+        second = request_started.send(sender=None)
+        threads = [response for receiver, response in first + second if receiver is warm_signatures_on_first_request]
+        threads[0].join(5)
+
+        # assert
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+        mock_warm.assert_called_once_with()
+        self.assertFalse(request_started.disconnect(dispatch_uid='simplify_warm_sp_signatures'))
 
 
 class EmailTemplateTests(unittest.TestCase):
@@ -3,11 +3,22 @@ import unittest
 import uuid
 from unittest.mock import MagicMock
 
+from rest_framework_simplify.fields import LazyJson
 from rest_framework_simplify.mapper import Mapper
 
 
 class MapperTests(unittest.TestCase):
 
+    def test_underscore_to_camelcase_leaves_lazy_json_without_underscores_undecoded(self):
+        lazy_json = LazyJson('{"description": "text", "tags": ["a"]}')
+        val = Mapper.dict_underscore_to_camelcase({'json_text': lazy_json})
+        self.assertIs(val['jsonText'], lazy_json)
+        self.assertFalse(lazy_json.is_decoded)
+
+    def test_underscore_to_camelcase_camelcases_lazy_json_with_underscores(self):
+        val = Mapper.dict_underscore_to_camelcase({'json_text': LazyJson('{"first_name": "a_b"}')})
+        self.assertEqual(val, {'jsonText': {'firstName': 'a_b'}})
+
     def test_camelcase_to_underscore_not_capitalized(self):
         camel_case = 'camelCase'
         underscore = 'camel_case'
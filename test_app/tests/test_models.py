@@ -78,3 +78,52 @@ class BasicClassChangeTrackingFieldsTests(unittest.TestCase):
         # Assert
         self.assertTrue(basic_class_db.change_tracking_field_has_changed('child_one'))
         self.assertEqual(basic_class_db.get_change_tracking_field_initial_value('child_one'), initial_child_class.id)
+
+    def test_change_tracking_foreign_key_id_clears_cached_related_item(self):
+        # Arrange
+        initial_child_class = ChildClass(name=str(uuid.uuid4())[:15])
+        initial_child_class.save()
+        new_child_class = ChildClass(name=str(uuid.uuid4())[:15])
+        new_child_class.save()
+        basic_class = BasicClass(name=str(uuid.uuid4())[:15], child_one=initial_child_class)
+        basic_class.save()
+        basic_class_db = BasicClass.objects.get(id=basic_class.id)
+        self.assertEqual(basic_class_db.child_one.id, initial_child_class.id)
+        # Act
+        basic_class_db.child_one_id = new_child_class.id
+        # Assert
+        self.assertEqual(basic_class_db.child_one.id, new_child_class.id)
+        self.assertEqual(basic_class_db.get_change_tracking_field_initial_value('child_one'), initial_child_class.id)
+
+    def test_change_tracking_fields_are_not_snapshotted_on_load(self):
+        # Arrange
+        basic_class = BasicClass(name=str(uuid.uuid4())[:15])
+        basic_class.save()
+        # Act
+        basic_class_db = BasicClass.objects.get(id=basic_class.id)
+        # Assert
+        self.assertNotIn('_change_tracking_initial', basic_class_db.__dict__)
+        self.assertFalse(basic_class_db.change_tracking_field_has_changed('name'))
+
+    def test_change_tracking_fields_keeps_first_initial_value_after_multiple_changes(self):
+        # Arrange
+        initial_value = str(uuid.uuid4())[:15]
+        basic_class = BasicClass(name=initial_value)
+        basic_class.save()
+        basic_class_db = BasicClass.objects.get(id=basic_class.id)
+        # Act
+        basic_class_db.name = str(uuid.uuid4())[:15]
+        basic_class_db.name = str(uuid.uuid4())[:15]
+        # Assert
+        self.assertTrue(basic_class_db.change_tracking_field_has_changed('name'))
+        self.assertEqual(basic_class_db.get_change_tracking_field_initial_value('name'), initial_value)
+
+    def test_change_tracking_fields_on_new_instance(self):
+        # Arrange
+        initial_value = str(uuid.uuid4())[:15]
+        basic_class = BasicClass(name=initial_value)
+        # Act
+        basic_class.name = str(uuid.uuid4())[:15]
+        # Assert
+        self.assertTrue(basic_class.change_tracking_field_has_changed('name'))
+        self.assertEqual(basic_class.get_change_tracking_field_initial_value('name'), initial_value)
@@ -0,0 +1,133 @@
+import django
+import os
+import unittest
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
+django.setup()
+
+from unittest.mock import patch
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework_simplify.registry import build_model_capabilities, get_default_heavy_fields, get_model_capabilities
+from test_app.models import BasicClass, ChildClass, EncryptedClass, PhaseGroup
+
+
+class ModelCapabilitiesTests(unittest.TestCase):
+
+    def test_registry_is_built_at_startup(self):
+        # act
+        capabilities = get_model_capabilities(BasicClass)
+
+        # assert
+        self.assertIn('child_three__id__contains_all', capabilities.filter_names)
+        self.assertIn('child_three__id__contains_all', capabilities.list_filters)
+        self.assertEqual(capabilities.property_filters, frozenset(['test_prop']))
+        self.assertIn('child_one__nested_child', capabilities.include_set)
+        self.assertEqual(capabilities.excludes, frozenset(['exclude_field']))
+        self.assertFalse(capabilities.has_filterable_properties)
+        self.assertTrue(get_model_capabilities(PhaseGroup).has_filterable_properties)
+
+    def test_model_without_declarations_has_empty_capabilities(self):
+        # act
+        capabilities = get_model_capabilities(ChildClass)
+
+        # assert
+        self.assertEqual(dict(capabilities.filters), {})
+        self.assertEqual(capabilities.includes, ())
+        self.assertEqual(capabilities.excludes, frozenset())
+
+    def test_capabilities_cannot_be_changed(self):
+        # arrange
+        capabilities = get_model_capabilities(BasicClass)
+
+        # act / assert
+        with self.assertRaises(AttributeError):
+            capabilities.excludes = frozenset()
+        with self.assertRaises(TypeError):
+            capabilities.filters['id'] = {'type': int, 'list': False}
+        with self.assertRaises(TypeError):
+            capabilities.filters['id']['list'] = True
+
+    def test_unknown_filter_field_raises(self):
+        # arrange
+        filters = {'not_a_field__icontains': {'type': str, 'list': False}}
+
+        # act / assert
+        with patch.object(BasicClass, 'get_filters', return_value=filters):
+            with self.assertRaises(ImproperlyConfigured) as ex:
+                build_model_capabilities(BasicClass)
+        self.assertIn('not_a_field', ex.exception.args[0])
+
+    def test_filter_without_type_raises(self):
+        # arrange
+        filters = {'name__icontains': {'list': False}}
+
+        # act / assert
+        with patch.object(BasicClass, 'get_filters', return_value=filters):
+            with self.assertRaises(ImproperlyConfigured):
+                build_model_capabilities(BasicClass)
+
+    def test_unknown_nested_include_raises(self):
+        # arrange
+        includes = ['child_one__not_a_field']
+
+        # act / assert
+        with patch.object(BasicClass, 'get_includes', return_value=includes):
+            with self.assertRaises(ImproperlyConfigured) as ex:
+                build_model_capabilities(BasicClass)
+        self.assertIn('not_a_field is not a field or property on ChildClass', ex.exception.args[0])
+
+    def test_unknown_exclude_raises(self):
+        # act / assert
+        with patch.object(BasicClass, 'get_excludes', return_value=['not_a_field']):
+            with self.assertRaises(ImproperlyConfigured):
+                build_model_capabilities(BasicClass)
+
+    def test_property_dependencies_are_collected(self):
+        # act
+        capabilities = get_model_capabilities(BasicClass)
+
+        # assert
+        self.assertEqual(dict(capabilities.property_dependencies), {'display_name': frozenset(['name', 'active'])})
+
+    def test_property_dependency_that_is_not_a_column_raises(self):
+        # arrange
+        property_dependencies = {'display_name': ['child_three']}
+
+        # act / assert
+        with patch.object(BasicClass, 'get_property_dependencies', return_value=property_dependencies):
+            with self.assertRaises(ImproperlyConfigured) as ex:
+                build_model_capabilities(BasicClass)
+        self.assertIn('has child_three but it is not a column', ex.exception.args[0])
+
+    def test_models_have_no_heavy_fields_unless_they_declare_them(self):
+        # act / assert
+        self.assertEqual(get_model_capabilities(EncryptedClass).heavy_fields, frozenset())
+        self.assertEqual(get_model_capabilities(ChildClass).heavy_fields, frozenset())
+
+    def test_default_heavy_fields_are_the_binary_and_encrypted_fields(self):
+        # act / assert
+        self.assertEqual(get_default_heavy_fields(BasicClass), ['binary_field'])
+        self.assertEqual(get_default_heavy_fields(EncryptedClass), ['encrypted_val'])
+        self.assertEqual(get_model_capabilities(BasicClass).heavy_fields, frozenset(['binary_field']))
+
+    def test_declared_heavy_fields_replace_the_default(self):
+        # act
+        with patch.object(BasicClass, 'get_heavy_fields', create=True, return_value=['name']):
+            capabilities = build_model_capabilities(BasicClass)
+
+        # assert
+        self.assertEqual(capabilities.heavy_fields, frozenset(['name']))
+
+    def test_heavy_field_that_is_not_a_column_raises(self):
+        # act / assert
+        with patch.object(BasicClass, 'get_heavy_fields', create=True, return_value=['test_prop']):
+            with self.assertRaises(ImproperlyConfigured):
+                build_model_capabilities(BasicClass)
+
+    def test_aggregate_function_that_does_not_exist_raises(self):
+        # act / assert
+        with patch.object(BasicClass, 'get_aggregates', return_value={'id': ['median']}):
+            with self.assertRaises(ImproperlyConfigured) as ex:
+                build_model_capabilities(BasicClass)
+        self.assertIn('median', ex.exception.args[0])
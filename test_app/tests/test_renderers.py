@@ -0,0 +1,105 @@
+import datetime
+import django
+import json
+import os
+import unittest
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
+django.setup()
+
+from django.core.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from rest_framework_simplify import codec
+from rest_framework_simplify.fields import LazyJson
+from rest_framework_simplify.renderers import SimplifyJSONRenderer
+
+
+class SimplifyJSONRendererTests(unittest.TestCase):
+    data = {
+        'id': 5,
+        'name': 'café  ',
+        'amount': Decimal('10.50'),
+        'created': datetime.datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2020, 1, 2),
+        'key': uuid.UUID('12345678123456781234567812345678'),
+        'items': [{'count': None, 'active': True}],
+        'score': 1.25
+    }
+
+    def test_render_matches_json_renderer(self):
+        # act
+        result = SimplifyJSONRenderer().render(self.data)
+
+        # assert
+        self.assertEqual(result, JSONRenderer().render(self.data))
+
+    def test_render_matches_json_renderer_without_orjson(self):
+        # act
+        with patch.object(codec, 'orjson', None):
+            result = SimplifyJSONRenderer().render(self.data)
+
+        # assert
+        self.assertEqual(result, JSONRenderer().render(self.data))
+
+    def test_render_writes_lazy_json_as_it_was_loaded(self):
+        # arrange
+        raw = '{"description": "isn\'t it beautiful outside?", "tags": ["a", "b"]}'
+        lazy_json = LazyJson(raw)
+
+        # act
+        result = SimplifyJSONRenderer().render([{'id': 1, 'jsonText': lazy_json},
+                                                {'id': 2, 'jsonText': LazyJson('[]')}])
+
+        # assert
+        self.assertEqual(result, ('[{"id":1,"jsonText":' + raw + '},{"id":2,"jsonText":[]}]').encode())
+        self.assertFalse(lazy_json.is_decoded)
+
+    def test_render_raises_for_lazy_json_that_is_not_json(self):
+        # act / assert
+        with self.assertRaises(ValidationError):
+            SimplifyJSONRenderer().render([{'id': 1, 'jsonText': LazyJson('{"description": ')}])
+
+    def test_render_writes_lazy_json_that_was_changed_from_its_value(self):
+        # arrange
+        lazy_json = LazyJson('{"description": "old"}')
+        lazy_json['description'] = 'new'
+
+        # act
+        result = SimplifyJSONRenderer().render({'jsonText': lazy_json})
+
+        # assert
+        self.assertEqual(json.loads(result), {'jsonText': {'description': 'new'}})
+
+    def test_render_with_indent_uses_json_renderer(self):
+        # arrange
+        data = {'jsonText': LazyJson('{"a": [1, 2]}')}
+
+        # act
+        result = SimplifyJSONRenderer().render(data, 'application/json; indent=4')
+
+        # assert
+        self.assertEqual(result, JSONRenderer().render({'jsonText': {'a': [1, 2]}}, 'application/json; indent=4'))
+
+
+class CodecTests(unittest.TestCase):
+
+    def test_dumps_falls_back_to_json_for_large_integers(self):
+        # act
+        result = codec.dumps({'big': 2 ** 70})
+
+        # assert
+        self.assertEqual(result, '{"big":1180591620717411303424}')
+
+    def test_loads_and_dumps_without_orjson(self):
+        # act
+        with patch.object(codec, 'orjson', None):
+            text = codec.dumps({'a': [1, 'bé']})
+            value = codec.loads(text)
+
+        # assert
+        self.assertEqual(text, '{"a":[1,"bé"]}')
+        self.assertEqual(value, {'a': [1, 'bé']})
@@ -0,0 +1,197 @@
+import django
+import os
+import unittest
+import unittest.mock
+import uuid
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
+django.setup()
+
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from rest_framework_simplify.routing import ReadReplicaPool
+from rest_framework_simplify.views import AsyncSimplifyView, SimplifyView
+from test_app.models import BasicClass
+
+
+class ReadReplicaPoolTests(unittest.TestCase):
+    request_factory = RequestFactory()
+
+    def tearDown(self):
+        cache.clear()
+
+    def build_request(self, method='get'):
+        return getattr(self.request_factory, method)('/basicClass', REMOTE_ADDR=str(uuid.uuid4()))
+
+    def test_unsupported_policy_raises(self):
+        # arrange / act / assert
+        with self.assertRaises(ValueError) as ex:
+            ReadReplicaPool(['rr1'], policy='fastest')
+        self.assertEqual(ex.exception.args[0], ReadReplicaPool.ErrorMessages.UNSUPPORTED_POLICY.format('fastest'))
+
+    def test_round_robin_spreads_reads_evenly(self):
+        # arrange
+        pool = ReadReplicaPool(['rr1', 'rr2', 'rr3'])
+        request = self.build_request()
+
+        # act
+        aliases = [pool.checkout(request) for x in range(6)]
+
+        # assert
+        self.assertEqual(aliases, ['rr1', 'rr2', 'rr3', 'rr1', 'rr2', 'rr3'])
+
+    def test_least_outstanding_picks_alias_with_fewest_requests(self):
+        # arrange
+        pool = ReadReplicaPool(['rr1', 'rr2', 'rr3'], policy=ReadReplicaPool.LEAST_OUTSTANDING)
+        request = self.build_request()
+        first, second, third = [pool.checkout(request) for x in range(3)]
+
+        # act
+        pool.release(second, request)
+        alias = pool.checkout(request)
+
+        # assert
+        self.assertEqual(alias, second)
+
+    def test_latency_weighted_prefers_faster_alias(self):
+        # arrange
+        pool = ReadReplicaPool(['rr1', 'rr2'], policy=ReadReplicaPool.LATENCY_WEIGHTED)
+        request = self.build_request()
+        pool.release(pool.checkout(request), request, elapsed=0.001)
+        pool.latency = {'rr1': 0.001, 'rr2': 1.0}
+
+        # act
+        aliases = [pool.checkout(request) for x in range(200)]
+
+        # assert
+        self.assertGreater(aliases.count('rr1'), aliases.count('rr2'))
+
+    def test_ejected_alias_is_skipped(self):
+        # arrange
+        pool = ReadReplicaPool(['rr1', 'rr2'])
+        request = self.build_request()
+
+        # act
+        pool.eject('rr1')
+        aliases = [pool.checkout(request) for x in range(3)]
+
+        # assert
+        self.assertEqual(aliases, ['rr2', 'rr2', 'rr2'])
+        self.assertTrue(pool.get_stats()['rr1']['ejected'])
+
+    def test_all_aliases_ejected_falls_back_to_write_db(self):
+        # arrange
+        pool = ReadReplicaPool(['rr1'])
+        pool.eject('rr1')
+
+        # act
+        alias = pool.checkout(self.build_request(), write_db='primary')
+
+        # assert
+        self.assertEqual(alias, 'primary')
+
+    def test_lagging_alias_is_ejected(self):
+        # arrange
+        lag = {'rr1': 120, 'rr2': 0}
+        pool = ReadReplicaPool(['rr1', 'rr2'], max_replication_lag=5, lag_check=lambda alias: lag[alias])
+
+        # act
+        alias = pool.checkout(self.build_request())
+
+        # assert
+        self.assertEqual(alias, 'rr2')
+        self.assertTrue(pool.get_stats()['rr1']['ejected'])
+
+    def test_reads_stick_to_write_db_after_write(self):
+        # arrange
+        pool = ReadReplicaPool(['rr1'], sticky_seconds=5)
+        write_request = self.build_request('post')
+        read_request = self.build_request()
+        read_request.META['REMOTE_ADDR'] = write_request.META['REMOTE_ADDR']
+        other_request = self.build_request()
+
+        # act
+        pool.release(pool.checkout(write_request), write_request, response=unittest.mock.Mock(status_code=201))
+
+        # assert
+        self.assertEqual(pool.checkout(read_request, write_db='primary'), 'primary')
+        self.assertEqual(pool.checkout(other_request, write_db='primary'), 'rr1')
+
+
+class ReadReplicaEjectionTests(unittest.TestCase):
+
+    def build_view(self):
+        pool = ReadReplicaPool(['readreplica'])
+        view = SimplifyView(BasicClass, read_db=pool)
+        view.request = view.initialize_request(RequestFactory().get('/basicClass'))
+        view.read_db = 'readreplica'
+        return view, pool
+
+    def handle_exception(self, view, exc):
+        try:
+            view.handle_exception(exc)
+        except OperationalError:
+            pass
+
+    def test_error_with_read_db_up_does_not_eject(self):
+        # arrange
+        view, pool = self.build_view()
+
+        # act
+        self.handle_exception(view, OperationalError('canceling statement due to statement timeout'))
+
+        # assert
+        self.assertFalse(pool.get_stats()['readreplica']['ejected'])
+
+    def test_unreachable_read_db_is_ejected(self):
+        # arrange
+        view, pool = self.build_view()
+        connections['readreplica'].close()
+
+        # act
+        with unittest.mock.patch.object(connections['readreplica'], 'ensure_connection',
+                                        side_effect=OperationalError('could not connect to server')):
+            self.handle_exception(view, OperationalError('could not connect to server'))
+
+        # assert
+        self.assertTrue(pool.get_stats()['readreplica']['ejected'])
+
+    def dispatch_async_error(self, pool):
+        view = AsyncSimplifyView(BasicClass, read_db=pool)
+
+        async def get(*args, **kwargs):
+            raise OperationalError('could not connect to server')
+
+        view.get = get
+        try:
+            # async_to_sync runs the view's thread sensitive sync code on this thread, so it sees its connections
+            async_to_sync(view.dispatch)(RequestFactory().get('/asyncBasicClass'))
+        except OperationalError:
+            pass
+
+    def test_error_on_async_view_with_read_db_up_does_not_eject(self):
+        # arrange
+        pool = ReadReplicaPool(['readreplica'])
+        connections['readreplica'].close()
+
+        # act
+        self.dispatch_async_error(pool)
+
+        # assert
+        self.assertFalse(pool.get_stats()['readreplica']['ejected'])
+
+    def test_unreachable_read_db_is_ejected_on_async_view(self):
+        # arrange
+        pool = ReadReplicaPool(['readreplica'])
+        connections['readreplica'].close()
+
+        # act
+        with unittest.mock.patch.object(connections['readreplica'], 'ensure_connection',
+                                        side_effect=OperationalError('could not connect to server')):
+            self.dispatch_async_error(pool)
+
+        # assert
+        self.assertTrue(pool.get_stats()['readreplica']['ejected'])
@@ -0,0 +1,111 @@
+import django
+import os
+import unittest
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
+django.setup()
+
+from django.core.cache import cache
+from unittest.mock import patch
+from rest_framework.test import APIClient
+
+from rest_framework_simplify.exceptions import QueryBudgetExceeded
+from rest_framework_simplify.testing import QueryBudget, assert_query_budgets
+from test_app.tests.helpers import DataGenerator
+from test_app.models import BasicClass, ChildClass
+from test_app.views import BasicClassHandler, ChildClassHandler, LinkingClassHandler
+
+
+class QueryBudgetTests(unittest.TestCase):
+
+    def test_under_budget_records_queries(self):
+        # arrange
+        child_class = DataGenerator.set_up_child_class()
+
+        # act
+        with QueryBudget(1) as budget:
+            list(ChildClass.objects.filter(id=child_class.id))
+
+        # assert
+        self.assertEqual(len(budget.captured_queries), 1)
+        self.assertEqual(budget.get_table_counts(), {'test_app_childclass': 1})
+
+    def test_over_budget_raises(self):
+        # act / assert
+        with self.assertRaises(QueryBudgetExceeded) as ex:
+            with QueryBudget(1):
+                list(ChildClass.objects.all()[:1])
+                list(BasicClass.objects.all()[:1])
+        self.assertIn('Ran 2 queries with a budget of 1', ex.exception.args[0])
+
+    def test_over_table_budget_raises(self):
+        # act / assert
+        with self.assertRaises(QueryBudgetExceeded) as ex:
+            with QueryBudget(tables={'test_app_childclass': 1}):
+                list(ChildClass.objects.all()[:1])
+                list(BasicClass.objects.filter(child_one__name='x')[:1])
+        self.assertIn('Ran 2 queries against test_app_childclass with a budget of 1', ex.exception.args[0])
+
+    def test_decorator_raises(self):
+        # arrange
+        @QueryBudget(0)
+        def run_query():
+            list(ChildClass.objects.all()[:1])
+
+        # act / assert
+        with self.assertRaises(QueryBudgetExceeded):
+            run_query()
+
+
+class AssertQueryBudgetsTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def setUp(self):
+        cache.clear()
+        self.basic_class = DataGenerator.set_up_basic_class()
+        self.linking_class = DataGenerator.set_up_linking_class(basic_class=self.basic_class)
+
+    def get_url_kwargs(self, view_class):
+        if view_class is LinkingClassHandler:
+            return {
+                'parent_resource': 'basicClasses',
+                'parent_pk': self.basic_class.id,
+                'pk': self.linking_class.child_class.id
+            }
+        return {'pk': self.basic_class.id}
+
+    def test_registered_routes_are_within_budget(self):
+        # act / assert
+        assert_query_budgets(self.api_client, self.get_url_kwargs)
+
+    def test_route_over_budget_raises(self):
+        # arrange
+        query_budgets = {'GET': QueryBudget(0)}
+
+        # act / assert
+        with patch.object(BasicClassHandler, 'query_budgets', query_budgets):
+            with self.assertRaises(QueryBudgetExceeded) as ex:
+                assert_query_budgets(self.api_client, self.get_url_kwargs)
+        self.assertIn('GET /basicClass/{0}: Ran 1 queries with a budget of 0'.format(self.basic_class.id),
+                      ex.exception.args[0])
+
+    def test_lives_on_parent_route_is_checked_against_get_sub_budget(self):
+        # arrange
+        query_budgets = {'GET_SUB': QueryBudget(0)}
+
+        # act / assert
+        with patch.object(ChildClassHandler, 'query_budgets', query_budgets):
+            with self.assertRaises(QueryBudgetExceeded) as ex:
+                assert_query_budgets(self.api_client, {'parent_resource': 'basicClasses',
+                                                       'parent_pk': self.basic_class.id})
+        self.assertIn('GET /basicClasses/{0}/childOne: '.format(self.basic_class.id), ex.exception.args[0])
+
+    def test_cached_response_does_not_pass_budget(self):
+        # arrange
+        query_budgets = {'GET': QueryBudget(0, query_string='include=childOne,childThree')}
+        self.api_client.get('/basicClass/{0}?include=childOne,childThree'.format(self.basic_class.id))
+
+        # act / assert
+        with patch.object(BasicClassHandler, 'query_budgets', query_budgets):
+            with self.assertRaises(QueryBudgetExceeded):
+                assert_query_budgets(self.api_client, self.get_url_kwargs)
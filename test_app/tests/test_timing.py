@@ -0,0 +1,63 @@
+import django
+import os
+import unittest
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
+django.setup()
+
+from rest_framework_simplify.timing import NULL_TIMER, RequestTimer
+
+
+class RequestTimerTests(unittest.TestCase):
+
+    def test_phase_should_count_queries_in_current_phase(self):
+        # arrange
+        timer = RequestTimer()
+        execute = lambda sql, params, many, context: 'result'
+
+        # act
+        with timer.phase('page'):
+            result = timer(execute, 'SELECT 1', None, False, {})
+            timer.set_rows(5)
+        timer(execute, 'SELECT 1', None, False, {})
+
+        # assert
+        self.assertEqual(result, 'result')
+        self.assertEqual(timer.queries, 2)
+        self.assertEqual(timer.phases[0]['name'], 'page')
+        self.assertEqual(timer.phases[0]['queries'], 1)
+        self.assertEqual(timer.phases[0]['rows'], 5)
+
+    def test_nested_phase_should_be_listed_after_its_parent(self):
+        # arrange
+        timer = RequestTimer()
+
+        # act
+        with timer.phase('merge'):
+            with timer.phase('decode'):
+                timer.set_rows(1)
+            timer.set_rows(2)
+
+        # assert
+        self.assertEqual([phase['name'] for phase in timer.phases], ['merge', 'decode'])
+        self.assertEqual([phase['rows'] for phase in timer.phases], [2, 1])
+
+    def test_as_server_timing_should_describe_rows_and_totals(self):
+        # arrange
+        timer = RequestTimer()
+        with timer.phase('merge'):
+            timer.set_rows(3)
+
+        # act
+        result = timer.as_server_timing()
+
+        # assert
+        self.assertTrue(result.startswith('merge;dur='))
+        self.assertIn('desc="3 rows"', result)
+        self.assertIn('db;dur=0.00;desc="0 queries"', result)
+        self.assertIn('total;dur=', result)
+
+    def test_null_timer_phase_should_do_nothing(self):
+        # act
+        with NULL_TIMER.phase('page'):
+            NULL_TIMER.set_rows(1)
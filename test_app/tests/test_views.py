@@ -1,4 +1,8 @@
+import asyncio
+import csv
 import django
+import io
+import json
 import os
 import unittest.mock
 from unittest.mock import patch, Mock
@@ -9,17 +13,23 @@ os.environ['DJANGO_SETTINGS_MODULE'] = 'test_proj.settings'
 django.setup()
 
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ObjectDoesNotExist
 from django.conf import settings
+from django.test import override_settings
 from decimal import Decimal
+from rest_framework_simplify import read_models, registry
 from rest_framework_simplify.helpers import generate_str
+from rest_framework_simplify.views import SimplifyView
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 
 from test_app.tests.helpers import DataGenerator
-from test_app.models import BasicClass, ChildClass, LinkingClass, Application, ModelWithParentResource
+from test_app.models import BasicClass, BasicClassReadModel, ChildClass, LinkingClass, Application, \
+    ModelWithParentResource
 
 
 class HasObjectPermissionTests(unittest.TestCase):
@@ -648,120 +658,1201 @@ class BasicClassTests(unittest.TestCase):
         # assert
         self.assertFalse(result.data[0].get('active'))
 
+    def test_get_with_contains_all_filter_list_only_returns_items_with_every_value(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class(child_three_count=3)
+        child_ids = [child.id for child in basic_class.child_three.all()]
+        other_basic_class = DataGenerator.set_up_basic_class(child_three_count=0)
+        other_basic_class.child_three.add(child_ids[0])
+        url = '/basicClass?filters=child_three__id__contains_all={0}&fields=id,name'.format(
+            ','.join(str(child_id) for child_id in child_ids))
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in result.data], [basic_class.id])
+
+    def test_get_with_contains_all_filter_list_joins_relation_once(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class(child_three_count=3)
+        child_ids = [child.id for child in basic_class.child_three.all()]
+        url = '/basicClass?filters=child_three__id__contains_all={0}&fields=id,name'.format(
+            ','.join(str(child_id) for child_id in child_ids))
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual(queries.captured_queries[0]['sql'].count('test_app_basicclass_child_three'), 1)
+
     def test_post_with_required_field_missing_returns_400(self):
         # arrange
-        body = {
+        body = {
+
+        }
+        url = '/basicClass'
+
+        # act
+        result = self.api_client.post(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_with_fields_from_foriegnkey(self):
+        # arrange
+        child_class_one = DataGenerator.set_up_child_class()
+        basic_class = DataGenerator.set_up_basic_class(child_one=child_class_one)
+        url = '/basicClass/{0}?fields=child_one_id'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(result.data.keys()), 1)
+
+    def test_get_with_include_that_has_excludes_removes_fields_properly(self):
+        # arrange
+        model_with_sensitive_data = DataGenerator.set_up_model_with_sensitive_data()
+        basic_class = DataGenerator.set_up_basic_class(model_with_sensitive_data=model_with_sensitive_data)
+        url = '/basicClass/{0}?include=model_with_sensitive_data'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertNotIn('topSecret', result.data['modelWithSensitiveData'].keys())
+
+    def test_get_with_include_that_has_no_nested_child_returns_null(self):
+        # arrange
+        child_one = DataGenerator.set_up_child_class('test')
+        basic_class = DataGenerator.set_up_basic_class(child_one=child_one)
+        url = '/basicClass/{0}?include=child_one__nested_child'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertIsNone(result.data['childOne']['nestedChild'])
+
+    def test_get_with_include_that_has_nested_child(self):
+        # arrange
+        child_one = DataGenerator.set_up_child_class('test')
+        nested_child = DataGenerator.set_up_nested_child(child_one=child_one)
+        basic_class = DataGenerator.set_up_basic_class(child_one=child_one)
+        url = '/basicClass/{0}?include=child_one__nested_child'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertIsNotNone(result.data['childOne']['nestedChild'])
+
+    def test_get_sub_with_pk_and_non_matching_parent_id_should_400(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        model = DataGenerator.set_up_model_with_parent_resource(basic_class=basic_class)
+        other_model = DataGenerator.set_up_model_with_parent_resource()
+        url = '/basicClasses/{0}/modelWithParentResources/{1}'.format(other_model.id, model.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, result.status_code)
+
+    def test_get_sub_with_pk_and_matching_parent_pk_should_200(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        model = DataGenerator.set_up_model_with_parent_resource(basic_class=basic_class)
+        url = '/basicClasses/{0}/modelWithParentResources/{1}'.format(basic_class.id, model.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+
+    def test_get_with_icontains_does_not_work_in_reverse(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClasses?filters=name__icontains={0}'.format(basic_class.name + generate_str(7))
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertEqual(len(result.data), 0)
+
+    def test_get_with_revicontains_matches(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClasses?filters=name__revicontains={0}'.format(basic_class.name + generate_str(7))
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertEqual(len(result.data), 1)
+
+
+    def test_get_with_revicontains_is_case_insensitive(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class(name=DataGenerator.str(10).lower())
+        url = '/basicClass?filters=name__revicontains=AB{0}CD&fields=id,name'.format(basic_class.name.upper())
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertEqual([item['id'] for item in result.data], [basic_class.id])
+
+    def test_get_with_revicontains_looks_up_upper_cased_field(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass?filters=name__revicontains={0}&fields=id,name'.format(basic_class.name + generate_str(7))
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertIn('UPPER("test_app_basicclass"."name") IN', queries.captured_queries[0]['sql'])
+
+    def test_get_with_long_revicontains_matches(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass?filters=name__revicontains={0}&fields=id,name'.format(
+            generate_str(36) + basic_class.name + generate_str(36) + generate_str(36))
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertEqual([item['id'] for item in result.data], [basic_class.id])
+        self.assertNotIn('UPPER("test_app_basicclass"."name") IN', queries.captured_queries[0]['sql'])
+
+    def test_get_revicontains_candidates(self):
+        # act
+        candidates = SimplifyView.get_revicontains_candidates('abc')
+
+        # assert
+        self.assertEqual(candidates, ['', 'A', 'AB', 'ABC', 'B', 'BC', 'C'])
+
+    def test_get_revicontains_candidates_with_prefix(self):
+        # act
+        candidates = SimplifyView.get_revicontains_candidates('abc', prefix=True)
+
+        # assert
+        self.assertEqual(candidates, ['', 'A', 'AB', 'ABC'])
+
+class AsyncBasicClassTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/asyncBasicClass/{0}'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['id'], basic_class.id)
+        self.assertEqual(len(result.data['childThree']), 2)
+
+    def test_get_with_cache(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/asyncBasicClass/{0}'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+        cached_result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertTrue(cached_result.has_header('Hit'))
+        self.assertEqual(cached_result.data, result.data)
+
+    def test_get_does_not_exist_returns_400(self):
+        # arrange
+        url = '/asyncBasicClass/{0}'.format(2147483647)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_list_paging_with_filters(self):
+        # arrange
+        name = DataGenerator.str(15)
+        [DataGenerator.set_up_basic_class(name=name) for x in range(3)]
+        url = '/asyncBasicClass?filters=name__icontains={0}&page=1&pageSize=2&orderBy=id&fields=id,name'.format(name)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['count'], 3)
+        self.assertEqual(len(result.data['data']), 2)
+
+    def test_get_with_nested_include_uses_full_models(self):
+        # arrange
+        child_one = DataGenerator.set_up_child_class()
+        DataGenerator.set_up_nested_child(child_one=child_one)
+        basic_class = DataGenerator.set_up_basic_class(child_one=child_one)
+        url = '/asyncBasicClass/{0}?include=child_one__nested_child'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(result.data['childOne']['nestedChild'])
+
+    def test_get_sub_pk_linking_cls(self):
+        # arrange
+        linking_class = DataGenerator.set_up_linking_class()
+        url = '/basicClasses/{0}/asyncChildClass/{1}'.format(linking_class.basic_class.id,
+                                                             linking_class.child_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['id'], linking_class.child_class.id)
+
+    def test_get_sub_pk_without_link_returns_400(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        child_class = DataGenerator.set_up_child_class()
+        url = '/basicClasses/{0}/asyncChildClass/{1}'.format(basic_class.id, child_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post(self):
+        # arrange
+        name = DataGenerator.str(15)
+        url = '/asyncBasicClass'
+
+        # act
+        result = self.api_client.post(url, {'name': name}, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(BasicClass.objects.filter(name=name).exists())
+
+    def test_put(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        name = DataGenerator.str(15)
+        url = '/asyncBasicClass/{0}'.format(basic_class.id)
+
+        # act
+        result = self.api_client.put(url, {'name': name}, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        basic_class.refresh_from_db()
+        self.assertEqual(basic_class.name, name)
+
+    def test_delete(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/asyncBasicClass/{0}'.format(basic_class.id)
+
+        # act
+        result = self.api_client.delete(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertFalse(BasicClass.objects.filter(pk=basic_class.id).exists())
+
+    def test_delete_sub_only_linking_class(self):
+        # arrange
+        linking_class = DataGenerator.set_up_linking_class()
+        url = '/basicClasses/{0}/asyncChildClass/{1}?deleteLinkOnly=true'.format(linking_class.basic_class.id,
+                                                                               linking_class.child_class.id)
+
+        # act
+        result = self.api_client.delete(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertTrue(ChildClass.objects.filter(pk=linking_class.child_class.id).exists())
+        self.assertFalse(LinkingClass.objects.filter(pk=linking_class.id).exists())
+
+
+class ConcurrentQueriesTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_list_paging_returns_count_and_page(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes = [DataGenerator.set_up_basic_class(name=name) for x in range(3)]
+        url = '/concurrentBasicClass?filters=name__icontains={0}&page=2&pageSize=2&orderBy=id&fields=id,name'.format(name)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['count'], 3)
+        self.assertEqual([item['id'] for item in result.data['data']], [basic_classes[2].id])
+
+    def test_async_get_list_paging_returns_count_and_page(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes = [DataGenerator.set_up_basic_class(name=name) for x in range(3)]
+        url = '/asyncConcurrentBasicClass?filters=name__icontains={0}&page=1&pageSize=2&orderBy=id&fields=id,name'.format(name)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['count'], 3)
+        self.assertEqual([item['id'] for item in result.data['data']], [basic_classes[0].id, basic_classes[1].id])
+
+
+class SparseFieldsTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+        return result, [query['sql'] for query in queries.captured_queries]
+
+    def test_fields_without_pk_only_loads_requested_columns(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass/{0}?fields=name'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {'name': basic_class.name})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('binary_field', queries[0])
+        self.assertNotIn('"active"', queries[0])
+
+    def test_excluded_foreign_key_id_is_loaded_with_the_row(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass/{0}?fields=name,childOneId'.format(basic_class.id)
+        with patch.object(BasicClass, 'get_excludes', Mock(return_value=['exclude_field', 'child_one'])):
+            excluded = registry.build_model_capabilities(BasicClass)
+
+        # act
+        with patch.dict(registry._registry, {BasicClass: excluded}):
+            result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {'name': basic_class.name, 'childOneId': basic_class.child_one_id})
+        self.assertEqual(len(queries), 1)
+
+    def test_property_loads_the_columns_it_depends_on(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class(active=False)
+        url = '/basicClass/{0}?include=display_name&fields=name,display_name'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['displayName'], '{0} (inactive)'.format(basic_class.name))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"active"', queries[0])
+        self.assertNotIn('binary_field', queries[0])
+
+    def test_property_without_dependencies_loads_every_column(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass/{0}?include=test_prop&fields=name,test_prop'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {'name': basic_class.name, 'testProp': True})
+        self.assertEqual(len(queries), 1)
+        self.assertIn('binary_field', queries[0])
+
+    def test_nested_include_only_loads_requested_columns_on_each_level(self):
+        # arrange
+        child_class = DataGenerator.set_up_child_class()
+        DataGenerator.set_up_nested_child(child_one=child_class)
+        basic_class = DataGenerator.set_up_basic_class(child_one=child_class)
+        url = '/basicClass/{0}?include=child_one__nested_child&fields=name,child_one__nested_child'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['name'], basic_class.name)
+        self.assertEqual(result.data['childOne']['name'], child_class.name)
+        # nested child has none of the requested fields but it is still included
+        self.assertEqual(result.data['childOne']['nestedChild'], {})
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('binary_field', queries[0])
+        self.assertNotIn('test_app_childclass"."active"', queries[0])
+
+    def test_many_to_many_include_is_prefetched_with_requested_columns(self):
+        # arrange
+        child_classes = [DataGenerator.set_up_child_class() for x in range(2)]
+        basic_class = DataGenerator.set_up_basic_class()
+        basic_class.child_three.set(child_classes)
+        url = '/basicClass/{0}?include=child_three&fields=name,child_three'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(result.data['childThree'], key=lambda child: child['name']),
+                         sorted([{'name': child.name} for child in child_classes], key=lambda child: child['name']))
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('test_app_childclass"."active"', queries[1])
+
+
+class HeavyFieldsTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+        return result, [query['sql'] for query in queries.captured_queries]
+
+    def test_heavy_fields_are_left_out_by_default(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass/{0}'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['name'], basic_class.name)
+        self.assertNotIn('binaryField', result.data)
+        self.assertNotIn('binary_field', queries[0])
+
+    def test_heavy_fields_are_loaded_when_asked_for(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass/{0}?fields=id,binaryField'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {'id': basic_class.id, 'binaryField': 'binarystring'})
+
+    def test_heavy_fields_are_left_out_on_the_full_model_path(self):
+        # arrange
+        child_class = DataGenerator.set_up_child_class()
+        basic_class = DataGenerator.set_up_basic_class(child_one=child_class)
+        url = '/basicClass/{0}?include=child_one__nested_child'.format(basic_class.id)
+
+        # act
+        result, queries = self.get(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['name'], basic_class.name)
+        self.assertEqual(result.data['childOne']['name'], child_class.name)
+        self.assertNotIn('binaryField', result.data)
+        self.assertNotIn('excludeField', result.data)
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('binary_field', queries[0])
+
+
+class BlindIndexTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_filters_on_encrypted_field_use_blind_index(self):
+        # arrange
+        values = [DataGenerator.str(), DataGenerator.str(), DataGenerator.str()]
+        encrypted_classes = [DataGenerator.set_up_encrypted_class_with_no_display_value(value=value)
+                             for value in values]
+        url = '/encryptedClassNoDisplayChars?filters=encrypted_val={0}&fields=id,encryptedVal,encryptedValIndex'.format(
+            values[1])
+        in_url = '/encryptedClassNoDisplayChars?filters=encrypted_val__in={0},{1}&orderBy=id'.format(values[0],
+                                                                                                    values[2])
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+        sql = queries.captured_queries[0]['sql']
+        in_result = self.api_client.get(in_url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, [{'id': encrypted_classes[1].id, 'encryptedVal': values[1]}])
+        self.assertIn('encrypted_val_index', sql)
+        self.assertEqual(in_result.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in in_result.data], [encrypted_classes[0].id, encrypted_classes[2].id])
+
+
+class JsonPathTests(unittest.TestCase):
+    api_client = APIClient()
+    json_text = {'status': 'open', 'owner': {'name': 'pat', 'notes': 'x' * 100}, 'lines': [{'sku': 'a1'}]}
+
+    def setUp(self):
+        self.jt_class = DataGenerator.set_up_json_text_field_class(json_text=self.json_text)
+
+    def tearDown(self):
+        self.jt_class.delete()
+        cache.clear()
+
+    def get(self, fields):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get('/jsonTextFieldClass/{0}?fields={1}'.format(self.jt_class.id, fields))
+        return result, [query['sql'] for query in queries.captured_queries]
+
+    def test_fields_with_json_paths_only_read_those_values(self):
+        # act
+        result, sql = self.get('id,jsonText.status,jsonText.owner.name,jsonText.lines.0.sku,jsonText.missing')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {
+            'id': self.jt_class.id,
+            'jsonText': {'status': 'open', 'owner': {'name': 'pat'}, 'lines': {'0': {'sku': 'a1'}}, 'missing': None}
+        })
+        self.assertEqual(len(sql), 1)
+        self.assertIn('#>', sql[0])
+        self.assertNotIn('"json_text" FROM', sql[0])
+        self.assertNotIn('"json_text",', sql[0])
+
+    def test_json_paths_without_primary_key(self):
+        # act
+        result, sql = self.get('jsonText.owner,jsonText.owner.name')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {'jsonText': {'owner': self.json_text['owner']}})
+        self.assertEqual(len(sql), 1)
+        self.assertIn('#>', sql[0])
+
+    def test_json_paths_are_read_from_documents_off_postgres(self):
+        # act
+        with patch.object(connection, 'vendor', 'sqlite'):
+            result, sql = self.get('id,jsonText.status,jsonText.owner.name,jsonText.lines.0.sku')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {
+            'id': self.jt_class.id,
+            'jsonText': {'status': 'open', 'owner': {'name': 'pat'}, 'lines': {'0': {'sku': 'a1'}}}
+        })
+        self.assertNotIn('->', sql[0])
+
+    def test_json_paths_are_read_from_documents_before_postgres_16(self):
+        # act
+        with patch.object(connection, 'pg_version', 150000):
+            result, sql = self.get('id,jsonText.status')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {'id': self.jt_class.id, 'jsonText': {'status': 'open'}})
+        self.assertNotIn('#>', sql[0])
+
+    def test_digit_json_path_keys_are_object_keys_or_array_indexes_in_both_reads(self):
+        # arrange
+        self.jt_class.json_text = {'0': 'zero', 'lines': ['a1'], 'owner': {'1': 'one'}}
+        self.jt_class.save()
+        fields = 'id,jsonText.0,jsonText.lines.0,jsonText.owner.1,jsonText.lines.1'
+        expected = {
+            'id': self.jt_class.id,
+            'jsonText': {'0': 'zero', 'lines': {'0': 'a1', '1': None}, 'owner': {'1': 'one'}}
+        }
+
+        # act
+        in_database, sql = self.get(fields)
+        with patch.object(connection, 'vendor', 'sqlite'):
+            from_documents, _ = self.get(fields)
+
+        # assert
+        self.assertIn('#>', sql[0])
+        self.assertEqual(in_database.data, expected)
+        self.assertEqual(from_documents.data, expected)
+
+    def test_json_paths_into_a_document_that_is_not_json_are_null(self):
+        # arrange
+        other = DataGenerator.set_up_json_text_field_class(json_text=self.json_text)
+        type(self.jt_class).objects.filter(id=other.id).update(json_text='not json')
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get('/jsonTextFieldClass?fields=id,jsonText.status')
+        other_id = other.id
+        other.delete()
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        items = {item['id']: item for item in result.data}
+        self.assertEqual(items[self.jt_class.id], {'id': self.jt_class.id, 'jsonText': {'status': 'open'}})
+        self.assertEqual(items[other_id], {'id': other_id, 'jsonText': {'status': None}})
+        self.assertIn('IS JSON', queries.captured_queries[0]['sql'])
+
+    def test_invalid_json_path_is_bad_request(self):
+        # act
+        result, sql = self.get('id,jsonText..status')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(result.data['errorMessage'], 'jsonText..status is not a valid json path')
+
+
+class ExportTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def export(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url)
+            if result.is_async:
+                async def consume():
+                    return b''.join([chunk async for chunk in result.streaming_content])
+                content = asyncio.run(consume())
+            else:
+                content = b''.join(result.streaming_content)
+        return result, content.decode('utf-8'), [query['sql'] for query in queries.captured_queries]
+
+    def set_up_basic_classes(self, name):
+        child_classes = [DataGenerator.set_up_child_class() for x in range(2)]
+        basic_classes = [DataGenerator.set_up_basic_class(name=name) for x in range(3)]
+        basic_classes[1].child_three.set(child_classes)
+        return basic_classes, child_classes
+
+    @override_settings(SIMPLIFY_EXPORT_CHUNK_SIZE=1)
+    def test_ndjson_export_streams_every_item_without_paging(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes, child_classes = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&include=childThree&orderBy=id'.format(name)
+
+        # act
+        result, content, queries = self.export(url + '&export=ndjson&page=1&pageSize=1')
+        listed = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(result['Content-Disposition'], 'attachment; filename="basicClass.ndjson"')
+        items = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([item['id'] for item in items], [basic_class.id for basic_class in basic_classes])
+        self.assertEqual(items, json.loads(listed.content))
+        self.assertEqual(sorted(child['id'] for child in items[1]['childThree']),
+                         sorted(child_class.id for child_class in child_classes))
+        self.assertFalse(any('COUNT(' in query for query in queries))
+        self.assertIn('CURSOR', queries[0])
+
+    def test_csv_export_writes_a_header_and_a_row_per_item(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes, child_classes = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&fields=id,name,childThree&include=childThree&orderBy=-id&export=csv'.format(name)
+
+        # act
+        result, content, queries = self.export(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['id', 'name', 'childThree'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [basic_class.id for basic_class in reversed(basic_classes)])
+        self.assertEqual(sorted(child['id'] for child in json.loads(rows[2][2])),
+                         sorted(child_class.id for child_class in child_classes))
+
+    def test_export_of_full_models(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes, child_classes = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&fields=name&orderBy=id&export=csv'.format(name)
+
+        # act
+        result, content, queries = self.export(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(content.splitlines(), ['name'] + [name] * 3)
+
+    def test_async_export(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes, child_classes = self.set_up_basic_classes(name)
+        url = '/asyncBasicClass?filters=name__icontains={0}&orderBy=id&export=ndjson'.format(name)
 
-        }
-        url = '/basicClass'
+        # act
+        result, content, queries = self.export(url)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual([json.loads(line)['id'] for line in content.splitlines()],
+                         [basic_class.id for basic_class in basic_classes])
 
+    def test_unknown_export_format_returns_bad_request(self):
         # act
-        result = self.api_client.post(url, format='json')
+        result = self.api_client.get('/basicClass?export=xml')
 
         # assert
         self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(result.data['errorMessage'], 'xml is not an export format. Use one of csv, ndjson')
 
-    def test_get_with_fields_from_foriegnkey(self):
+    def test_export_of_a_single_item_returns_bad_request(self):
         # arrange
-        child_class_one = DataGenerator.set_up_child_class()
-        basic_class = DataGenerator.set_up_basic_class(child_one=child_class_one)
-        url = '/basicClass/{0}?fields=child_one_id'.format(basic_class.id)
+        basic_class = DataGenerator.set_up_basic_class()
+
+        # act
+        results = [self.api_client.get('/{0}/{1}?export=csv'.format(route, basic_class.id))
+                   for route in ['basicClass', 'asyncBasicClass']]
+
+        # assert
+        for result in results:
+            self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(result.data['errorMessage'], 'export can only be used on a list')
+
+    def test_export_with_aggregate_returns_bad_request(self):
+        # act
+        result = self.api_client.get('/basicClass?aggregate=count:id&groupBy=active&export=ndjson')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(result.data['errorMessage'], 'export can not be used with aggregate or groupBy')
+
+
+class AggregateTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def set_up_basic_classes(self, name):
+        child_class = DataGenerator.set_up_child_class(name=DataGenerator.str(15))
+        return [
+            DataGenerator.set_up_basic_class(name=name, active=True, child_one=child_class),
+            DataGenerator.set_up_basic_class(name=name, active=True),
+            DataGenerator.set_up_basic_class(name=name, active=False)
+        ], child_class
+
+    def test_group_by_returns_a_row_per_group_in_one_query(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes, child_class = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&aggregate=count:id,max:id&groupBy=active'.format(name)
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, [
+            {'active': False, 'countId': 1, 'maxId': basic_classes[2].id},
+            {'active': True, 'countId': 2, 'maxId': basic_classes[1].id}
+        ])
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn('GROUP BY', queries.captured_queries[0]['sql'])
+
+    def test_aggregate_without_group_by_returns_one_row(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes, child_class = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&aggregate=sum:id,count:id'.format(name)
 
         # act
         result = self.api_client.get(url, format='json')
 
         # assert
         self.assertEqual(result.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(result.data.keys()), 1)
+        self.assertEqual(result.data, [{'sumId': sum(basic_class.id for basic_class in basic_classes), 'countId': 3}])
 
-    def test_get_with_include_that_has_excludes_removes_fields_properly(self):
+    def test_group_by_related_field_ordered_by_aggregate_and_paged(self):
         # arrange
-        model_with_sensitive_data = DataGenerator.set_up_model_with_sensitive_data()
-        basic_class = DataGenerator.set_up_basic_class(model_with_sensitive_data=model_with_sensitive_data)
-        url = '/basicClass/{0}?include=model_with_sensitive_data'.format(basic_class.id)
+        name = DataGenerator.str(15)
+        basic_classes, child_class = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&aggregate=count:id&groupBy=childOne__name&orderBy=-countId' \
+              '&page=1&pageSize=1'.format(name)
 
         # act
         result = self.api_client.get(url, format='json')
 
         # assert
-        self.assertEqual(status.HTTP_200_OK, result.status_code)
-        self.assertNotIn('topSecret', result.data['modelWithSensitiveData'].keys())
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, {'count': 2, 'data': [{'childOneName': None, 'countId': 2}]})
 
-    def test_get_with_include_that_has_no_nested_child_returns_null(self):
+    def test_async_group_by(self):
         # arrange
-        child_one = DataGenerator.set_up_child_class('test')
-        basic_class = DataGenerator.set_up_basic_class(child_one=child_one)
-        url = '/basicClass/{0}?include=child_one__nested_child'.format(basic_class.id)
+        name = DataGenerator.str(15)
+        self.set_up_basic_classes(name)
+        url = '/asyncBasicClass?filters=name__icontains={0}&aggregate=count:id&groupBy=active'.format(name)
 
         # act
         result = self.api_client.get(url, format='json')
 
         # assert
-        self.assertEqual(status.HTTP_200_OK, result.status_code)
-        self.assertIsNone(result.data['childOne']['nestedChild'])
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data, [{'active': False, 'countId': 1}, {'active': True, 'countId': 2}])
 
-    def test_get_with_include_that_has_nested_child(self):
+    def test_aggregate_that_is_not_allowed_returns_bad_request(self):
+        # act
+        result = self.api_client.get('/basicClass?aggregate=sum:name', format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(result.data['errorMessage'], 'sum:name is not an aggregate that can be requested')
+
+    def test_group_by_that_is_not_allowed_returns_bad_request(self):
+        # act
+        result = self.api_client.get('/basicClass?aggregate=count:id&groupBy=created', format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(result.data['errorMessage'], 'created is not a field that can be grouped by')
+
+    def test_group_by_without_aggregate_returns_bad_request(self):
+        # act
+        result = self.api_client.get('/basicClass?groupBy=active', format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FacetTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def set_up_basic_classes(self, name):
+        # child_one is one to one so each item needs a child of its own to share a name
+        child_name = DataGenerator.str(15)
+        return [
+            DataGenerator.set_up_basic_class(name=name, active=True,
+                                             child_one=DataGenerator.set_up_child_class(name=child_name)),
+            DataGenerator.set_up_basic_class(name=name, active=True,
+                                             child_one=DataGenerator.set_up_child_class(name=child_name)),
+            DataGenerator.set_up_basic_class(name=name, active=False)
+        ], child_name
+
+    def test_facets_are_returned_with_a_page_of_the_filtered_items(self):
         # arrange
-        child_one = DataGenerator.set_up_child_class('test')
-        nested_child = DataGenerator.set_up_nested_child(child_one=child_one)
-        basic_class = DataGenerator.set_up_basic_class(child_one=child_one)
-        url = '/basicClass/{0}?include=child_one__nested_child'.format(basic_class.id)
+        name = DataGenerator.str(15)
+        basic_classes, child_name = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&facets=active,childOne__name&page=1&pageSize=1' \
+              '&fields=id'.format(name)
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['count'], 3)
+        self.assertEqual(len(result.data['data']), 1)
+        self.assertEqual(result.data['facets'], {
+            'active': [{'value': True, 'count': 2}, {'value': False, 'count': 1}],
+            'childOneName': [{'value': child_name, 'count': 2}, {'value': None, 'count': 1}]
+        })
+        # one grouped count for each facet, the count and the page
+        self.assertEqual(len(queries.captured_queries), 4)
+
+    def test_facets_wrap_a_list_that_is_not_paged(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_classes, child_name = self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&facets=active&fields=id'.format(name)
 
         # act
         result = self.api_client.get(url, format='json')
 
         # assert
-        self.assertEqual(status.HTTP_200_OK, result.status_code)
-        self.assertIsNotNone(result.data['childOne']['nestedChild'])
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(result.data['data']), 3)
+        self.assertEqual(result.data['facets'], {'active': [{'value': True, 'count': 2}, {'value': False, 'count': 1}]})
 
-    def test_get_sub_with_pk_and_non_matching_parent_id_should_400(self):
+    def test_facets_with_count_only(self):
         # arrange
-        basic_class = DataGenerator.set_up_basic_class()
-        model = DataGenerator.set_up_model_with_parent_resource(basic_class=basic_class)
-        other_model = DataGenerator.set_up_model_with_parent_resource()
-        url = '/basicClasses/{0}/modelWithParentResources/{1}'.format(other_model.id, model.id)
+        name = DataGenerator.str(15)
+        self.set_up_basic_classes(name)
+        url = '/basicClass?filters=name__icontains={0}&facets=active&countOnly=true'.format(name)
 
         # act
         result = self.api_client.get(url, format='json')
 
         # assert
-        self.assertEqual(status.HTTP_400_BAD_REQUEST, result.status_code)
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['count'], 3)
+        self.assertEqual(result.data['facets'], {'active': [{'value': True, 'count': 2}, {'value': False, 'count': 1}]})
 
-    def test_get_sub_with_pk_and_matching_parent_pk_should_200(self):
+    def test_async_facets_run_concurrently(self):
         # arrange
-        basic_class = DataGenerator.set_up_basic_class()
-        model = DataGenerator.set_up_model_with_parent_resource(basic_class=basic_class)
-        url = '/basicClasses/{0}/modelWithParentResources/{1}'.format(basic_class.id, model.id)
+        name = DataGenerator.str(15)
+        basic_classes, child_name = self.set_up_basic_classes(name)
+        url = '/asyncConcurrentBasicClass?filters=name__icontains={0}&facets=active,childOne__name&page=1' \
+              '&pageSize=2'.format(name)
 
         # act
         result = self.api_client.get(url, format='json')
 
         # assert
-        self.assertEqual(status.HTTP_200_OK, result.status_code)
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['count'], 3)
+        self.assertEqual(result.data['facets'], {
+            'active': [{'value': True, 'count': 2}, {'value': False, 'count': 1}],
+            'childOneName': [{'value': child_name, 'count': 2}, {'value': None, 'count': 1}]
+        })
 
-    def test_get_with_icontains_does_not_work_in_reverse(self):
+    def test_facet_that_is_not_allowed_returns_bad_request(self):
+        # act
+        result = self.api_client.get('/basicClass?facets=created', format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(result.data['errorMessage'], 'created is not a field that can be grouped by')
+
+
+class ReadModelTests(unittest.TestCase):
+    api_client = APIClient()
+    include = 'include=childOne__nestedChild,childThree,displayName'
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_items(self, name, route='readModelBasicClass'):
+        url = '/{0}?{1}&filters=name__icontains={2}&orderBy=id'.format(route, self.include, name)
+        result = self.api_client.get(url, format='json')
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        return json.loads(result.content)
+
+    def test_list_with_read_model_includes_reads_one_query(self):
+        # arrange
+        name = DataGenerator.str(15)
+        child_class = DataGenerator.set_up_child_class()
+        DataGenerator.set_up_nested_child(child_one=child_class)
+        DataGenerator.set_up_basic_class(name=name, child_one=child_class)
+        DataGenerator.set_up_basic_class(name=name)
+        url = '/readModelBasicClass?{0}&filters=name__icontains={1}&orderBy=id'.format(self.include, name)
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn('test_app_basicclassreadmodel', queries.captured_queries[0]['sql'])
+        self.assertEqual(json.loads(result.content), self.get_items(name, route='basicClass'))
+
+    def test_async_list_reads_read_model(self):
+        # arrange
+        name = DataGenerator.str(15)
+        DataGenerator.set_up_basic_class(name=name, child_one=DataGenerator.set_up_child_class())
+
+        # act
+        result = self.get_items(name, route='asyncReadModelBasicClass')
+
+        # assert
+        self.assertEqual(result, self.get_items(name, route='basicClass'))
+
+    def test_other_includes_do_not_read_read_model(self):
+        # arrange
+        name = DataGenerator.str(15)
+        DataGenerator.set_up_basic_class(name=name)
+        url = '/readModelBasicClass?include=childThree&filters=name__icontains={0}'.format(name)
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertNotIn('displayName', result.data[0])
+        self.assertFalse(any('basicclassreadmodel' in query['sql'] for query in queries.captured_queries))
+
+    def test_saving_related_items_refreshes_read_model(self):
+        # arrange
+        name = DataGenerator.str(15)
+        child_class = DataGenerator.set_up_child_class()
+        basic_class = DataGenerator.set_up_basic_class(name=name, child_one=child_class)
+
+        # act
+        child_class.name = 'renamed'
+        child_class.save()
+        nested_child = DataGenerator.set_up_nested_child(child_one=child_class)
+        basic_class.active = False
+        basic_class.save()
+        result = self.get_items(name)
+
+        # assert
+        self.assertEqual(result[0]['childOne']['name'], 'renamed')
+        self.assertEqual(result[0]['childOne']['nestedChild']['id'], nested_child.id)
+        self.assertEqual(result[0]['displayName'], '{0} (inactive)'.format(name))
+
+    def test_linking_and_deleting_refreshes_read_model(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_class = DataGenerator.set_up_basic_class(name=name, child_three_count=2)
+        removed, deleted = list(basic_class.child_three.order_by('id'))
+        added = DataGenerator.set_up_child_class()
+
+        # act
+        basic_class.child_three.remove(removed)
+        added.basic_class_three.add(basic_class)
+        deleted.delete()
+        result = self.get_items(name)
+
+        # assert
+        self.assertEqual([child['id'] for child in result[0]['childThree']], [added.id])
+
+    def test_cascade_save_refreshes_read_model_once(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_class = DataGenerator.set_up_basic_class(name=name, child_one=DataGenerator.set_up_child_class())
+        basic_class.child_one.name = 'cascaded'
+        basic_class.related_items_to_be_saved.append('child_one')
+
+        # act
+        with patch('rest_framework_simplify.read_models.refresh_read_model_rows',
+                   wraps=read_models.refresh_read_model_rows) as refresh:
+            basic_class.cascade_save()
+
+        # assert
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(self.get_items(name)[0]['childOne']['name'], 'cascaded')
+
+    def test_items_missing_from_read_model_are_serialized_without_writing(self):
+        # arrange
+        name = DataGenerator.str(15)
+        basic_class = DataGenerator.set_up_basic_class(name=name)
+        BasicClassReadModel.objects.filter(source=basic_class).delete()
+
+        # act
+        result = self.get_items(name)
+
+        # assert
+        self.assertEqual(result, self.get_items(name, route='basicClass'))
+        self.assertFalse(BasicClassReadModel.objects.filter(source=basic_class).exists())
+
+
+class ServerTimingTests(unittest.TestCase):
+    api_client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_list_paging_should_return_server_timing_header(self):
+        # arrange
+        name = DataGenerator.str(15)
+        [DataGenerator.set_up_basic_class(name=name) for x in range(3)]
+        url = '/basicClass?filters=name__icontains={0}&page=1&pageSize=2&orderBy=id&fields=id,name'.format(name)
+
+        # act
+        with override_settings(SIMPLIFY_SERVER_TIMING=True):
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        phases = [metric.split(';')[0] for metric in result['Server-Timing'].split(', ')]
+        self.assertEqual(phases, ['cache', 'parse', 'count', 'page', 'merge', 'decode', 'camelcase', 'render', 'db', 'total'])
+        self.assertIn('page;dur=', result['Server-Timing'])
+        self.assertIn('desc="2 queries"', result['Server-Timing'])
+
+    def test_get_should_send_timings_to_sink(self):
         # arrange
         basic_class = DataGenerator.set_up_basic_class()
-        url = '/basicClasses?filters=name__icontains={0}'.format(basic_class.name + generate_str(7))
+        sink = Mock()
+        url = '/basicClass/{0}'.format(basic_class.id)
 
         # act
-        result = self.api_client.get(url, format='json')
+        with override_settings(SIMPLIFY_SERVER_TIMING=True, SIMPLIFY_TIMING_SINK=sink):
+            result = self.api_client.get(url, format='json')
 
         # assert
-        self.assertEqual(status.HTTP_200_OK, result.status_code)
-        self.assertEqual(len(result.data), 0)
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(sink.call_count, 1)
+        timings = sink.call_args[0][1]
+        self.assertGreaterEqual(timings['queries'], 1)
+        self.assertGreater(timings['total'], 0)
+        phases = {phase['name']: phase for phase in timings['phases']}
+        self.assertGreaterEqual(phases['page']['queries'], 1)
+        self.assertEqual(phases['merge']['rows'], 1)
 
-    def test_get_with_revicontains_matches(self):
+    def test_async_get_should_return_server_timing_header(self):
         # arrange
         basic_class = DataGenerator.set_up_basic_class()
-        url = '/basicClasses?filters=name__revicontains={0}'.format(basic_class.name + generate_str(7))
+        url = '/asyncBasicClass/{0}'.format(basic_class.id)
+
+        # act
+        with override_settings(SIMPLIFY_SERVER_TIMING=True):
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertIn('page;dur=', result['Server-Timing'])
+        self.assertIn('total;dur=', result['Server-Timing'])
+
+    def test_get_should_not_return_server_timing_header_when_disabled(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class()
+        url = '/basicClass/{0}'.format(basic_class.id)
 
         # act
         result = self.api_client.get(url, format='json')
 
         # assert
-        self.assertEqual(status.HTTP_200_OK, result.status_code)
-        self.assertEqual(len(result.data), 1)
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertFalse(result.has_header('Server-Timing'))
 
 
 class ReadReplicaTests(unittest.TestCase):
@@ -790,6 +1881,33 @@ class ReadReplicaTests(unittest.TestCase):
         self.assertEqual(result.status_code, status.HTTP_200_OK)
         self.assertEqual(result.data['name'], basic_class.name)
 
+    def test_get_from_pool_reads_from_replica(self):
+        # arrange
+        basic_class = DataGenerator.set_up_basic_class(write_db='readreplica')
+        url = '/readReplicaPoolBasicClass/{0}'.format(basic_class.id)
+
+        # act
+        result = self.api_client.get(url, format='json', REMOTE_ADDR=generate_str(15))
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['name'], basic_class.name)
+
+    def test_get_from_pool_after_write_reads_from_write_db(self):
+        # arrange
+        client_address = generate_str(15)
+        post_result = self.api_client.post('/readReplicaPoolBasicClass', {'name': generate_str(15)}, format='json',
+                                           REMOTE_ADDR=client_address)
+        url = '/readReplicaPoolBasicClass/{0}'.format(post_result.data['id'])
+
+        # act
+        result = self.api_client.get(url, format='json', REMOTE_ADDR=client_address)
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data['id'], post_result.data['id'])
+        self.assertEqual(result.data['name'], post_result.data['name'])
+
 
 class SecondDatabaseBasicClassTests(unittest.TestCase):
     api_client = APIClient()
@@ -1148,3 +2266,41 @@ class FilterablePropertiesTests(unittest.TestCase):
         # assert
         self.assertEqual(result.status_code, status.HTTP_200_OK)
         self.assertEqual(len(result.data), 1)
+
+    def test_filterable_property_false_does_not_duplicate_items(self):
+        # arrange
+        community_one = DataGenerator.set_up_community()
+        community_two = DataGenerator.set_up_community(phase_group=community_one.phase_group)
+        application = Application.get_lead_mgmt_application()
+        DataGenerator.set_up_community_application(community=community_one, application=application, active=False)
+        DataGenerator.set_up_community_application(community=community_two, application=application, active=False)
+
+        url = '/phaseGroups?filters=active=False|id__in={0}'.format(community_one.phase_group.id)
+
+        # act
+        result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in result.data], [community_one.phase_group.id])
+
+    def test_filterable_property_does_not_duplicate_items(self):
+        # arrange
+        community_one = DataGenerator.set_up_community()
+        community_two = DataGenerator.set_up_community(phase_group=community_one.phase_group)
+        application = Application.get_lead_mgmt_application()
+        DataGenerator.set_up_community_application(community=community_one, application=application, active=True)
+        DataGenerator.set_up_community_application(community=community_two, application=application, active=True)
+
+        url = '/phaseGroups?filters=active=True|id__in={0}'.format(community_one.phase_group.id)
+
+        # act
+        with CaptureQueriesContext(connection) as queries:
+            result = self.api_client.get(url, format='json')
+
+        # assert
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in result.data], [community_one.phase_group.id])
+        # one to build the filterable properties and one for the page
+        self.assertEqual(len(queries.captured_queries), 2)
+        self.assertIn('EXISTS', queries.captured_queries[-1]['sql'])
@@ -1,15 +1,27 @@
 from django.conf import settings
 
-from rest_framework_simplify.views import SimplifyStoredProcedureView, SimplifyView, SimplifyEmailTemplateView
-
-from test_app.models import BasicClass, ChildClass, LinkingClass, MetaDataClass, OneToOneClass, RequestFieldSaveClass, \
-    PhaseGroup, ModelWithParentResource
+from rest_framework_simplify.routing import ReadReplicaPool
+from rest_framework_simplify.testing import QueryBudget
+from rest_framework_simplify.views import AsyncSimplifyView, SimplifyStoredProcedureView, SimplifyView, \
+    SimplifyEmailTemplateView
+
+from test_app.models import BasicClass, BasicClassReadModel, ChildClass, EncryptedClassNoDisplayChars, \
+    JsonTextFieldClass, LinkingClass, MetaDataClass, OneToOneClass, RequestFieldSaveClass, PhaseGroup, \
+    ModelWithParentResource
 from test_app import forms, email_templates
 from test_app.permissions import BasicPermission
 
 
+read_replica_pool = ReadReplicaPool(['readreplica'], sticky_seconds=5)
+
+
 class BasicClassHandler(SimplifyView):
     permission_classes = [BasicPermission]
+    query_budgets = {
+        'GET': QueryBudget(1, query_string='include=childOne,childThree'),
+        'GET_LIST': QueryBudget(2, tables={'test_app_childclass': 1},
+                                query_string='page=1&pageSize=10&include=childThree')
+    }
 
     def __init__(self):
         super().__init__(
@@ -18,6 +30,55 @@ class BasicClassHandler(SimplifyView):
         )
 
 
+class AsyncBasicClassHandler(AsyncSimplifyView):
+    permission_classes = [BasicPermission]
+
+    def __init__(self):
+        super().__init__(
+            BasicClass,
+            supported_methods=['GET', 'GET_LIST', 'PUT', 'POST', 'DELETE']
+        )
+
+
+class AsyncConcurrentBasicClassHandler(AsyncSimplifyView):
+    def __init__(self):
+        super().__init__(BasicClass, supported_methods=['GET', 'GET_LIST'], concurrent_queries=True)
+
+
+class ReadModelBasicClassHandler(SimplifyView):
+    read_models = [BasicClassReadModel]
+
+    def __init__(self):
+        super().__init__(BasicClass, supported_methods=['GET', 'GET_LIST'])
+
+
+class AsyncReadModelBasicClassHandler(AsyncSimplifyView):
+    read_models = [BasicClassReadModel]
+
+    def __init__(self):
+        super().__init__(BasicClass, supported_methods=['GET', 'GET_LIST'])
+
+
+class AsyncLinkingClassHandler(AsyncSimplifyView):
+    def __init__(self):
+        linked_objects = []
+        linking_class = {
+            'parent_resource': 'basicClasses',
+            'parent_cls': BasicClass,
+            'parent_name': 'basic_class',
+            'linking_cls': LinkingClass,
+            'sub_resource_name': 'child_class'
+        }
+        linked_objects.append(linking_class)
+        super().__init__(ChildClass, supported_methods=['GET', 'GET_SUB', 'GET_LIST_SUB', 'DELETE', 'DELETE_SUB'],
+                         linked_objects=linked_objects)
+
+
+class ConcurrentBasicClassHandler(SimplifyView):
+    def __init__(self):
+        super().__init__(BasicClass, supported_methods=['GET', 'GET_LIST'], concurrent_queries=True)
+
+
 class ChildClassHandler(SimplifyView):
     permission_classes = [BasicPermission]
 
@@ -51,6 +112,9 @@ class LinkingClassWithNoLinkingClsDefinedHandler(SimplifyView):
 
 class LinkingClassHandler(SimplifyView):
     permission_classes = [BasicPermission]
+    query_budgets = {
+        'GET_SUB': QueryBudget(2)
+    }
 
     def __init__(self):
         linked_objects = []
@@ -62,7 +126,8 @@ class LinkingClassHandler(SimplifyView):
             'sub_resource_name': 'child_class'
         }
         linked_objects.append(linking_class)
-        super().__init__(ChildClass, supported_methods=['GET', 'GET_SUB', 'POST_SUB', 'DELETE', 'DELETE_SUB'], linked_objects=linked_objects)
+        super().__init__(ChildClass, supported_methods=['GET', 'GET_SUB', 'GET_LIST_SUB', 'POST_SUB', 'DELETE', 'DELETE_SUB'],
+                         linked_objects=linked_objects)
 
 
 class MetaDataClassHandler(SimplifyView):
@@ -76,6 +141,11 @@ class ReadReplicaBasicClassHandler(SimplifyView):
         super().__init__(BasicClass, supported_methods=['GET'], read_db='readreplica')
 
 
+class ReadReplicaPoolBasicClassHandler(SimplifyView):
+    def __init__(self):
+        super().__init__(BasicClass, supported_methods=['GET', 'POST'], read_db=read_replica_pool)
+
+
 class SecondDatabaseBasicClassHandler(SimplifyView):
     def __init__(self):
         super().__init__(BasicClass, supported_methods=['GET', 'POST', 'POST_SUB'],
@@ -116,6 +186,16 @@ class SendEmailHandler(SimplifyEmailTemplateView):
         super(SendEmailHandler, self).__init__(*args, **kwargs)
 
 
+class EncryptedClassNoDisplayCharsHandler(SimplifyView):
+    def __init__(self):
+        super().__init__(EncryptedClassNoDisplayChars, supported_methods=['GET_LIST'])
+
+
+class JsonTextFieldClassHandler(SimplifyView):
+    def __init__(self):
+        super().__init__(JsonTextFieldClass, supported_methods=['GET', 'GET_LIST'])
+
+
 class OneToOneHandler(SimplifyView):
     def __init__(self):
         super().__init__(OneToOneClass, supported_methods=['GET'])
@@ -21,6 +21,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'i%i*yj*eexm=hwz7pt3t(g-2x#s8#2frfz@i^^%ow!t(ja61g8'
 DB_ENCRYPTION_KEY = '05oTj3MftZL8lyn0'
+DB_BLIND_INDEX_KEY = 'blind-index-test-key'
 EMAIL_TEMPLATES_BASE_PATH = BASE_DIR + '/test_app/templates/'
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -72,7 +73,11 @@ TEMPLATES = [
 WSGI_APPLICATION = 'test_proj.wsgi.application'
 
 REST_FRAMEWORK = {
-    'EXCEPTION_HANDLER': 'rest_framework_simplify.handler.exception_handler'
+    'EXCEPTION_HANDLER': 'rest_framework_simplify.handler.exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework_simplify.renderers.SimplifyJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer'
+    ]
 }
 
 # Database
@@ -1,9 +1,11 @@
 from django.urls import re_path
 
-from test_app.views import BasicClassHandler, ChildClassHandler, LinkingClassHandler, \
-    LinkingClassWithNoLinkingClsDefinedHandler, MetaDataClassHandler, ReadReplicaBasicClassHandler, \
-    SqlStoredProcedureHandler, PostgresStoredProcedureHandler, SecondDatabaseBasicClassHandler, SendEmailHandler, \
-    OneToOneHandler, RequestFieldSaveHandler, PhaseGroupHandler, ModelWithParentResourceHandler, ThrowHandler
+from test_app.views import AsyncBasicClassHandler, AsyncConcurrentBasicClassHandler, AsyncLinkingClassHandler, \
+    AsyncReadModelBasicClassHandler, BasicClassHandler, ChildClassHandler, ConcurrentBasicClassHandler, \
+    EncryptedClassNoDisplayCharsHandler, JsonTextFieldClassHandler, \
+    LinkingClassHandler, LinkingClassWithNoLinkingClsDefinedHandler, MetaDataClassHandler, ReadModelBasicClassHandler, \
+    ReadReplicaBasicClassHandler, ReadReplicaPoolBasicClassHandler, SqlStoredProcedureHandler, PostgresStoredProcedureHandler, \
+    SecondDatabaseBasicClassHandler, SendEmailHandler, OneToOneHandler, RequestFieldSaveHandler, PhaseGroupHandler, ModelWithParentResourceHandler, ThrowHandler
 
 urlpatterns = [
     re_path(r'^(?P<parent_resource>[a-zA-z]+)/(?P<parent_pk>[0-9]+)/childOne$', ChildClassHandler.as_view()),
@@ -20,11 +22,25 @@ urlpatterns = [
         r'^(?P<parent_resource>[a-zA-z]+)/(?P<parent_pk>[0-9]+)/modelWithParentResources$',
         ModelWithParentResourceHandler.as_view()
     ),
+    re_path(r'^(?P<parent_resource>[a-zA-z]+)/(?P<parent_pk>[0-9]+)/asyncChildClass/(?P<pk>[0-9]+)$',
+        AsyncLinkingClassHandler.as_view()),
+    re_path(r'^(?P<parent_resource>[a-zA-z]+)/(?P<parent_pk>[0-9]+)/asyncChildClass$', AsyncLinkingClassHandler.as_view()),
+    re_path(r'^asyncBasicClass/(?P<pk>[0-9]+)$', AsyncBasicClassHandler.as_view()),
+    re_path(r'^asyncConcurrentBasicClass$', AsyncConcurrentBasicClassHandler.as_view()),
+    re_path(r'^asyncBasicClass$', AsyncBasicClassHandler.as_view()),
+    re_path(r'^asyncReadModelBasicClass$', AsyncReadModelBasicClassHandler.as_view()),
     re_path(r'^basicClass/(?P<pk>[0-9]+)$', BasicClassHandler.as_view()),
     re_path(r'^basicClass', BasicClassHandler.as_view()),
+    re_path(r'^concurrentBasicClass$', ConcurrentBasicClassHandler.as_view()),
+    re_path(r'^encryptedClassNoDisplayChars$', EncryptedClassNoDisplayCharsHandler.as_view()),
+    re_path(r'^jsonTextFieldClass/(?P<pk>[0-9]+)$', JsonTextFieldClassHandler.as_view()),
+    re_path(r'^jsonTextFieldClass$', JsonTextFieldClassHandler.as_view()),
     re_path(r'^metaDataClass', MetaDataClassHandler.as_view()),
     re_path(r'^oneToOne/(?P<pk>[0-9]+)$', OneToOneHandler.as_view()),
+    re_path(r'^readModelBasicClass$', ReadModelBasicClassHandler.as_view()),
     re_path(r'^readReplicaBasicClass/(?P<pk>[0-9]+)$', ReadReplicaBasicClassHandler.as_view()),
+    re_path(r'^readReplicaPoolBasicClass/(?P<pk>[0-9]+)$', ReadReplicaPoolBasicClassHandler.as_view()),
+    re_path(r'^readReplicaPoolBasicClass$', ReadReplicaPoolBasicClassHandler.as_view()),
     re_path(r'^requestFieldsToSaveClass$', RequestFieldSaveHandler.as_view()),
     re_path(r'^secondDatabaseBasicClass$', SecondDatabaseBasicClassHandler.as_view()),
     re_path(r'^sendEmail$', SendEmailHandler.as_view()),